@@ -1,14 +1,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
 import time
-import gc
-import asyncio
 from utils import (
     analyze_product_names,
-    convert_option_format,
-    is_option_format,
+    convert_option_column,
     calculate_prices,
     calculate_prices_optimized,
     convert_categories,
@@ -16,13 +12,16 @@ from utils import (
     preprocess_categories
 )
 from utils.option_translate import (
-    translate_option_column_batch
+    translate_option_column_batch, count_option_values
 )
 from utils.translate_simplified import (
     translate_product_names
 )
 # from utils.validation import DataValidator, display_validation_results  # 제거됨
-from utils.chunk_processor import ChunkProcessor, display_chunk_info, recommend_chunk_size
+from utils.chunk_processor import (
+    ChunkProcessor, DEFAULT_EXECUTOR, EXECUTOR_LABELS, EXECUTOR_MODES,
+    display_chunk_info, recommend_chunk_size
+)
 from utils.progress import (
     progress_context, MultiStepProgress, create_processing_steps,
     show_data_processing_progress, show_translation_progress
@@ -30,6 +29,11 @@ from utils.progress import (
 from utils.parallel_translation import (
     ParallelTranslationManager, estimate_translation_time, estimate_api_usage
 )
+from utils.deepl_client import get_deepl_client
+from utils.excel_io import lazy_excel_data, load_excel
+from utils.translation_checkpoint import TranslationCheckpoint, make_job_id
+from utils.memory import compact_dataframe, dataframe_memory_mb, display_memory_report, get_memory_budget
+from utils.price import invalid_price_rows
 
 st.set_page_config(
     page_title="뉴퍼스트몰 업데이트 도구",
@@ -93,17 +97,18 @@ if 'chunk_size' not in st.session_state:
 # 모든 세션 상태 변수 초기화
 if 'chunk_size' not in st.session_state:
     st.session_state.chunk_size = 1000
+if 'chunk_executor' not in st.session_state:
+    st.session_state.chunk_executor = DEFAULT_EXECUTOR
 
 def save_processed_data(df, step):
-    """처리된 데이터를 저장하고 버퍼를 반환하는 함수"""
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
+    """처리된 데이터를 세션에 저장하고 다운로드용 지연 엑셀 변환 함수를 반환하는 함수
     
+    엑셀 변환은 사용자가 다운로드 버튼을 누를 때만 수행됩니다.
+    """
     st.session_state.processed_data = df
     st.session_state.last_processed_file = f"step_{step}_result.xlsx"
     
-    return buffer
+    return lazy_excel_data(df)
 
 # 탭 생성
 tab0, tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
@@ -207,6 +212,15 @@ with tab1:
     )
     st.session_state.chunk_size = chunk_size
     
+    chunk_executor = st.selectbox(
+        "청크 처리 방식",
+        options=list(EXECUTOR_MODES),
+        index=list(EXECUTOR_MODES).index(st.session_state.chunk_executor),
+        format_func=lambda mode: EXECUTOR_LABELS[mode],
+        help="프로세스 풀은 청크를 CPU 코어마다 나눠 처리합니다 (가격 처리 등 계산이 많은 단계에 적합)"
+    )
+    st.session_state.chunk_executor = chunk_executor
+    
     product_db = st.file_uploader(
         "상품 DB 엑셀 파일을 업로드하세요",
         type=['xlsx'],
@@ -232,8 +246,9 @@ with tab1:
             try:
                 with st.spinner("파일 읽는 중..."):
                     # 파일 읽기
-                    product_db_df = pd.read_excel(product_db, engine='openpyxl')
-                    template_df = pd.read_excel(template_file, engine='openpyxl')
+                    # 상품 DB는 템플릿에 있는 컬럼만 병합되므로 해당 컬럼만 읽음
+                    template_df = load_excel(template_file)
+                    product_db_df = load_excel(product_db, usecols=list(template_df.columns))
                 
                 # 데이터 검증 기능 제거됨 (사용자 요청)
                 
@@ -262,23 +277,26 @@ with tab1:
                     # 파일 병합
                     merged_df = merge_files(product_db_df, template_df)
                     
+                    # 값 종류가 적은 컬럼을 범주형으로 압축 (세션 상태 메모리 절약)
+                    memory_before = dataframe_memory_mb(merged_df)
+                    merged_df, memory_report = compact_dataframe(merged_df)
+                    memory_after = dataframe_memory_mb(merged_df)
+                    
                     # 결과 저장
-                    buffer = io.BytesIO()
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        merged_df.to_excel(writer, index=False)
+                    excel_data = lazy_excel_data(merged_df)
                     
                     # 세션 상태 업데이트
                     st.session_state.processed_data = merged_df
                     st.session_state.last_processed_file = "step_1_result.xlsx"
                     
-                    # 메모리 정리
-                    gc.collect()
+                    # 메모리 정리 (메모리 예산에 가까울 때만 가비지 컬렉션)
+                    get_memory_budget().maybe_collect()
                 
                 col1, col2 = st.columns([3, 1])
                 with col1:
                     st.download_button(
                         label="📥 병합된 파일 다운로드",
-                        data=buffer.getvalue(),
+                        data=excel_data,
                         file_name="merged_file.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key="download_1",
@@ -287,6 +305,8 @@ with tab1:
                 with col2:
                     st.success("✅ 병합 완료!")
                 
+                display_memory_report(memory_report, memory_before, memory_after)
+                
             except Exception as e:
                 st.error(f"❌ 파일 처리 중 오류가 발생했습니다: {str(e)}")
 
@@ -307,7 +327,7 @@ with tab2:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="price_processor_2")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
     
     if 'df' in locals():
         # 데이터 검증 기능 제거됨 (사용자 요청)
@@ -323,31 +343,37 @@ with tab2:
                 # 청크 프로세서를 사용한 가격 처리
                 chunk_processor = ChunkProcessor(
                     chunk_size=st.session_state.chunk_size,
-                    show_progress=True
+                    show_progress=True,
+                    executor=st.session_state.chunk_executor
                 )
                 
-                def process_price_chunk(chunk_df):
-                    return calculate_prices_optimized(chunk_df)
-                
+                # 프로세스 풀로 보낼 수 있도록 모듈 최상위 함수를 그대로 전달
                 processed_df = chunk_processor.process_dataframe_in_chunks(
                     df.copy(), 
-                    process_price_chunk
+                    calculate_prices_optimized
                 )
                 
                 multi_progress.complete_step()
                 multi_progress.start_step(1)
                 
                 # 결과 저장
-                buffer = save_processed_data(processed_df, 2)
+                excel_data = save_processed_data(processed_df, 2)
                 
-                # 메모리 정리
-                gc.collect()
+                # 메모리 정리 (메모리 예산에 가까울 때만 가비지 컬렉션)
+                get_memory_budget().maybe_collect()
                 multi_progress.complete_step()
                 multi_progress.complete_all("가격 정보 처리가 완료되었습니다!")
+                
+                # 가격을 계산하지 못하고 건너뛴 행 표시
+                invalid_rows = invalid_price_rows(df)
+                if not invalid_rows.empty:
+                    st.warning(f"⚠️ 가격 오류로 {len(invalid_rows):,}행은 가격을 계산하지 않았습니다 (빈 칸으로 저장).")
+                    with st.expander("건너뛴 행 보기"):
+                        st.dataframe(invalid_rows, use_container_width=True, hide_index=True)
                     
                 st.download_button(
                     label="처리된 파일 다운로드",
-                    data=buffer.getvalue(),
+                    data=excel_data,
                     file_name="price_processed.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     key="download_2"
@@ -377,7 +403,7 @@ with tab3:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="preprocess_category_3")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
     
     if 'df' in locals():
         if st.button("카테고리 전처리 시작", key="preprocess_category_start_3"):
@@ -387,11 +413,11 @@ with tab3:
                     processed_df = preprocess_categories(df)
                     
                     # 결과 저장
-                    buffer = save_processed_data(processed_df, 3)
+                    excel_data = save_processed_data(processed_df, 3)
                     
                     st.download_button(
                         label="전처리된 파일 다운로드",
-                        data=buffer.getvalue(),
+                        data=excel_data,
                         file_name="category_preprocessed.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key="download_3"
@@ -419,7 +445,7 @@ with tab4:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="category_converter_4")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
     
     if 'df' in locals():
         if st.button("카테고리 변환 시작", key="category_convert_4"):
@@ -430,11 +456,11 @@ with tab4:
                     
                     if success:
                         # 결과 저장
-                        buffer = save_processed_data(df, 4)
+                        excel_data = save_processed_data(df, 4)
                         
                         st.download_button(
                             label="변환된 파일 다운로드",
-                            data=buffer.getvalue(),
+                            data=excel_data,
                             file_name="category_converted.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                             key="download_4"
@@ -469,7 +495,7 @@ with tab5:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="option_converter_5")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
 
     if 'df' in locals():
         option_columns = [col for col in df.columns if '옵션입력' in col]
@@ -481,11 +507,11 @@ with tab5:
                         total_cols = len(option_columns)
 
                         for idx, col in enumerate(option_columns):
-                            df[col] = df[col].apply(convert_option_format)
+                            df[col] = convert_option_column(df[col])
                             progress_bar.progress((idx + 1) / total_cols)
 
                         # 결과 저장
-                        buffer = save_processed_data(df, 5)
+                        excel_data = save_processed_data(df, 5)
                         
                         # 결과 미리보기
                         st.subheader("변환 결과 미리보기")
@@ -493,7 +519,7 @@ with tab5:
 
                         st.download_button(
                             label="변환된 파일 다운로드",
-                            data=buffer.getvalue(),
+                            data=excel_data,
                             file_name="option_converted.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                             key="download_5"
@@ -534,7 +560,7 @@ with tab6:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="translator_6")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
 
     if 'df' in locals():
         auth_key = st.text_input("DeepL API 키를 입력하세요", type="password", key="deepl_key_6")
@@ -551,6 +577,13 @@ with tab6:
             key="batch_size_6"
         )
         
+        # 이전 번역 작업 기록 확인 (같은 입력이면 완료된 상품명은 건너뜀)
+        checkpoint_6 = TranslationCheckpoint(make_job_id(df, "상품명"))
+        resume_6 = True
+        if checkpoint_6.exists():
+            st.info(f"💾 중단된 번역 작업 기록이 있습니다: {checkpoint_6.completed_count():,}개 번역 완료")
+            resume_6 = st.checkbox("이전 작업 이어서 번역 (완료된 상품명 건너뛰기)", value=True, key="resume_6")
+        
         if auth_key:
             # 번역 대상 상품명 개수 확인
             total_product_names = len(df[df["상품명"].notna()])
@@ -580,24 +613,39 @@ with tab6:
                 try:
                     multi_progress.start_step(0)
                     
-                    # 상품명 번역 실행 (비동기)
-                    translated_texts = asyncio.run(translate_product_names(
+                    if not resume_6:
+                        checkpoint_6.discard()
+                    
+                    # 상품명 번역 실행 (비동기, 완료된 번역은 체크포인트에 기록)
+                    translated_texts = get_deepl_client().run(translate_product_names(
                         df=df,
                         target_column="상품명",
                         api_key=auth_key,
                         batch_size=batch_size,
-                        use_async=True
+                        use_async=True,
+                        checkpoint=checkpoint_6
                     ))
+                    failed_count = sum(
+                        1 for source, translated in zip(df["상품명"].astype(object).fillna("").astype(str), translated_texts)
+                        if source.strip() and not translated
+                    )
                     df["상품명"] = translated_texts
                     
+                    # 모두 번역되면 작업 기록 삭제, 실패가 있으면 다음 실행에서 이어서 번역
+                    if failed_count == 0:
+                        checkpoint_6.discard()
+                    else:
+                        st.warning(f"⚠️ {failed_count:,}개 상품명이 번역되지 않았습니다. "
+                                   f"같은 파일로 다시 번역하면 완료된 상품명은 건너뜁니다.")
+                    
                     multi_progress.complete_step()
                     multi_progress.start_step(1)
                     
                     # 결과 저장
-                    buffer = save_processed_data(df, 6)
+                    excel_data = save_processed_data(df, 6)
                     
-                    # 메모리 정리
-                    gc.collect()
+                    # 메모리 정리 (메모리 예산에 가까울 때만 가비지 컬렉션)
+                    get_memory_budget().maybe_collect()
                     multi_progress.complete_step()
                     multi_progress.complete_all("번역이 완료되었습니다!")
                         
@@ -607,7 +655,7 @@ with tab6:
 
                     st.download_button(
                         label="📥 번역 완료 파일 다운로드",
-                        data=buffer.getvalue(),
+                        data=excel_data,
                         file_name="translated_products.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key="download_6"
@@ -644,7 +692,7 @@ with tab7:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="option_translator_7")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
 
     if 'df' in locals():
         # API 키 입력
@@ -658,8 +706,7 @@ with tab7:
                 # 옵션 형식 데이터 확인
                 option_data_count = 0
                 for col in option_columns:
-                    option_mask = df[col].apply(lambda x: is_option_format(str(x)) if pd.notna(x) else False)
-                    option_data_count += option_mask.sum()
+                    option_data_count += count_option_values(df[col])
                 
                 st.info(f"📋 발견된 옵션 컬럼: {', '.join(option_columns)}")
                 st.info(f"🎯 번역 가능한 옵션 데이터: {option_data_count}개")
@@ -668,10 +715,7 @@ with tab7:
                 selected_columns = option_columns
                 
                 # 번역 예상 정보 표시
-                total_option_texts = sum(
-                    df[col].apply(lambda x: is_option_format(str(x)) if pd.notna(x) else False).sum()
-                    for col in selected_columns
-                )
+                total_option_texts = sum(count_option_values(df[col]) for col in selected_columns)
                 
                 if total_option_texts > 0:
                     # 시간 및 사용량 추정
@@ -693,38 +737,64 @@ with tab7:
                     help="여러 옵션 컬럼을 동시에 번역하여 처리 시간을 단축합니다."
                 )
                 
+                # 이전 번역 작업 기록 확인 (같은 입력이면 완료된 색상은 건너뜀)
+                checkpoint_7 = TranslationCheckpoint(make_job_id(df, selected_columns))
+                resume_7 = True
+                if checkpoint_7.exists():
+                    st.info(f"💾 이전 번역 작업 기록이 있습니다: {checkpoint_7.completed_count():,}개 색상 번역 완료")
+                    resume_7 = st.checkbox("이전 작업 이어서 번역 (완료된 색상 건너뛰기)", value=True, key="resume_7")
+                
                 if st.button("옵션 번역 시작", key="option_translate_7"):
                     # 병렬 번역 매니저 생성
                     parallel_manager = ParallelTranslationManager(api_key, batch_size=5)
                     
+                    if not resume_7:
+                        checkpoint_7.discard()
+                    
                     try:
                         if use_parallel and len(selected_columns) > 1:
                             st.info("🚀 병렬 처리 모드로 번역을 시작합니다...")
                             
                             # 병렬 번역 실행
-                            df = asyncio.run(parallel_manager.translate_multiple_option_columns_parallel(
-                                df, selected_columns
+                            df = get_deepl_client().run(parallel_manager.translate_multiple_option_columns_parallel(
+                                df, selected_columns, checkpoint=checkpoint_7
                             ))
+                            failed_count = int(parallel_manager.failed_rows.sum())
                         else:
                             st.info("🔄 순차 처리 모드로 번역을 시작합니다...")
                             
-                            # 순차 번역 실행
-                            for col in selected_columns:
-                                st.write(f"번역 중: {col}")
-                                translated_texts = asyncio.run(translate_option_column_batch(
-                                    df=df,
-                                    target_column=col,
-                                    api_key=api_key,
-                                    batch_size=5,
-                                    use_async=True
-                                ))
-                                df[col] = translated_texts
+                            # 순차 번역 실행 (모든 컬럼이 하나의 연결 풀을 공유)
+                            failed_rows = np.zeros(len(df), dtype=bool)
+                            
+                            async def translate_columns_sequentially():
+                                for col in selected_columns:
+                                    st.write(f"번역 중: {col}")
+                                    translated_texts = await translate_option_column_batch(
+                                        df=df,
+                                        target_column=col,
+                                        api_key=api_key,
+                                        batch_size=5,
+                                        use_async=True,
+                                        checkpoint=checkpoint_7,
+                                        failed_rows=failed_rows
+                                    )
+                                    df[col] = translated_texts
+                            
+                            get_deepl_client().run(translate_columns_sequentially())
+                            failed_count = int(failed_rows.sum())
+                        
+                        # 모두 번역되면 작업 기록 삭제, 실패가 있으면 다음 실행에서 이어서 번역
+                        if failed_count == 0:
+                            checkpoint_7.discard()
+                        else:
+                            st.warning(f"⚠️ {failed_count:,}개 행의 옵션 색상이 번역되지 않았습니다 (원본 유지). "
+                                       f"같은 파일로 다시 번역하면 완료된 색상은 건너뜁니다.")
                         
                         # 결과 저장
-                        buffer = save_processed_data(df, 7)
+                        excel_data = save_processed_data(df, 7)
                         
-                        # 메모리 정리
-                        gc.collect()
+                        # 메모리 정리 (메모리 예산에 가까울 때만 가비지 컬렉션)
+                        get_memory_budget().maybe_collect()
                         
                         st.success("✅ 옵션 번역이 완료되었습니다!")
                             
@@ -735,7 +805,7 @@ with tab7:
 
                         st.download_button(
                             label="📥 번역 완료 파일 다운로드",
-                            data=buffer.getvalue(),
+                            data=excel_data,
                             file_name="option_translated.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                             key="download_7"
@@ -765,7 +835,7 @@ with tab8:
     else:
         uploaded_file = st.file_uploader("엑셀 파일을 업로드하세요", type=['xlsx'], key="chunk_downloader_8")
         if uploaded_file:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+            df = load_excel(uploaded_file)
 
     if 'df' in locals():
         try:
@@ -799,15 +869,13 @@ with tab8:
                     start_idx = i * chunk_size_download
                     end_idx = min((i + 1) * chunk_size_download, total_rows)
 
-                    buffer = io.BytesIO()
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        chunk_df.to_excel(writer, index=False)
+                    excel_data = lazy_excel_data(chunk_df)
 
                     col1, col2 = st.columns([3, 1])
                     with col1:
                         st.download_button(
                             label=f"청크 {i+1} 다운로드 ({start_idx+1:,}~{end_idx:,}행)",
-                            data=buffer.getvalue(),
+                            data=excel_data,
                             file_name=f"chunk_{i+1}.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                             key=f"chunk_{i}_8"
@@ -817,8 +885,8 @@ with tab8:
 
                 st.success("모든 청크 파일이 준비되었습니다!")
                 
-                # 메모리 정리
-                gc.collect()
+                # 메모리 정리 (메모리 예산에 가까울 때만 가비지 컬렉션)
+                get_memory_budget().maybe_collect()
 
         except Exception as e:
             st.error(f"파일 처리 중 오류가 발생했습니다: {str(e)}")
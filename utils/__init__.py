@@ -1,9 +1,9 @@
 # 캐시 기능이 있는 translate.py는 사용하지 않음 (translate_simplified.py 사용)
 from .analyze import analyze_product_names
-from .option import convert_option_format, translate_option_column
+from .option import convert_option_format, convert_option_column, translate_option_column
 from .option_translate import translate_option_colors, translate_option_batch, is_option_format
 from .price import calculate_prices, calculate_prices_optimized
-from .category import convert_categories
+from .category import convert_categories, process_categories
 from .merge import merge_files
 from .preprocess_category import preprocess_categories
 from .validation import DataValidator, display_validation_results
@@ -16,12 +16,14 @@ from .progress import (
 __all__ = [
     'analyze_product_names',
     'convert_option_format',
+    'convert_option_column',
     'translate_option_column',
     'translate_option_colors',
     'translate_option_batch',
     'is_option_format',
     'calculate_prices',
     'convert_categories',
+    'process_categories',
     'merge_files',
     'preprocess_categories'
 ]
\ No newline at end of file
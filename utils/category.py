@@ -1,6 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from utils.category_table import get_category_table
+from utils.memory import expand_unique_values, factorize_pairs
+from utils.preprocess_category import (
+    MAIN_CATEGORY_COLUMN, SUB_CATEGORY_COLUMN, RECOMMEND_CATEGORY_COLUMN,
+    fill_empty_sub_categories, report_category_results, unify_recommend_separator
+)
+
 def convert_categories(df):
     """
     전처리된 카테고리를 코드로 변환하는 함수
+
+    코드는 카테고리 매핑 파일(utils/data/category_mappings.json)에서 읽습니다.
     Args:
         df: 데이터프레임
     Returns:
@@ -8,127 +20,96 @@ def convert_categories(df):
     """
     try:
         # 필수 컬럼 체크
-        required_columns = ['상품분류 번호', '상품분류 신상품영역']
+        required_columns = [MAIN_CATEGORY_COLUMN, SUB_CATEGORY_COLUMN]
         if not all(col in df.columns for col in required_columns):
             return df, False
-        
-        # 거실가구 카테고리 코드 매핑
-        living_room_codes = {
-            '거실수납장': '71',
-            '소파': '72',
-            '진열장/장식장': '73',
-            '소파테이블': '141'
-        }
-        
-        # 침실가구 카테고리 코드 매핑
-        bedroom_codes = {
-            '침대': '76',
-            '매트리스': '77',
-            '침실수납장': '78',
-            '화장대': '79',
-            '행거/드레스룸': '80',
-            '거울': '81',
-            '협탁': '82'
-        }
-        
-        # 주방가구 카테고리 코드 매핑
-        kitchen_codes = {
-            '주방수납장': '85',
-            '렌지대/식탁렌지대': '86',
-            '식탁': '87',
-            '식탁의자/벤치': '88',
-            '홈바': '89',
-            '주방용품/기타': '131'
-        }
-        
-        # 서재가구 카테고리 코드 매핑
-        study_codes = {
-            '책상': '93',
-            '좌식책상': '94',
-            '책장/책꽂이': '95',
-            '서재수납장': '96',
-            '선반/받침대': '97'
-        }
-        
-        # 수납가구 카테고리 코드 매핑
-        storage_codes = {
-            '일반수납장': '99',
-            '틈새장': '100',
-            '선반장': '101',
-            '신발장': '102',
-            '수납박스': '103'
-        }
-        
-        # 의자 카테고리 코드 매핑
-        chair_codes = {
-            '사무용/학생용 의자': '105',
-            '게이밍/PC방 의자': '106',
-            '인테리어 의자': '107',
-            '스툴': '108',
-            '리클라이너': '109',
-            '기타 의자': '110'
-        }
-        
-        # 아웃도어 카테고리 코드 매핑
-        outdoor_codes = {
-            '의자': '113',
-            '테이블': '112'
-        }
-        
+
+        # (메인, 하위) 고유 쌍 단위로 처리
+        table = get_category_table()
+        pair_codes, main_categories, sub_categories = factorize_pairs(
+            df[MAIN_CATEGORY_COLUMN], df[SUB_CATEGORY_COLUMN]
+        )
+        groups = table.canonicalize(main_categories)
+
+        # (대표 카테고리, 하위 카테고리)로 코드 조회, 코드가 없으면 기존 값 유지
+        codes = table.lookup_codes(groups, sub_categories)
+        has_code = pd.notna(codes)
+        etc = main_categories.isin(table.etc_categories).to_numpy()
+
+        new_main_categories = main_categories.to_numpy(dtype=object, copy=True)
+        new_main_categories[has_code] = codes[has_code]
+        new_main_categories[etc] = table.etc_code
+
         # 결과를 저장할 데이터프레임 복사
         result_df = df.copy()
-        
-        # 각 카테고리별 처리
-        category_mapping = {
-            '거실가구': living_room_codes,
-            '침실가구': bedroom_codes,
-            '주방가구': kitchen_codes,
-            '서재가구': study_codes,
-            '수납': storage_codes,
-            '수납가구': storage_codes,
-            '의자': chair_codes,
-            '의자/스툴': chair_codes,
-            '아웃도어': outdoor_codes,
-            '가든 아웃도어': outdoor_codes
-        }
-        
-        # 기타 카테고리 처리 (반려동물, 업소용가구, 일반상품)
-        etc_categories = ['반려동물', '업소용가구', '일반상품']
-        etc_mask = df['상품분류 번호'].isin(etc_categories)
-        if etc_mask.any():
-            result_df.loc[etc_mask, '상품분류 번호'] = '114'  # 기타소품 코드
-        
-        # 각 카테고리별 매핑 적용
-        for category, codes in category_mapping.items():
-            if category in ['수납', '수납가구']:
-                if category == '수납':  # 수납 카테고리 처리 시에만 실행
-                    mask = df['상품분류 번호'].isin(['수납', '수납가구'])
-                else:
-                    continue
-            elif category in ['의자', '의자/스툴']:
-                if category == '의자':  # 의자 카테고리 처리 시에만 실행
-                    mask = df['상품분류 번호'].isin(['의자', '의자/스툴'])
-                else:
-                    continue
-            elif category in ['아웃도어', '가든 아웃도어']:
-                if category == '아웃도어':  # 아웃도어 카테고리 처리 시에만 실행
-                    mask = df['상품분류 번호'].isin(['아웃도어', '가든 아웃도어'])
-                else:
-                    continue
-            else:
-                mask = df['상품분류 번호'] == category
-            
-            if mask.any():
-                for subcategory, code in codes.items():
-                    subcategory_mask = mask & (df['상품분류 신상품영역'] == subcategory)
-                    result_df.loc[subcategory_mask, '상품분류 번호'] = code
-                
-                # 매핑 결과 출력
-                print(f"\n{category} 코드 변환 결과:")
-                print(result_df.loc[mask, '상품분류 번호'].value_counts())
-        
+        result_df[MAIN_CATEGORY_COLUMN] = expand_unique_values(
+            new_main_categories, pair_codes, df[MAIN_CATEGORY_COLUMN]
+        )
+
+        # 매핑 결과 출력
+        mask = groups.notna().to_numpy()
+        counts = np.bincount(pair_codes, minlength=len(new_main_categories))
+        report_category_results(groups[mask], pd.Series(new_main_categories[mask]), counts[mask],
+                                [], "코드 변환 결과", MAIN_CATEGORY_COLUMN)
+
         return result_df, True
-        
+
     except Exception as e:
         print(f"카테고리 변환 중 오류 발생: {str(e)}")
         return df, False
+
+def process_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    카테고리 전처리(3단계)와 코드 변환(4단계)을 한 번에 수행
+
+    preprocess_categories 후 convert_categories를 실행한 것과 같은 결과를
+    카테고리별 마스크 반복 없이 데이터프레임 복사 한 번과 조회 한 번으로 만듭니다.
+
+    Args:
+        df: 데이터프레임
+    Returns:
+        카테고리 코드가 적용된 데이터프레임
+    Raises:
+        ValueError: 필수 컬럼이 없는 경우
+    """
+    required_columns = [MAIN_CATEGORY_COLUMN, SUB_CATEGORY_COLUMN]
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"데이터프레임에 다음 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
+
+    table = get_category_table()
+    result_df = df.copy()
+
+    # 상품분류 추천상품영역의 구분자 통일 ('|' -> ',')
+    if RECOMMEND_CATEGORY_COLUMN in result_df.columns:
+        result_df[RECOMMEND_CATEGORY_COLUMN] = unify_recommend_separator(result_df[RECOMMEND_CATEGORY_COLUMN])
+
+    # 빈 값을 '기타'로 채우고 (메인, 하위) 고유 쌍 단위로 처리
+    sub_categories = fill_empty_sub_categories(df[SUB_CATEGORY_COLUMN])
+    pair_codes, main_categories, sub_categories = factorize_pairs(df[MAIN_CATEGORY_COLUMN], sub_categories)
+    groups = table.canonicalize(main_categories)
+
+    # (메인, 하위) 쌍을 조회표에서 한 번에 찾기
+    normalized, codes = table.normalize_sub_categories(groups, sub_categories)
+
+    # 매핑 대상 메인 카테고리: 매핑에 없는 하위 카테고리는 NaN, 코드가 없으면 메인 카테고리 유지
+    mapped = groups.notna().to_numpy()
+    etc = main_categories.isin(table.etc_categories).to_numpy()
+
+    new_sub_categories = sub_categories.to_numpy(dtype=object, copy=True)
+    new_sub_categories[mapped] = normalized[mapped]
+    new_sub_categories[etc] = table.etc_sub_category
+
+    has_code = pd.notna(codes)
+    new_main_categories = main_categories.to_numpy(dtype=object, copy=True)
+    new_main_categories[has_code] = codes[has_code]
+    new_main_categories[etc] = table.etc_code
+
+    result_df[MAIN_CATEGORY_COLUMN] = expand_unique_values(new_main_categories, pair_codes, df[MAIN_CATEGORY_COLUMN])
+    result_df[SUB_CATEGORY_COLUMN] = expand_unique_values(new_sub_categories, pair_codes, df[SUB_CATEGORY_COLUMN])
+
+    counts = np.bincount(pair_codes, minlength=len(new_main_categories))
+    print(f"카테고리 처리 결과: 코드 변환 {int(counts[has_code | etc].sum()):,}행, "
+          f"매핑 없음 {int(counts[mapped & pd.isna(normalized)].sum()):,}행")
+
+    return result_df
@@ -0,0 +1,150 @@
+"""
+카테고리 매핑 테이블 - JSON 데이터 파일을 한 번 읽어 조회 인덱스로 컴파일
+
+utils/data/category_mappings.json(또는 NF_MALL_CATEGORY_MAPPINGS 환경 변수로 지정한 파일)에
+메인 카테고리별 별칭, 하위 카테고리 정규화 규칙, 카테고리 코드를 정의합니다.
+카테고리를 추가하거나 바꿀 때는 이 파일만 수정하면 됩니다.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# 매핑 파일 경로 (환경 변수로 변경 가능)
+DEFAULT_CATEGORY_MAPPING_PATH = os.environ.get(
+    'NF_MALL_CATEGORY_MAPPINGS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'category_mappings.json')
+)
+
+class CategoryTable:
+    """컴파일된 카테고리 매핑 테이블"""
+
+    def __init__(self, data: Dict):
+        """
+        Args:
+            data: 매핑 파일 내용 ({'categories': [...], 'etc': {...}})
+
+        Raises:
+            ValueError: 카테고리 이름이나 별칭이 중복된 경우
+        """
+        self.aliases: Dict[str, str] = {}  # 메인 카테고리 이름/별칭 → 대표 이름
+        self.sub_category_mappings: Dict[str, Dict[str, str]] = {}
+        self.code_mappings: Dict[str, Dict[str, str]] = {}
+
+        for category in data.get('categories', []):
+            name = category['name']
+            for alias in [name] + list(category.get('aliases', [])):
+                if alias in self.aliases:
+                    raise ValueError(f"중복된 카테고리 이름입니다: {alias}")
+                self.aliases[alias] = name
+            self.sub_category_mappings[name] = dict(category.get('sub_categories', {}))
+            self.code_mappings[name] = {sub: str(code) for sub, code in category.get('codes', {}).items()}
+
+        # 하위 카테고리와 관계없이 한 가지로 처리하는 기타 카테고리
+        etc = data.get('etc', {})
+        self.etc_categories: List[str] = list(etc.get('categories', []))
+        self.etc_sub_category: str = etc.get('sub_category', '기타소품')
+        self.etc_code: str = str(etc.get('code', '114'))
+        duplicated = [name for name in self.etc_categories if name in self.aliases]
+        if duplicated:
+            raise ValueError(f"중복된 카테고리 이름입니다: {', '.join(duplicated)}")
+
+        # (대표 카테고리, 원본 하위 카테고리) → (정규화된 하위 카테고리, 코드)
+        keys, sub_categories, codes = [], [], []
+        for name, mapping in self.sub_category_mappings.items():
+            for raw_sub_category, sub_category in mapping.items():
+                keys.append((name, raw_sub_category))
+                sub_categories.append(sub_category)
+                codes.append(self.code_mappings[name].get(sub_category, np.nan))
+        self._sub_category_index = self._make_index(keys)
+        self._sub_categories = np.array(sub_categories, dtype=object)
+        self._sub_category_codes = np.array(codes, dtype=object)
+
+        # (대표 카테고리, 정규화된 하위 카테고리) → 코드
+        keys, codes = [], []
+        for name, mapping in self.code_mappings.items():
+            for sub_category, code in mapping.items():
+                keys.append((name, sub_category))
+                codes.append(code)
+        self._code_index = self._make_index(keys)
+        self._codes = np.array(codes, dtype=object)
+
+    @staticmethod
+    def _make_index(keys: List[Tuple[str, str]]) -> pd.MultiIndex:
+        if not keys:
+            return pd.MultiIndex.from_arrays([[], []])
+        return pd.MultiIndex.from_tuples(keys)
+
+    @staticmethod
+    def _positions(index: pd.MultiIndex, groups: pd.Series, sub_categories: pd.Series) -> np.ndarray:
+        """(대표 카테고리, 하위 카테고리) 쌍의 인덱스 위치 (없으면 -1)"""
+        return index.get_indexer(pd.MultiIndex.from_arrays([groups, sub_categories]))
+
+    @staticmethod
+    def _take(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """위치에 해당하는 값 배열 (위치가 -1이면 NaN)"""
+        result = np.full(len(positions), np.nan, dtype=object)
+        matched = positions >= 0
+        result[matched] = values[positions[matched]]
+        return result
+
+    @property
+    def categories(self) -> List[str]:
+        """대표 카테고리 이름 목록 (기타 카테고리 제외)"""
+        return list(self.sub_category_mappings)
+
+    def is_supported(self, category: str) -> bool:
+        """매핑이 정의된 메인 카테고리(별칭, 기타 카테고리 포함)인지 확인"""
+        return category in self.aliases or category in self.etc_categories
+
+    def canonicalize(self, main_categories: pd.Series) -> pd.Series:
+        """메인 카테고리를 대표 이름으로 변환 (별칭 통합, 매핑이 없으면 NaN)"""
+        return main_categories.map(self.aliases)
+
+    def normalize_sub_categories(self, groups: pd.Series,
+                                 sub_categories: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        원본 하위 카테고리를 정규화하고 코드 조회
+
+        Args:
+            groups: canonicalize로 변환한 대표 카테고리
+            sub_categories: 원본 하위 카테고리
+
+        Returns:
+            (정규화된 하위 카테고리 배열, 코드 배열) - 매핑이 없으면 NaN
+        """
+        positions = self._positions(self._sub_category_index, groups, sub_categories)
+        return self._take(self._sub_categories, positions), self._take(self._sub_category_codes, positions)
+
+    def lookup_codes(self, groups: pd.Series, sub_categories: pd.Series) -> np.ndarray:
+        """정규화된 하위 카테고리의 코드 조회 (매핑이 없으면 NaN)"""
+        return self._take(self._codes, self._positions(self._code_index, groups, sub_categories))
+
+def load_category_table(path: str) -> CategoryTable:
+    """
+    매핑 파일을 읽어 카테고리 테이블로 컴파일
+
+    Raises:
+        ValueError: 파일을 읽을 수 없거나 형식이 잘못된 경우
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return CategoryTable(data)
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"카테고리 매핑 파일을 읽을 수 없습니다 ({path}): {str(e)}") from e
+
+@lru_cache(maxsize=None)
+def _get_cached_table(path: str) -> CategoryTable:
+    return load_category_table(path)
+
+def get_category_table(path: Optional[str] = None) -> CategoryTable:
+    """카테고리 테이블 반환 (파일별로 한 번만 컴파일)"""
+    return _get_cached_table(os.path.abspath(path or DEFAULT_CATEGORY_MAPPING_PATH))
+
+def reload_category_table():
+    """매핑 파일을 수정한 뒤 다시 컴파일하도록 캐시 비우기"""
+    _get_cached_table.cache_clear()
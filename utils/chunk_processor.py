@@ -1,27 +1,247 @@
 import pandas as pd
 import streamlit as st
-from typing import Iterator, Callable, Any, Optional, Dict, List
+from typing import Iterator, Callable, Any, Optional, Dict, List, Union
 import time
 from functools import wraps
-import gc
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from openpyxl import load_workbook
+from utils.excel_io import write_excel
+from utils.memory import MemoryBudget, get_gc_stats, get_memory_budget
+
+# 청크 실행 방식: serial(순차), thread(스레드 풀), process(프로세스 풀)
+EXECUTOR_MODES = ('serial', 'thread', 'process')
+EXECUTOR_LABELS = {'serial': '순차 처리', 'thread': '스레드 풀', 'process': '프로세스 풀'}
+
+# 기본 실행 방식 (환경 변수로 변경 가능, 잘못된 값이면 순차 처리)
+DEFAULT_EXECUTOR = os.environ.get('NF_MALL_CHUNK_EXECUTOR', 'serial')
+if DEFAULT_EXECUTOR not in EXECUTOR_MODES:
+    DEFAULT_EXECUTOR = 'serial'
+
+# 작업자당 동시에 보내 두는 청크 수 (메모리에 올라가는 청크 수 제한)
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+def _excel_column_names(header_row: tuple) -> List[str]:
+    """헤더 행을 pandas.read_excel과 같은 규칙의 컬럼명으로 변환 (빈 칸, 중복 처리)"""
+    names = []
+    seen = {}
+    for i, value in enumerate(header_row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _infer_chunk_dtypes(chunk: pd.DataFrame) -> Dict[str, Any]:
+    """첫 청크로 컬럼별 dtype 결정 (정수는 결측값을 허용하는 Int64 사용)"""
+    dtypes = {}
+    inferred = chunk.infer_objects()
+    for column, dtype in inferred.dtypes.items():
+        if chunk[column].isna().all():
+            dtypes[column] = object
+        elif dtype.kind == 'i':
+            dtypes[column] = 'Int64'
+        elif dtype.kind == 'f':
+            dtypes[column] = 'float64'
+        elif dtype.kind == 'b':
+            dtypes[column] = 'boolean'
+        elif dtype.kind == 'M':
+            dtypes[column] = 'datetime64[ns]'
+        else:
+            dtypes[column] = object
+    return dtypes
+
+def _build_chunk(rows: List[tuple], columns: List[str],
+                 dtypes: Optional[Dict[str, Any]]) -> tuple:
+    """
+    읽은 행들로 청크 데이터프레임 생성
+    
+    Returns:
+        (청크, 다음 청크에 적용할 dtype) - 변환에 실패한 컬럼은 object로 변경
+    """
+    chunk = pd.DataFrame.from_records(rows, columns=columns)
+    
+    if dtypes is None:
+        dtypes = _infer_chunk_dtypes(chunk)
+    
+    dtypes = dict(dtypes)
+    for column, column_dtype in dtypes.items():
+        if column not in chunk.columns or column_dtype is object:
+            continue
+        # 정수 컬럼에 소수가 나오면 float64, 그 외 변환 실패는 object로 완화
+        fallbacks = [column_dtype, 'float64', object] if column_dtype == 'Int64' else [column_dtype, object]
+        for candidate in fallbacks:
+            try:
+                chunk[column] = chunk[column].astype(candidate)
+                dtypes[column] = candidate
+                break
+            except (ValueError, TypeError):
+                continue
+    
+    return chunk, dtypes
+
+def read_excel_in_chunks(
+    file: Any,
+    chunk_size: int = 1000,
+    sheet_name: Optional[str] = None,
+    dtype: Optional[Dict[str, Any]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    엑셀 파일을 chunk_size행씩 읽어 데이터프레임으로 반환 (openpyxl 읽기 전용 모드)
+    
+    전체 시트를 메모리에 올리지 않으므로 메모리 사용량은 청크 하나 크기에 비례합니다.
+    dtype을 지정하지 않으면 첫 청크로 컬럼별 dtype을 정하고 이후 청크도 같은 dtype으로 맞춥니다.
+    변환할 수 없는 값이 나온 컬럼은 이후 청크부터 object로 읽습니다.
+    
+    Args:
+        file: 파일 경로 또는 파일 객체 (Streamlit 업로드 파일 포함)
+        chunk_size: 청크당 행 수
+        sheet_name: 시트 이름 (None이면 첫 번째 시트)
+        dtype: 컬럼별 dtype 지정
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _excel_column_names(header)
+        dtypes = dict(dtype) if dtype else None
+        
+        buffer = []
+        for row in rows:
+            # 완전히 빈 행은 건너뜀 (pandas.read_excel과 동일)
+            if all(value is None for value in row):
+                continue
+            if len(row) < len(columns):
+                row = row + (None,) * (len(columns) - len(row))
+            buffer.append(row[:len(columns)])
+            if len(buffer) >= chunk_size:
+                chunk, dtypes = _build_chunk(buffer, columns, dtypes)
+                buffer = []
+                yield chunk
+        
+        if buffer:
+            chunk, dtypes = _build_chunk(buffer, columns, dtypes)
+            yield chunk
+    finally:
+        workbook.close()
 
 class ChunkProcessor:
     """청크 단위 데이터 처리 클래스"""
     
-    def __init__(self, chunk_size: int = 1000, show_progress: bool = True):
+    def __init__(self, chunk_size: int = 1000, show_progress: bool = True,
+                 executor: str = DEFAULT_EXECUTOR, max_workers: Optional[int] = None,
+                 memory_budget: Optional[MemoryBudget] = None):
+        """
+        Args:
+            chunk_size: 청크당 행 수
+            show_progress: Streamlit 진행률 표시 여부
+            executor: 청크 실행 방식 ('serial', 'thread', 'process')
+            max_workers: 작업자 수 (None이면 CPU 코어 수)
+            memory_budget: 메모리 예산 (None이면 전역 예산 사용)
+        
+        process 방식은 처리 함수가 모듈 최상위 함수여야 합니다 (pickle로 전달).
+        """
+        if executor not in EXECUTOR_MODES:
+            raise ValueError(f"지원하지 않는 실행 방식입니다: {executor} ({', '.join(EXECUTOR_MODES)})")
         self.chunk_size = chunk_size
         self.show_progress = show_progress
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.memory_budget = memory_budget or get_memory_budget()
+        self.gc_seconds = 0.0  # 마지막 처리 중 가비지 컬렉션에 쓴 시간
         self.processed_chunks = 0
         self.total_chunks = 0
         self.start_time = None
     
+    def _make_pool(self):
+        """실행 방식에 맞는 작업자 풀 생성"""
+        if self.executor == 'thread':
+            return ThreadPoolExecutor(max_workers=self.max_workers)
+        # Streamlit 서버 스레드에서 fork하지 않도록 spawn 사용
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    
+    def _iter_processed_chunks(self, df: pd.DataFrame, process_func: Callable, kwargs: Dict[str, Any]):
+        """청크를 처리하며 완료 순서대로 (청크 번호, 결과) 반환"""
+        starts = range(0, len(df), self.chunk_size)
+        
+        if self.executor == 'serial':
+            for index, start in enumerate(starts):
+                chunk = df.iloc[start:start + self.chunk_size].copy()
+                yield index, process_func(chunk, **kwargs)
+                
+                # 메모리 정리 (예산에 가까울 때만 가비지 컬렉션)
+                del chunk
+                self.memory_budget.maybe_collect()
+            return
+        
+        def prepare(start):
+            """(작업자에 보낼 청크, 이 프로세스 RSS에 잡히지 않는 청크 크기)"""
+            chunk = df.iloc[start:start + self.chunk_size]
+            if self.executor == 'thread':
+                # 복사본은 이미 이 프로세스 RSS에 포함됨
+                return chunk.copy(), 0
+            # 프로세스 풀은 제출할 때 청크를 직렬화하므로 복사하지 않고 전달 (작업자 메모리는 청크 크기로 근사)
+            return chunk, int(chunk.memory_usage(index=False, deep=True).sum())
+        
+        budget = self.memory_budget
+        pending = {}
+        pending_starts = iter(enumerate(starts))
+        waiting = None  # 예산 초과로 투입을 미룬 청크
+        with self._make_pool() as pool:
+            try:
+                while True:
+                    # 작업자마다 몇 개씩만 미리 보내고, 메모리 예산을 넘으면 처리 중인 청크가 끝날 때까지 대기
+                    while len(pending) < self.max_workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                        if waiting is None:
+                            next_chunk = next(pending_starts, None)
+                            if next_chunk is None:
+                                break
+                            index, start = next_chunk
+                            waiting = (index,) + prepare(start)
+                        index, chunk, nbytes = waiting
+                        if pending and not budget.can_admit(nbytes):
+                            budget.maybe_collect()
+                            break
+                        budget.track(nbytes)
+                        pending[pool.submit(process_func, chunk, **kwargs)] = (index, nbytes)
+                        waiting = None
+                    if not pending:
+                        break
+                    
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, nbytes = pending.pop(future)
+                        budget.release(nbytes)
+                        yield index, future.result()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+            finally:
+                for index, nbytes in pending.values():
+                    budget.release(nbytes)
+    
     def process_dataframe_in_chunks(
         self, 
         df: pd.DataFrame, 
         process_func: Callable[[pd.DataFrame], pd.DataFrame],
         **kwargs
     ) -> pd.DataFrame:
-        """데이터프레임을 청크 단위로 처리"""
+        """
+        데이터프레임을 청크 단위로 처리
+        
+        thread/process 방식은 청크를 작업자에 나눠 처리하고 원래 순서대로 합칩니다.
+        진행률은 호출한 (Streamlit) 스레드에서 청크가 끝날 때마다 갱신합니다.
+        """
         
         if len(df) <= self.chunk_size:
             # 작은 데이터는 청크 처리 없이 바로 처리
@@ -30,8 +250,10 @@ class ChunkProcessor:
         self.total_chunks = (len(df) + self.chunk_size - 1) // self.chunk_size
         self.processed_chunks = 0
         self.start_time = time.time()
+        _, gc_seconds_before = get_gc_stats().snapshot()
         
-        processed_chunks = []
+        processed_chunks = [None] * self.total_chunks
+        processed_rows = 0
         
         # Streamlit 진행률 표시
         if self.show_progress:
@@ -40,14 +262,11 @@ class ChunkProcessor:
             time_text = st.empty()
         
         try:
-            for i in range(0, len(df), self.chunk_size):
-                chunk = df.iloc[i:i + self.chunk_size].copy()
-                
-                # 청크 처리
-                processed_chunk = process_func(chunk, **kwargs)
-                processed_chunks.append(processed_chunk)
+            for index, processed_chunk in self._iter_processed_chunks(df, process_func, kwargs):
+                processed_chunks[index] = processed_chunk
                 
                 self.processed_chunks += 1
+                processed_rows += min(self.chunk_size, len(df) - index * self.chunk_size)
                 
                 # 진행률 업데이트
                 if self.show_progress:
@@ -57,7 +276,7 @@ class ChunkProcessor:
                     # 상태 텍스트 업데이트
                     status_text.text(
                         f"처리 중: {self.processed_chunks:,}/{self.total_chunks:,} 청크 "
-                        f"({i + len(chunk):,}/{len(df):,} 행)"
+                        f"({processed_rows:,}/{len(df):,} 행, {EXECUTOR_LABELS[self.executor]})"
                     )
                     
                     # 예상 완료 시간 계산
@@ -71,19 +290,15 @@ class ChunkProcessor:
                             f"경과 시간: {elapsed_time:.1f}초, "
                             f"예상 완료: {estimated_remaining:.1f}초 후"
                         )
-                
-                # 메모리 정리
-                del chunk
-                if i % (self.chunk_size * 5) == 0:  # 5청크마다 가비지 컬렉션
-                    gc.collect()
             
-            # 결과 합치기
+            # 결과 합치기 (청크 순서 유지)
             result_df = pd.concat(processed_chunks, ignore_index=True)
+            self.gc_seconds = get_gc_stats().snapshot()[1] - gc_seconds_before
             
             if self.show_progress:
                 progress_bar.progress(1.0)
                 total_time = time.time() - self.start_time
-                status_text.text(f"✅ 완료: {len(df):,}행 처리 완료 ({total_time:.1f}초)")
+                status_text.text(f"✅ 완료: {len(df):,}행 처리 완료 ({total_time:.1f}초, GC {self.gc_seconds:.2f}초)")
                 time_text.empty()
             
             return result_df
@@ -94,58 +309,54 @@ class ChunkProcessor:
             raise e
         
         finally:
-            # 메모리 정리
+            # 메모리 정리 (예산에 가까울 때만 가비지 컬렉션)
             del processed_chunks
-            gc.collect()
+            self.memory_budget.maybe_collect()
     
     def process_file_in_chunks(
         self,
-        file_path: str,
+        file_path: Union[str, Any],
         process_func: Callable[[pd.DataFrame], pd.DataFrame],
         output_path: Optional[str] = None,
         **kwargs
     ) -> pd.DataFrame:
-        """파일을 청크 단위로 읽어서 처리"""
+        """파일을 청크 단위로 읽어서 처리 (read_excel_in_chunks로 스트리밍 읽기)"""
+        
+        processed_chunks = []
         
         try:
-            # 파일 크기 확인
-            file_size = pd.read_excel(file_path, nrows=0).shape[0]  # 헤더만 읽어서 구조 확인
-            
             if self.show_progress:
-                st.info(f"📁 파일 청크 처리 시작: {file_path}")
-            
-            processed_chunks = []
-            chunk_reader = pd.read_excel(file_path, chunksize=self.chunk_size)
+                st.info(f"📁 파일 청크 처리 시작: {getattr(file_path, 'name', file_path)}")
             
             self.processed_chunks = 0
             self.start_time = time.time()
+            total_rows = 0
             
             # 진행률 표시 준비
             if self.show_progress:
-                progress_bar = st.progress(0)
                 status_text = st.empty()
             
-            for chunk_num, chunk in enumerate(chunk_reader):
+            for chunk_num, chunk in enumerate(read_excel_in_chunks(file_path, self.chunk_size)):
                 # 청크 처리
                 processed_chunk = process_func(chunk, **kwargs)
                 processed_chunks.append(processed_chunk)
                 
                 self.processed_chunks += 1
+                total_rows += len(chunk)
                 
-                # 진행률 업데이트 (정확한 총 청크 수를 모르므로 근사치 사용)
+                # 진행률 업데이트 (전체 행 수를 미리 알 수 없으므로 누적 행 수 표시)
                 if self.show_progress:
                     status_text.text(
                         f"처리 중: {self.processed_chunks}번째 청크 "
-                        f"({len(chunk):,}행 처리)"
+                        f"(누적 {total_rows:,}행 처리)"
                     )
                 
-                # 메모리 정리
+                # 메모리 정리 (예산에 가까울 때만 가비지 컬렉션)
                 del chunk
-                if chunk_num % 5 == 0:
-                    gc.collect()
+                self.memory_budget.maybe_collect()
             
             # 결과 합치기
-            result_df = pd.concat(processed_chunks, ignore_index=True)
+            result_df = pd.concat(processed_chunks, ignore_index=True) if processed_chunks else pd.DataFrame()
             
             if self.show_progress:
                 total_time = time.time() - self.start_time
@@ -153,7 +364,7 @@ class ChunkProcessor:
             
             # 결과 저장 (선택사항)
             if output_path:
-                result_df.to_excel(output_path, index=False)
+                write_excel({'Sheet1': result_df}, output_path)
                 if self.show_progress:
                     st.success(f"💾 결과 저장 완료: {output_path}")
             
@@ -166,7 +377,7 @@ class ChunkProcessor:
         
         finally:
             del processed_chunks
-            gc.collect()
+            self.memory_budget.maybe_collect()
     
     def split_dataframe_into_chunks(self, df: pd.DataFrame) -> List[pd.DataFrame]:
         """데이터프레임을 청크 단위로 분할"""
@@ -0,0 +1,112 @@
+"""
+DeepL 번역 클라이언트 - 번역 실행 전체에서 HTTP 연결 재사용
+
+상품명/옵션 번역의 모든 요청이 하나의 keep-alive 연결 풀을 공유하므로
+짧은 색상명 요청마다 TLS 핸드셰이크를 반복하지 않습니다.
+"""
+import asyncio
+from typing import Any, Awaitable, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+class DeepLClient:
+    """연결 풀을 소유하는 DeepL 번역 클라이언트"""
+
+    def __init__(self,
+                 limit: int = 32,
+                 limit_per_host: int = 16,
+                 ttl_dns_cache: int = 300,
+                 keepalive_timeout: float = 60.0,
+                 timeout: float = 30.0):
+        """
+        Args:
+            limit: 전체 동시 연결 수 상한
+            limit_per_host: 호스트당 동시 연결 수 상한
+            ttl_dns_cache: DNS 조회 결과 캐시 시간(초)
+            keepalive_timeout: 유휴 연결 유지 시간(초)
+            timeout: 요청 전체 타임아웃(초)
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_session: Optional[requests.Session] = None
+
+    async def get_async_session(self) -> aiohttp.ClientSession:
+        """현재 이벤트 루프에서 사용할 공유 aiohttp 세션 반환"""
+        loop = asyncio.get_running_loop()
+
+        if self._async_session is not None and not self._async_session.closed:
+            if self._async_loop is loop:
+                return self._async_session
+            # 이전 asyncio.run()에서 남은 세션: 해당 루프가 닫혔으면 연결만 분리
+            if self._async_loop is not None and self._async_loop.is_closed():
+                self._async_session.detach()
+            else:
+                await self._async_session.close()
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        self._async_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._async_loop = loop
+        return self._async_session
+
+    async def close_async(self):
+        """aiohttp 세션 종료"""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_loop = None
+
+    @property
+    def sync_session(self) -> requests.Session:
+        """동기 요청용 공유 requests 세션 (연결 풀 재사용)"""
+        if self._sync_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.limit_per_host)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._sync_session = session
+        return self._sync_session
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        번역 코루틴을 실행하고 종료 시 aiohttp 세션을 정리 (asyncio.run 대체)
+
+        실행 중 생성된 모든 번역 작업은 같은 연결 풀을 공유합니다.
+        """
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.close_async()
+
+        return asyncio.run(runner())
+
+    def close(self):
+        """동기 세션 종료"""
+        if self._sync_session is not None:
+            self._sync_session.close()
+            self._sync_session = None
+
+# 전역 클라이언트 인스턴스 (상품명/옵션 번역 전체가 공유)
+_global_client = DeepLClient()
+
+def get_deepl_client() -> DeepLClient:
+    """전역 DeepL 클라이언트 반환"""
+    return _global_client
@@ -0,0 +1,283 @@
+"""
+엑셀 입출력 모듈 - 업로드 파일 읽기 캐시와 다운로드용 엑셀 파일 작성
+
+업로드 파일은 바이트 해시(SHA256)로 파싱 결과를 캐시하므로 위젯 조작으로
+스크립트가 다시 실행되어도 같은 파일을 다시 파싱하지 않습니다.
+
+pd.ExcelWriter(engine='openpyxl')는 워크북 전체를 셀 객체로 메모리에 올린 뒤 저장하므로
+행 수가 많으면 처리 자체보다 엑셀 저장에 더 많은 시간과 메모리가 듭니다.
+xlsxwriter의 constant_memory 모드로 행을 순서대로 흘려 쓰고,
+xlsxwriter가 없으면 openpyxl write_only 모드로 대체합니다.
+"""
+import datetime
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:  # xlsxwriter 미설치 시 openpyxl write_only 사용
+    xlsxwriter = None
+
+try:
+    import python_calamine  # noqa: F401 (pandas calamine 엔진)
+    EXCEL_READ_ENGINE = 'calamine'
+except ImportError:  # calamine 미설치 시 openpyxl(읽기 전용 모드) 사용
+    EXCEL_READ_ENGINE = 'openpyxl'
+
+import streamlit as st
+from openpyxl import Workbook
+
+# pandas 기본값과 같은 날짜 표시 형식
+DATETIME_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+
+# 파이썬 객체로 변환해 두는 행 수
+WRITE_BLOCK_ROWS = 10000
+
+ExcelTarget = Union[str, BinaryIO]
+
+# 파싱 결과 캐시 항목 수 (업로드 파일 단위)
+READ_CACHE_ENTRIES = 6
+
+def _file_bytes(file: Any) -> bytes:
+    """파일 경로, Streamlit 업로드 파일, 파일 객체에서 바이트 읽기"""
+    if isinstance(file, bytes):
+        return file
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return f.read()
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    position = file.tell()
+    data = file.read()
+    file.seek(position)
+    return data
+
+def read_excel_bytes(data: bytes, usecols: Optional[Tuple[str, ...]] = None,
+                     nrows: Optional[int] = None, sheet_name: Union[int, str] = 0) -> pd.DataFrame:
+    """
+    엑셀 바이트를 데이터프레임으로 파싱 (calamine 우선, 실패 시 openpyxl)
+
+    Args:
+        data: 엑셀 파일 바이트
+        usecols: 읽을 컬럼명 (파일에 없는 이름은 무시, None이면 전체)
+        nrows: 읽을 데이터 행 수 (None이면 전체)
+        sheet_name: 시트 이름 또는 번호
+    """
+    wanted = set(usecols) if usecols else None
+    selector = (lambda column: column in wanted) if wanted is not None else None
+
+    engines = [EXCEL_READ_ENGINE] if EXCEL_READ_ENGINE == 'openpyxl' else [EXCEL_READ_ENGINE, 'openpyxl']
+    for i, engine in enumerate(engines):
+        try:
+            return pd.read_excel(io.BytesIO(data), engine=engine, usecols=selector,
+                                 nrows=nrows, sheet_name=sheet_name)
+        except Exception:
+            if i == len(engines) - 1:
+                raise
+
+def read_excel_file(file: Any, usecols: Optional[List[str]] = None,
+                    nrows: Optional[int] = None, sheet_name: Union[int, str] = 0) -> pd.DataFrame:
+    """엑셀 파일 읽기 (캐시 없이, 배치 실행용)"""
+    return read_excel_bytes(_file_bytes(file), tuple(usecols) if usecols else None, nrows, sheet_name)
+
+@st.cache_data(max_entries=READ_CACHE_ENTRIES, show_spinner=False)
+def _read_excel_cached(digest: str, usecols: Optional[Tuple[str, ...]], nrows: Optional[int],
+                       sheet_name: Union[int, str], _data: bytes) -> pd.DataFrame:
+    """바이트 해시를 키로 파싱 결과 캐시 (_data는 해시 대상에서 제외)"""
+    return read_excel_bytes(_data, usecols, nrows, sheet_name)
+
+def load_excel(file: Any, usecols: Optional[List[str]] = None,
+               nrows: Optional[int] = None, sheet_name: Union[int, str] = 0) -> pd.DataFrame:
+    """
+    엑셀 파일 읽기 (같은 내용의 파일은 캐시된 파싱 결과 재사용)
+
+    Args:
+        file: Streamlit 업로드 파일, 파일 경로 또는 파일 객체
+        usecols: 단계에서 필요한 컬럼명만 읽을 때 지정
+        nrows: 앞부분 행만 필요할 때 지정
+        sheet_name: 시트 이름 또는 번호
+
+    Returns:
+        데이터프레임 (캐시 결과의 복사본이므로 수정해도 캐시에 영향 없음)
+    """
+    data = _file_bytes(file)
+    digest = hashlib.sha256(data).hexdigest()
+    return _read_excel_cached(digest, tuple(usecols) if usecols else None, nrows, sheet_name, data)
+
+def _column_values(series: pd.Series) -> List[Any]:
+    """컬럼 값을 파이썬 객체 리스트로 변환 (결측값은 None)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_localize(None)
+        return [None if pd.isna(value) else value.to_pydatetime() for value in series]
+
+    values = series.astype(object).where(series.notna(), None).tolist()
+    return [value.item() if isinstance(value, np.generic) else value for value in values]
+
+def _iter_column_blocks(df: pd.DataFrame):
+    """행 블록 단위로 (시작 행, 컬럼별 값 리스트) 반환 (변환된 값은 한 블록만 메모리에 유지)"""
+    for start in range(0, len(df), WRITE_BLOCK_ROWS):
+        block = df.iloc[start:start + WRITE_BLOCK_ROWS]
+        yield start, [_column_values(block[column]) for column in block.columns]
+
+def _is_string_column(series: pd.Series) -> bool:
+    """결측값을 제외한 모든 값이 문자열인 컬럼인지 확인"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # 범주형 컬럼은 카테고리 값만 확인
+        return pd.api.types.infer_dtype(series.cat.categories, skipna=True) in ('string', 'empty')
+    if pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype):
+        return True
+    return pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+
+def _make_generic_writer(worksheet, date_format) -> Callable:
+    """값 타입이 섞인 컬럼용 쓰기 함수 (날짜 값에만 날짜 형식 적용)"""
+    def write_value(row: int, col: int, value: Any):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            if isinstance(value, pd.Timestamp) and value.tzinfo is not None:
+                value = value.tz_localize(None)
+            worksheet.write_datetime(row, col, value, date_format)
+        elif isinstance(value, (str, bool, int, float)):
+            worksheet.write(row, col, value)
+        else:
+            worksheet.write_string(row, col, str(value))
+    return write_value
+
+def _write_sheet_xlsxwriter(workbook, sheet_name: str, df: pd.DataFrame):
+    """xlsxwriter 워크시트에 행 순서대로 기록 (constant_memory 모드는 행 순서 쓰기 필수)"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    date_format = workbook.add_format({'num_format': DATETIME_FORMAT})
+
+    for col_idx, column in enumerate(df.columns):
+        worksheet.write_string(0, col_idx, str(column))
+
+    # 컬럼별 쓰기 함수를 미리 결정 (문자열 컬럼은 타입 판별 없이 바로 기록)
+    writers: List[Callable] = []
+    for column in df.columns:
+        series = df[column]
+        if _is_string_column(series):
+            writers.append(worksheet.write_string)
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            writers.append(worksheet.write_boolean)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            writers.append(worksheet.write_number)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            writers.append(lambda row, col, value: worksheet.write_datetime(row, col, value, date_format))
+        else:
+            writers.append(_make_generic_writer(worksheet, date_format))
+
+    for start, columns in _iter_column_blocks(df):
+        for offset, row in enumerate(zip(*columns)):
+            excel_row = start + offset + 1
+            for col_idx, value in enumerate(row):
+                if value is not None:
+                    writers[col_idx](excel_row, col_idx, value)
+
+def _write_excel_xlsxwriter(sheets: Dict[str, pd.DataFrame], output: ExcelTarget):
+    """xlsxwriter constant_memory 모드로 저장"""
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_numbers': False,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'remove_timezone': True,
+        'nan_inf_to_errors': True
+    })
+    try:
+        for sheet_name, df in sheets.items():
+            _write_sheet_xlsxwriter(workbook, sheet_name, df)
+    finally:
+        workbook.close()
+
+def _write_excel_openpyxl(sheets: Dict[str, pd.DataFrame], output: ExcelTarget):
+    """openpyxl write_only 모드로 저장"""
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append([str(column) for column in df.columns])
+        for _, columns in _iter_column_blocks(df):
+            for row in zip(*columns):
+                worksheet.append(list(row))
+    workbook.save(output)
+
+def write_excel(sheets: Dict[str, pd.DataFrame], output: ExcelTarget):
+    """
+    여러 시트를 엑셀 파일로 저장 (인덱스 제외, 첫 행은 컬럼명)
+
+    Args:
+        sheets: {시트명: 데이터프레임} (시트명은 엑셀 제한에 맞춰 31자로 자름)
+        output: 파일 경로 또는 바이너리 파일 객체
+    """
+    sheets = {str(name)[:31]: df for name, df in sheets.items()}
+    if xlsxwriter is not None:
+        _write_excel_xlsxwriter(sheets, output)
+    else:
+        _write_excel_openpyxl(sheets, output)
+
+def sheets_to_excel_bytes(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """여러 시트를 엑셀 바이트 데이터로 변환"""
+    buffer = io.BytesIO()
+    write_excel(sheets, buffer)
+    return buffer.getvalue()
+
+def dataframe_to_excel_bytes(df: pd.DataFrame, sheet_name: str = 'Sheet1') -> bytes:
+    """데이터프레임을 엑셀 바이트 데이터로 변환 (다운로드 버튼용)"""
+    return sheets_to_excel_bytes({sheet_name: df})
+
+# 다운로드용 엑셀 변환 결과 캐시 (내용 해시 → 바이트, 최근 항목만 유지)
+EXPORT_CACHE_SIZE = 4
+_export_cache: 'OrderedDict[str, bytes]' = OrderedDict()
+_export_lock = threading.Lock()
+
+def dataframe_content_hash(df: pd.DataFrame) -> str:
+    """데이터프레임 내용(컬럼명, dtype, 값) 해시"""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    for column in df.columns:
+        series = df[column]
+        # pandas 문자열 dtype은 object로 바꿔 해시하는 편이 훨씬 빠름
+        if pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype):
+            series = series.astype(object)
+        digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def cached_excel_bytes(df: pd.DataFrame, content_hash: Optional[str] = None,
+                       sheet_name: str = 'Sheet1') -> bytes:
+    """
+    데이터프레임을 엑셀 바이트로 변환 (같은 내용이면 이전 변환 결과 재사용)
+
+    Args:
+        df: 변환할 데이터프레임
+        content_hash: 미리 계산한 내용 해시 (None이면 계산)
+        sheet_name: 시트명
+    """
+    key = f"{content_hash or dataframe_content_hash(df)}:{sheet_name}"
+    with _export_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+
+    data = dataframe_to_excel_bytes(df, sheet_name)
+
+    with _export_lock:
+        _export_cache[key] = data
+        _export_cache.move_to_end(key)
+        while len(_export_cache) > EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return data
+
+def lazy_excel_data(df: pd.DataFrame, sheet_name: str = 'Sheet1') -> Callable[[], bytes]:
+    """
+    다운로드 버튼용 지연 엑셀 변환 함수 반환
+
+    st.download_button(data=...)에 전달하면 사용자가 다운로드를 누를 때만 엑셀로 변환합니다.
+    내용 해시도 다운로드 시점에 계산하므로 화면을 다시 그릴 때마다 전체 데이터를 해시하지 않으며,
+    같은 내용을 다시 내려받으면 변환 결과를 재사용합니다.
+    """
+    return lambda: cached_excel_bytes(df, None, sheet_name)
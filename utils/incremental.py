@@ -0,0 +1,183 @@
+"""
+증분 업데이트 - 이전 실행과 비교해 바뀐 상품만 다시 처리
+
+상품 키(자체 상품코드 등)별 행 해시(지문)와 최종 출력을 저장해 두고, 새 상품 DB와 비교해
+추가/변경/삭제된 행을 찾습니다. 추가·변경된 행만 파이프라인을 거친 뒤 이전 출력에
+이어 붙이므로, 매주 일부만 바뀌는 카탈로그는 병합·번역 시간이 크게 줄어듭니다.
+"""
+from typing import Dict, Iterable, Optional
+import hashlib
+import os
+
+import pandas as pd
+
+# 지문 저장 디렉터리 (환경 변수로 변경 가능)
+DEFAULT_INCREMENTAL_DIR = os.environ.get(
+    'NF_MALL_INCREMENTAL_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'nf_mall', 'incremental')
+)
+
+# 상품 키로 사용할 컬럼 후보 (앞에서부터 값이 모두 있고 중복이 없는 컬럼 사용)
+KEY_COLUMN_CANDIDATES = ['자체 상품코드', '상품코드', '상품명']
+
+def _key_values(df: pd.DataFrame, key_column: str) -> pd.Series:
+    """상품 키 값 (문자열, 앞뒤 공백 제거)"""
+    return df[key_column].astype(object).where(df[key_column].notna(), '').astype(str).str.strip()
+
+def is_valid_key_column(df: pd.DataFrame, key_column: str) -> bool:
+    """상품 키로 쓸 수 있는 컬럼인지 확인 (빈 값과 중복 없음)"""
+    if key_column not in df.columns:
+        return False
+    keys = _key_values(df, key_column)
+    return not (keys == '').any() and keys.is_unique
+
+def find_key_column(df: pd.DataFrame,
+                    candidates: Iterable[str] = KEY_COLUMN_CANDIDATES) -> Optional[str]:
+    """후보 중 상품 키로 쓸 수 있는 첫 번째 컬럼 (없으면 None)"""
+    for column in candidates:
+        if is_valid_key_column(df, column):
+            return column
+    return None
+
+def row_fingerprints(df: pd.DataFrame, key_column: str) -> pd.Series:
+    """
+    상품 키별 행 해시 계산
+
+    Returns:
+        인덱스가 상품 키, 값이 행 내용 해시(uint64)인 시리즈
+    """
+    values = df.reindex(columns=sorted(df.columns, key=str))
+    # pandas 문자열 dtype은 object로 바꿔 해시하는 편이 훨씬 빠름
+    for column in values.columns:
+        dtype = values[column].dtype
+        if pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
+            values[column] = values[column].astype(object)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.Series(hashes, index=pd.Index(_key_values(df, key_column), name=key_column))
+
+def schema_fingerprint(product_columns: Iterable[str], template_df: pd.DataFrame,
+                       key_column: str, version: str = '') -> str:
+    """
+    처리 조건 지문 (컬럼 구성, 양식 첫 행, 상품 키, 설정 버전)
+
+    이 값이 이전 실행과 다르면 모든 행을 다시 처리해야 합니다.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(map(str, product_columns))).encode())
+    digest.update(repr([(str(column), repr(value)) for column, value in template_df.iloc[0].items()]).encode())
+    digest.update(key_column.encode())
+    digest.update(version.encode())
+    return digest.hexdigest()
+
+def diff_catalog(fingerprints: pd.Series, previous: Optional[pd.Series]) -> Dict[str, pd.Index]:
+    """
+    새 지문과 이전 지문 비교
+
+    Returns:
+        {'added', 'changed', 'removed', 'unchanged'}: 상품 키 인덱스
+        이전 지문이 없으면 모든 행이 추가된 것으로 처리
+    """
+    if previous is None:
+        return {
+            'added': fingerprints.index,
+            'changed': fingerprints.index[:0],
+            'removed': fingerprints.index[:0],
+            'unchanged': fingerprints.index[:0]
+        }
+
+    previous_hashes = previous.reindex(fingerprints.index)
+    existing = previous_hashes.notna().to_numpy()
+    same = existing & (previous_hashes.to_numpy() == fingerprints.to_numpy())
+    return {
+        'added': fingerprints.index[~existing],
+        'changed': fingerprints.index[existing & ~same],
+        'removed': previous.index.difference(fingerprints.index, sort=False),
+        'unchanged': fingerprints.index[same]
+    }
+
+def splice_output(previous_output: Optional[pd.DataFrame], processed: pd.DataFrame,
+                  processed_keys: Iterable[str], keys: pd.Index) -> pd.DataFrame:
+    """
+    다시 처리한 행을 이전 출력에 이어 붙이기
+
+    Args:
+        previous_output: 이전 최종 출력 (인덱스가 상품 키)
+        processed: 추가/변경된 행의 처리 결과 (입력 순서와 같은 행 순서)
+        processed_keys: processed 각 행의 상품 키
+        keys: 새 상품 DB의 상품 키 (최종 출력 행 순서, 삭제된 상품은 제외됨)
+
+    Returns:
+        인덱스가 상품 키인 최종 출력
+    """
+    processed = processed.set_axis(pd.Index(list(processed_keys), name=keys.name), axis=0)
+    if previous_output is None or previous_output.empty:
+        return processed.reindex(keys)
+
+    kept = previous_output[~previous_output.index.isin(processed.index)]
+    kept = kept[kept.index.isin(keys)]
+    frames = [frame for frame in (kept, processed) if not frame.empty]
+    # 범주형 컬럼은 카테고리가 달라 object로 합쳐질 수 있음 (호출 측에서 다시 압축)
+    combined = pd.concat(frames) if frames else processed
+    return combined.reindex(index=keys, columns=previous_output.columns.union(processed.columns, sort=False))
+
+class FingerprintStore:
+    """이전 실행의 행 지문과 최종 출력 저장소 (pickle 파일 하나)"""
+
+    def __init__(self, name: str = 'catalog', directory: str = DEFAULT_INCREMENTAL_DIR):
+        """
+        Args:
+            name: 카탈로그 이름 (카탈로그마다 따로 저장)
+            directory: 저장 디렉터리
+        """
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.pkl")
+
+    def exists(self) -> bool:
+        """이전 실행 기록 존재 여부"""
+        return os.path.exists(self.path)
+
+    def load(self, schema: str) -> Optional[Dict]:
+        """
+        이전 실행 기록 읽기
+
+        Args:
+            schema: 현재 처리 조건 지문 (schema_fingerprint)
+
+        Returns:
+            {'key_column', 'fingerprints', 'output'} 또는 None (기록이 없거나 조건이 바뀐 경우)
+        """
+        if not self.exists():
+            return None
+        try:
+            state = pd.read_pickle(self.path)
+        except Exception as e:
+            print(f"증분 기록을 읽을 수 없습니다 ({self.path}): {str(e)}")
+            return None
+        if state.get('schema') != schema:
+            print("처리 조건(컬럼, 양식, 상품 키)이 바뀌어 전체를 다시 처리합니다.")
+            return None
+        return state
+
+    def save(self, schema: str, key_column: str, fingerprints: pd.Series, output: pd.DataFrame):
+        """현재 실행 결과 저장 (임시 파일에 쓴 뒤 교체하므로 중단되어도 이전 기록 유지)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        pd.to_pickle({
+            'schema': schema,
+            'key_column': key_column,
+            'fingerprints': fingerprints,
+            'output': output
+        }, temp_path)
+        os.replace(temp_path, self.path)
+
+    def discard(self):
+        """이전 실행 기록 삭제 (다음 실행은 전체 처리)"""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            print(f"증분 기록 삭제 오류 ({self.path}): {str(e)}")
+
+def summarize_changes(changes: Dict[str, pd.Index]) -> Dict[str, int]:
+    """변경 내역 건수"""
+    return {kind: len(keys) for kind, keys in changes.items()}
@@ -0,0 +1,303 @@
+"""
+메모리 최적화 - 값 종류가 적은 문자열 컬럼을 범주형(category)으로 압축
+
+병합 결과의 과세구분, 배송지역, 진열상태처럼 모든 행이 몇 가지 값 중 하나인 컬럼은
+범주형으로 저장하면 행마다 문자열 객체를 두지 않고 정수 코드만 저장하므로
+세션 상태에 보관하는 데이터프레임 메모리가 크게 줄어듭니다.
+
+메모리 예산 - 청크마다 gc.collect()를 강제로 호출하는 대신 프로세스 RSS와 처리 중인
+청크 크기를 예산과 비교해, 예산에 가까워졌을 때만 가비지 컬렉션을 하거나 청크 투입을 늦춥니다.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import gc
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 고유값 수가 행 수의 이 비율 이하인 문자열 컬럼만 범주형으로 변환
+COMPACT_MAX_UNIQUE_RATIO = 0.5
+
+# 메모리 예산 (MB, 환경 변수로 변경 가능)
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get('NF_MALL_MEMORY_BUDGET_MB', 2048))
+
+# RSS가 예산의 이 비율을 넘으면 가비지 컬렉션 실행
+GC_TRIGGER_RATIO = 0.8
+
+# 강제 가비지 컬렉션 후 RSS가 예산의 이 비율만큼 더 늘어야 다시 실행
+GC_RETRIGGER_RATIO = 0.1
+
+# 강제 가비지 컬렉션 최소 간격 (초)
+GC_MIN_INTERVAL = 1.0
+
+def is_categorical(series: pd.Series) -> bool:
+    """범주형 컬럼 여부"""
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+def expand_unique_values(values: Iterable[Any], codes: np.ndarray, like: pd.Series) -> pd.Series:
+    """
+    고유값별 결과를 행 단위 시리즈로 펼치기
+
+    Args:
+        values: 고유값별 결과
+        codes: 행별 고유값 위치 (pd.factorize 결과)
+        like: 원본 시리즈 (인덱스, 이름, 범주형 여부를 따름)
+
+    Returns:
+        원본이 범주형이면 범주형, 아니면 object 시리즈
+    """
+    values = np.asarray(list(values), dtype=object)
+    if is_categorical(like):
+        # 결과 값끼리 다시 코드화하고 행 코드만 재배치 (행 단위 문자열 생성 없음)
+        value_codes, categories = pd.factorize(values)
+        data = pd.Categorical.from_codes(value_codes[codes], categories=categories)
+    else:
+        data = values[codes]
+    return pd.Series(data, index=like.index, name=like.name)
+
+def map_unique(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """
+    고유값마다 한 번만 func를 적용해 시리즈 변환 (series.apply(func)와 같은 결과)
+
+    범주형 컬럼은 카테고리에만 func를 적용하고 범주형으로 돌려줍니다.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = [func(value) for value in uniques]
+    if (codes < 0).any():
+        # 결측값은 마지막 위치로 모아서 한 번만 처리
+        codes = np.where(codes < 0, len(values), codes)
+        values.append(func(np.nan))
+    return expand_unique_values(values, codes, series)
+
+def factorize_pairs(first: pd.Series, second: pd.Series) -> Tuple[np.ndarray, pd.Series, pd.Series]:
+    """
+    두 컬럼의 (값, 값) 쌍을 고유 쌍으로 코드화
+
+    범주형 컬럼은 카테고리 코드로 쌍을 만들므로 문자열을 행마다 해시하지 않습니다.
+
+    Returns:
+        (행별 고유 쌍 위치, 고유 쌍의 첫 번째 값, 고유 쌍의 두 번째 값)
+    """
+    codes, pairs = pd.MultiIndex.from_arrays([first, second]).factorize()
+    return (
+        codes,
+        pd.Series(pairs.get_level_values(0).to_numpy(dtype=object), dtype=object),
+        pd.Series(pairs.get_level_values(1).to_numpy(dtype=object), dtype=object)
+    )
+
+def compact_dataframe(df: pd.DataFrame,
+                      max_unique_ratio: float = COMPACT_MAX_UNIQUE_RATIO,
+                      exclude: Optional[Iterable[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    값 종류가 적은 문자열 컬럼을 범주형으로 변환
+
+    Args:
+        df: 데이터프레임
+        max_unique_ratio: 변환 대상 고유값 비율 상한 (고유값 수 / 행 수)
+        exclude: 변환하지 않을 컬럼
+
+    Returns:
+        (변환된 데이터프레임, 컬럼별 메모리 절감 보고서)
+        보고서 컬럼: 컬럼, 고유값 수, 변환 전(KB), 변환 후(KB), 절감률(%)
+    """
+    exclude = set(exclude or [])
+    result_df = df.copy(deep=False)
+    rows = []
+
+    for column in df.columns:
+        series = df[column]
+        if column in exclude or len(series) == 0 or is_categorical(series):
+            continue
+        if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+
+        unique_count = series.nunique(dropna=False)
+        if unique_count > len(series) * max_unique_ratio:
+            continue
+        # 숫자와 문자열이 섞인 컬럼은 가격 계산 등에서 값이 바뀌지 않도록 그대로 둠
+        if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+            continue
+
+        compacted = series.astype('category')
+        before = series.memory_usage(index=False, deep=True)
+        after = compacted.memory_usage(index=False, deep=True)
+        if after >= before:
+            continue
+
+        result_df[column] = compacted
+        rows.append({
+            '컬럼': column,
+            '고유값 수': unique_count,
+            '변환 전(KB)': round(before / 1024, 1),
+            '변환 후(KB)': round(after / 1024, 1),
+            '절감률(%)': round((1 - after / before) * 100, 1)
+        })
+
+    report = pd.DataFrame(rows, columns=['컬럼', '고유값 수', '변환 전(KB)', '변환 후(KB)', '절감률(%)'])
+    return result_df, report.sort_values('변환 전(KB)', ascending=False, ignore_index=True)
+
+def dataframe_memory_mb(df: pd.DataFrame) -> float:
+    """데이터프레임 전체 메모리 사용량 (MB)"""
+    return df.memory_usage(index=True, deep=True).sum() / 1024 / 1024
+
+def display_memory_report(report: pd.DataFrame, before_mb: float, after_mb: float):
+    """범주형 압축 결과 표시"""
+    if report.empty:
+        return
+
+    saved = (1 - after_mb / before_mb) * 100 if before_mb else 0.0
+    with st.expander(f"🗜️ 메모리 최적화: {before_mb:.1f}MB → {after_mb:.1f}MB ({saved:.0f}% 절감, "
+                     f"범주형 변환 {len(report)}개 컬럼)"):
+        st.dataframe(report, use_container_width=True, hide_index=True)
+
+def process_rss_mb() -> Optional[float]:
+    """현재 프로세스의 RSS (MB, 확인할 수 없으면 None)"""
+    try:
+        # /proc/self/statm: 전체 페이지 수, 상주 페이지 수, ...
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    """현재 프로세스의 최대 RSS (MB, 확인할 수 없으면 None) - 줄어들지 않으므로 보고용으로만 사용"""
+    try:
+        import resource
+        # Linux는 KB, macOS는 바이트
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+class GCStats:
+    """gc.callbacks로 가비지 컬렉션 횟수와 소요 시간 누적"""
+
+    def __init__(self):
+        self.collections = 0
+        self.seconds = 0.0
+        self._started: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _callback(self, phase: str, info: Dict[str, Any]):
+        thread_id = threading.get_ident()
+        if phase == 'start':
+            self._started[thread_id] = time.perf_counter()
+            return
+        started = self._started.pop(thread_id, None)
+        if started is not None:
+            with self._lock:
+                self.collections += 1
+                self.seconds += time.perf_counter() - started
+
+    def snapshot(self) -> Tuple[int, float]:
+        """(누적 횟수, 누적 초)"""
+        with self._lock:
+            return self.collections, self.seconds
+
+# 전역 GC 통계
+_gc_stats = None
+
+def get_gc_stats() -> GCStats:
+    """전역 GC 통계 반환 (처음 호출할 때 gc.callbacks에 등록)"""
+    global _gc_stats
+    if _gc_stats is None:
+        _gc_stats = GCStats()
+        gc.callbacks.append(_gc_stats._callback)
+    return _gc_stats
+
+class MemoryBudget:
+    """
+    메모리 예산에 따라 가비지 컬렉션과 청크 투입을 조절
+
+    - maybe_collect: RSS가 예산의 GC_TRIGGER_RATIO를 넘을 때만 gc.collect()
+      (직전 강제 컬렉션 이후 RSS가 예산의 GC_RETRIGGER_RATIO 이상 늘고 GC_MIN_INTERVAL이
+      지나야 다시 실행하므로, 컬렉션으로 줄지 않는 메모리 때문에 매번 실행되지 않음)
+    - can_admit: RSS + 이 프로세스 밖에 있는 청크 크기(track) + 새 청크 크기가 예산 안인지 확인
+      (초과 시 투입 대기)
+
+    track/release에는 RSS에 잡히지 않는 메모리만 넘깁니다 (프로세스 풀 작업자로 보낸 청크).
+    작업자 RSS는 보낸 청크 크기로 근사하며 작업자 자체의 기본 메모리는 포함하지 않습니다.
+    현재 RSS를 알 수 없는 환경(/proc 없음)에서는 항상 투입하고 강제 컬렉션을 하지 않습니다.
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_MEMORY_BUDGET_MB, trigger_ratio: float = GC_TRIGGER_RATIO):
+        self.budget_mb = budget_mb
+        self.trigger_ratio = trigger_ratio
+        self.live_bytes = 0
+        self.forced_collections = 0
+        self._collected_rss: Optional[float] = None  # 직전 강제 컬렉션 후 RSS
+        self._collected_at = 0.0
+        self._lock = threading.Lock()
+        get_gc_stats()
+
+    def track(self, nbytes: int):
+        """처리를 시작한 청크 중 RSS에 잡히지 않는 크기 추가"""
+        with self._lock:
+            self.live_bytes += nbytes
+
+    def release(self, nbytes: int):
+        """처리가 끝난 청크 크기 제외"""
+        with self._lock:
+            self.live_bytes = max(0, self.live_bytes - nbytes)
+
+    def can_admit(self, nbytes: int) -> bool:
+        """새 청크를 예산 안에서 처리할 수 있는지 확인 (RSS를 모르면 항상 허용)"""
+        rss = process_rss_mb()
+        if rss is None:
+            return True
+        return rss + (self.live_bytes + nbytes) / 1024 / 1024 <= self.budget_mb
+
+    def maybe_collect(self) -> bool:
+        """RSS가 기준을 넘었을 때만 가비지 컬렉션 (실행 여부 반환)"""
+        rss = process_rss_mb()
+        if rss is None:
+            return False
+        with self._lock:
+            if rss < self.budget_mb * self.trigger_ratio:
+                self._collected_rss = None
+                return False
+            # 직전 컬렉션 이후 충분히 늘지 않았거나 너무 이르면 건너뜀
+            if self._collected_rss is not None and (
+                    rss - self._collected_rss < self.budget_mb * GC_RETRIGGER_RATIO
+                    or time.monotonic() - self._collected_at < GC_MIN_INTERVAL):
+                return False
+            gc.collect()
+            self.forced_collections += 1
+            # 컬렉션 후 RSS를 기준으로 삼아, 해제되지 않은 만큼은 다음 판단에서 제외
+            self._collected_rss = process_rss_mb() or rss
+            self._collected_at = time.monotonic()
+            return True
+
+    def report(self) -> Dict[str, Any]:
+        """
+        현재 상태
+
+        Returns:
+            {'rss_mb', 'peak_rss_mb', 'budget_mb', 'live_mb', 'gc_collections', 'gc_seconds',
+             'forced_collections'}
+        """
+        collections, seconds = get_gc_stats().snapshot()
+        return {
+            'rss_mb': process_rss_mb(),
+            'peak_rss_mb': peak_rss_mb(),
+            'budget_mb': self.budget_mb,
+            'live_mb': self.live_bytes / 1024 / 1024,
+            'gc_collections': collections,
+            'gc_seconds': seconds,
+            'forced_collections': self.forced_collections
+        }
+
+# 전역 메모리 예산
+_memory_budget = None
+
+def get_memory_budget() -> MemoryBudget:
+    """전역 메모리 예산 반환"""
+    global _memory_budget
+    if _memory_budget is None:
+        _memory_budget = MemoryBudget()
+    return _memory_budget
@@ -1,83 +1,91 @@
 import pandas as pd
-import numpy as np
+
+# 빈 값으로 설정할 컬럼들
+EMPTY_COLUMNS = [
+    "상품코드", "모바일 상품 상세설명 설정", "원산지",
+    "상품배송유형 코드", "검색엔진최적화(SEO) 검색엔진 노출 설정", 
+    "배송비입력", "스토어픽업 설정", "배송비 구분", "배송기간", 
+    "배송방법", "국내/해외배송", "추가입력옵션", "옵션 표시방식"
+]
+
+# 특정 값으로 통일할 컬럼들
+VALUE_MAPPINGS = {
+    "과세구분": "B",
+    "품목 구성방식": "F",
+    "배송정보": "F",
+    "필수여부": "T",
+    "유효기간 사용여부": "N",
+    "배송지역": "서울/경기",
+    "진열상태": "Y",
+    "판매상태": "Y",
+    "상품분류 추천상품영역": "N,N",
+    "상품 전체중량(kg)": "1",
+    "판매가 대체문구 사용": "N",
+    "최소 주문수량(이상)": "1",
+    "적립금": "10",
+    "적립금 구분": "P",
+    "공통이벤트 정보": "Y",
+    "성인인증": "N",
+    "옵션사용": "Y"
+}
+
+# 상세 이미지로 채우는 이미지 컬럼들
+DETAIL_IMAGE_COLUMN = "이미지등록(상세)"
+IMAGE_COLUMNS = ["이미지등록(목록)", "이미지등록(작은목록)", "이미지등록(축소)"]
+
+def _fill_missing(value, index: pd.Index):
+    """결측값을 빈 문자열로 변환 (컬럼 단위, 날짜 컬럼의 NaT는 유지)"""
+    if not isinstance(value, pd.Series):
+        return pd.Series('', index=index, dtype=object) if pd.isna(value) else value
+    if not value.hasnans or pd.api.types.is_datetime64_any_dtype(value.dtype):
+        return value
+    if pd.api.types.is_object_dtype(value.dtype) or pd.api.types.is_string_dtype(value.dtype):
+        return value.fillna('')
+    return value.astype(object).where(value.notna(), '')
 
 def merge_files(product_db_df, template_df):
-    """상품DB와 양식 파일을 병합하는 함수"""
+    """
+    상품DB와 양식 파일을 병합하는 함수
+
+    양식의 컬럼마다 값(상품DB 컬럼 또는 양식 첫 행의 기본값)을 정한 뒤
+    데이터프레임을 한 번에 만듭니다. 상수 컬럼은 생성 시 한 번만 채워집니다.
+    """
     try:
-        # 1단계: 기본 병합
-        # 빈 데이터프레임 생성 (template의 모든 컬럼 포함)
-        result_df = pd.DataFrame(columns=template_df.columns)
-        
-        # product_db의 데이터 복사
-        for col in product_db_df.columns:
-            if col in result_df.columns:
-                result_df[col] = product_db_df[col]
-        
-        # 인덱스 재설정
-        result_df = result_df.reindex(range(len(product_db_df)))
-        
-        # 2단계: 양식 재검사 및 적용
-        # template의 첫 행을 기준으로 모든 컬럼의 형식 확인
+        index = pd.RangeIndex(len(product_db_df))
         template_row = template_df.iloc[0]
+
+        # 1단계: 컬럼별 값 결정
+        columns = {}
         for col in template_df.columns:
-            if col not in result_df.columns:
-                result_df[col] = template_row[col]
-            elif result_df[col].isna().all():  # 컬럼이 모두 비어있는 경우
-                result_df[col] = template_row[col]
-        
-        # 3단계: 필수 값 설정
-        # 빈 값으로 설정할 컬럼들
-        empty_columns = [
-            "상품코드", "모바일 상품 상세설명 설정", "원산지",
-            "상품배송유형 코드", "검색엔진최적화(SEO) 검색엔진 노출 설정", 
-            "배송비입력", "스토어픽업 설정", "배송비 구분", "배송기간", 
-            "배송방법", "국내/해외배송", "추가입력옵션", "옵션 표시방식"
-        ]
-        for col in empty_columns:
-            if col in result_df.columns:
-                result_df[col] = ''
+            if col in EMPTY_COLUMNS:
+                columns[col] = ''
+            elif col in VALUE_MAPPINGS:
+                columns[col] = VALUE_MAPPINGS[col]
+            elif col in product_db_df.columns and product_db_df[col].notna().any():
+                # 상품DB 값 복사 (행 순서 기준)
+                columns[col] = product_db_df[col].reset_index(drop=True)
+            else:
+                # 상품DB에 없거나 모두 비어있는 컬럼은 양식 첫 행의 값 사용
+                columns[col] = template_row[col]
+
+        # 2단계: 이미지 처리 (상세 이미지가 있으면 목록/작은목록/축소 이미지에 사용)
+        if DETAIL_IMAGE_COLUMN in columns:
+            detail_image = columns[DETAIL_IMAGE_COLUMN]
+            for col in IMAGE_COLUMNS:
+                if col not in columns:
+                    continue
+                if isinstance(detail_image, pd.Series):
+                    columns[col] = detail_image.where(detail_image.notna(), columns[col])
+                elif pd.notna(detail_image):
+                    columns[col] = detail_image
 
-        # 특정 값으로 통일할 컬럼들
-        value_mappings = {
-            "과세구분": "B",
-            "품목 구성방식": "F",
-            "배송정보": "F",
-            "필수여부": "T",
-            "유효기간 사용여부": "N",
-            "배송지역": "서울/경기",
-            "진열상태": "Y",
-            "판매상태": "Y",
-            "상품분류 추천상품영역": "N,N",
-            "상품 전체중량(kg)": "1",
-            "판매가 대체문구 사용": "N",
-            "최소 주문수량(이상)": "1",
-            "적립금": "10",
-            "적립금 구분": "P",
-            "공통이벤트 정보": "Y",
-            "성인인증": "N",
-            "옵션사용": "Y"
-        }
-        for col, value in value_mappings.items():
-            if col in result_df.columns:
-                result_df[col] = value
+        # 3단계: 결측값을 빈 문자열로 바꾸고 양식 컬럼 순서대로 한 번에 생성
+        return pd.DataFrame(
+            {col: _fill_missing(value, index) for col, value in columns.items()},
+            index=index,
+            columns=template_df.columns
+        )
 
-        # 4단계: 이미지 처리
-        image_columns = ["이미지등록(목록)", "이미지등록(작은목록)", "이미지등록(축소)"]
-        if "이미지등록(상세)" in result_df.columns:
-            detail_image = result_df["이미지등록(상세)"]
-            for col in image_columns:
-                if col in result_df.columns:
-                    result_df[col] = detail_image.where(detail_image.notna(), result_df[col])
-        
-        # 5단계: 최종 정리
-        # NaN 값을 빈 문자열로 변환
-        result_df = result_df.replace({np.nan: ''})
-        
-        # 컬럼 순서를 template와 동일하게 맞추기
-        result_df = result_df.reindex(columns=template_df.columns)
-        
-        return result_df
-        
     except Exception as e:
         print(f"병합 중 오류 발생: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
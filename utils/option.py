@@ -1,5 +1,6 @@
 import pandas as pd
-from .option_translate import translate_option_colors, is_option_format
+from .memory import map_unique
+from .option_translate import explode_option_column, reconstruct_option_column
 
 def convert_option_format(value):
     """옵션 형식을 변환하는 함수"""
@@ -20,6 +21,10 @@ def convert_option_format(value):
     # 새로운 형식으로 변환
     return '색상{' + '|'.join(options) + '}'
 
+def convert_option_column(series: pd.Series) -> pd.Series:
+    """옵션 컬럼 형식 변환 (같은 옵션 문자열은 한 번만 변환, 범주형 컬럼은 범주형 유지)"""
+    return map_unique(series, convert_option_format)
+
 def translate_option_column(df, column_name, api_key, target_lang='JA'):
     """
     데이터프레임의 옵션 컬럼을 번역하는 함수
@@ -40,26 +45,24 @@ def translate_option_column(df, column_name, api_key, target_lang='JA'):
     # 복사본 생성
     result_df = df.copy()
     
-    # 옵션 형식인 행들만 필터링
-    option_mask = result_df[column_name].apply(lambda x: is_option_format(str(x)) if pd.notna(x) else False)
-    option_rows = result_df[option_mask]
+    # 옵션 형식인 행들을 (행, 순서, 색상) 테이블로 펼치기
+    option_table = explode_option_column(result_df[column_name])
     
-    if len(option_rows) == 0:
+    if option_table.empty:
         print(f"번역할 옵션 형식 데이터가 없습니다: {column_name}")
         return result_df
     
-    print(f"번역할 옵션 데이터 {len(option_rows)}개 발견")
+    option_count = option_table['row_id'].nunique()
+    print(f"번역할 옵션 데이터 {option_count}개 발견")
     
-    # 옵션 번역 수행
-    translated_options = []
-    for idx, row in option_rows.iterrows():
-        original_option = str(row[column_name])
-        translated_option = translate_option_colors(original_option, api_key, target_lang)
-        translated_options.append((idx, translated_option))
+    # 고유 색상만 한 번에 번역 (실패한 색상은 원본 유지)
+    from .translate_simplified import translate_batch_with_deepl
+    unique_colors = option_table['color'].unique().tolist()
+    translated_colors = translate_batch_with_deepl(unique_colors, api_key, target_lang, batch_size=5)
+    translations = {color: translated for color, translated in zip(unique_colors, translated_colors) if translated}
     
     # 번역 결과를 데이터프레임에 적용
-    for idx, translated_option in translated_options:
-        result_df.at[idx, column_name] = translated_option
+    result_df[column_name] = reconstruct_option_column(result_df[column_name], option_table, translations)
     
-    print(f"옵션 번역 완료: {len(translated_options)}개")
-    return result_df
\ No newline at end of file
+    print(f"옵션 번역 완료: {option_count}개")
+    return result_df
@@ -12,7 +12,11 @@ import re
 import streamlit as st
 from typing import List, Dict, Optional
 import pandas as pd
-import io
+import numpy as np
+from utils.memory import is_categorical
+
+# 옵션 형식: 색상{화이트|진그레이|오크화이트}
+OPTION_PATTERN = re.compile(r'^(색상)\{([^}]+)\}$')
 
 def extract_option_colors(option_text: str) -> Optional[Dict[str, any]]:
     """
@@ -33,8 +37,7 @@ def extract_option_colors(option_text: str) -> Optional[Dict[str, any]]:
         return None
     
     # 색상{내용} 패턴 매칭
-    pattern = r'^(색상)\{([^}]+)\}$'
-    match = re.match(pattern, option_text.strip())
+    match = OPTION_PATTERN.match(option_text.strip())
     
     if not match:
         return None
@@ -148,8 +151,21 @@ def is_option_format(text: str) -> bool:
     if not text or not isinstance(text, str):
         return False
     
-    pattern = r'^색상\{[^}]+\}$'
-    return bool(re.match(pattern, text.strip()))
+    return bool(OPTION_PATTERN.match(text.strip()))
+
+def count_option_values(series: pd.Series) -> int:
+    """
+    옵션 형식 값이 들어 있는 행 수 (같은 값은 한 번만 검사, 범주형 컬럼 지원)
+    
+    Args:
+        series: 옵션 컬럼
+    
+    Returns:
+        옵션 형식인 행 수
+    """
+    counts = series.value_counts(dropna=True)
+    is_option = [is_option_format(str(value)) for value in counts.index]
+    return int(counts[is_option].sum())
 
 def validate_option_translation(original: str, translated: str) -> bool:
     """
@@ -206,8 +222,89 @@ if __name__ == "__main__":
 # 용어집 기반 번역은 제거하고 DeepL 배치 번역만 사용
 # 필요시 후처리에서 명확한 오역만 수정하는 방식으로 변경
 
+def explode_option_column(series: pd.Series) -> pd.DataFrame:
+    """
+    옵션 컬럼을 (행 위치, 색상 순서, 색상명) 테이블로 펼치는 함수
+    
+    같은 옵션 문자열은 한 번만 파싱하고 행 단위로 복제합니다.
+    
+    Args:
+        series: '색상{화이트|진그레이}' 형식 값이 들어있는 컬럼
+    
+    Returns:
+        row_id(행 위치), option_id(고유 옵션 번호), position(옵션 내 순서), prefix, color
+        컬럼을 가진 데이터프레임 (옵션 형식이 아니거나 색상이 비어있는 행은 포함되지 않음)
+    """
+    columns = ['row_id', 'option_id', 'position', 'prefix', 'color']
+    # 범주형 컬럼은 카테고리 코드를 그대로 사용
+    values = series if is_categorical(series) else series.astype(object)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    
+    # 고유 옵션 문자열 단위로 파싱
+    unique_texts = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    unique_texts = unique_texts[unique_texts.map(type) == str].str.strip()
+    parts = unique_texts.str.extract(OPTION_PATTERN).dropna()
+    if parts.empty:
+        return pd.DataFrame(columns=columns)
+    parts.columns = ['prefix', 'body']
+    
+    options = parts['body'].str.split('|').explode().str.strip().to_frame('color')
+    options = options[options['color'] != '']
+    options['prefix'] = parts['prefix'].reindex(options.index)
+    options.index.name = 'option_id'
+    options = options.reset_index()
+    options['position'] = options.groupby('option_id').cumcount()
+    
+    # 고유 옵션별 색상 구간 (시작 위치, 개수)
+    counts = np.zeros(len(uniques), dtype=np.int64)
+    option_ids = options['option_id'].to_numpy(dtype=np.int64)
+    np.add.at(counts, option_ids, 1)
+    starts = np.zeros(len(uniques), dtype=np.int64)
+    starts[1:] = np.cumsum(counts)[:-1]
+    
+    # 행 단위로 복제
+    rows = np.flatnonzero((codes >= 0) & (counts[np.maximum(codes, 0)] > 0))
+    repeats = counts[codes[rows]]
+    offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    take = np.repeat(starts[codes[rows]], repeats) + offsets
+    
+    table = options.iloc[take].reset_index(drop=True)
+    table.insert(0, 'row_id', np.repeat(rows, repeats))
+    return table[columns]
+
+def reconstruct_option_column(original: pd.Series, table: pd.DataFrame,
+                              translations: Dict[str, str]) -> pd.Series:
+    """
+    번역된 색상명으로 옵션 컬럼을 재구성하는 함수
+    
+    Args:
+        original: 원본 옵션 컬럼 (테이블에 없는 행은 원본 유지)
+        table: explode_option_column 결과
+        translations: {원본 색상: 번역 색상} (없으면 원본 색상 유지)
+    
+    Returns:
+        원본과 같은 인덱스를 가진 재구성된 컬럼
+    """
+    result = original.astype(object).copy()
+    if table.empty:
+        return result
+    
+    # 고유 옵션 단위로 번역 색상 결합
+    options = table.drop_duplicates(['option_id', 'position'])
+    translated = options['color'].map(translations).fillna(options['color'])
+    joined = translated.groupby(options['option_id'], sort=False).agg('|'.join)
+    prefixes = options.groupby('option_id', sort=False)['prefix'].first()
+    rebuilt = prefixes + '{' + joined + '}'
+    
+    # 행 단위로 적용
+    rows = table.drop_duplicates('row_id')
+    result.iloc[rows['row_id'].to_numpy()] = rebuilt.reindex(rows['option_id']).to_numpy()
+    return result
+
 async def translate_option_column_batch(df: pd.DataFrame, target_column: str, api_key: str, 
-                                      batch_size: int = 5, use_async: bool = True) -> List[str]:
+                                      batch_size: int = 5, use_async: bool = True,
+                                      rate_limiter=None, client=None, checkpoint=None,
+                                      failed_rows: Optional[np.ndarray] = None) -> List[str]:
     """
     옵션 컬럼 배치 번역 (상품명 번역과 동일한 방식 적용) - 세분화된 진행률 표시
     
@@ -217,6 +314,10 @@ async def translate_option_column_batch(df: pd.DataFrame, target_column: str, ap
         api_key: DeepL API 키
         batch_size: 배치 크기
         use_async: 비동기 사용 여부
+        rate_limiter: 공유 속도 제한기 (None이면 전역 제한기 사용)
+        client: 공유 DeepL 클라이언트 (None이면 전역 클라이언트 사용)
+        checkpoint: 번역 작업 체크포인트 (비동기 방식에서 완료된 색상 건너뛰기)
+        failed_rows: 행 수 길이의 bool 배열 (주어지면 번역에 실패해 원본을 유지한 행을 True로 표시)
     
     Returns:
         번역된 텍스트 리스트
@@ -225,7 +326,7 @@ async def translate_option_column_batch(df: pd.DataFrame, target_column: str, ap
         st.error(f"컬럼 '{target_column}'이 존재하지 않습니다.")
         return []
     
-    texts = df[target_column].fillna("").astype(str).tolist()
+    texts = df[target_column].astype(object).fillna("").astype(str).tolist()
     total_rows = len(texts)
     
     # 진행률 표시를 위한 컨테이너 생성
@@ -250,111 +351,82 @@ async def translate_option_column_batch(df: pd.DataFrame, target_column: str, ap
     overall_status.text("1/3 단계: 옵션 형식 분석 중...")
     parsing_status.text("🔍 파싱 중...")
     
-    option_texts = []
-    option_indices = []
-    result_texts = [""] * len(texts)
-    option_count = 0
-    non_option_count = 0
-    
-    for i, text in enumerate(texts):
-        if is_option_format(text):
-            # 옵션 형식인 경우: 색상명들만 추출하여 번역 대상에 추가
-            extracted = extract_option_colors(text)
-            if extracted:
-                option_texts.extend(extracted['colors'])
-                option_indices.append((i, len(extracted['colors']), extracted['prefix']))
-                option_count += 1
-            else:
-                result_texts[i] = text  # 파싱 실패시 원본 유지
-                non_option_count += 1
-        else:
-            result_texts[i] = text  # 옵션 형식이 아니면 원본 유지
-            non_option_count += 1
-        
-        # 파싱 진행률 업데이트 (10%씩)
-        if (i + 1) % max(1, total_rows // 10) == 0 or i == total_rows - 1:
-            progress = (i + 1) / total_rows * 0.2  # 전체의 20%
-            overall_progress.progress(progress)
-            parsing_status.text(f"🔍 파싱: {i + 1}/{total_rows}")
+    option_table = explode_option_column(df[target_column])
+    option_texts = option_table['color']
+    unique_colors = option_texts.nunique()
+    option_count = option_table['row_id'].nunique()
+    non_option_count = total_rows - option_count
+    result_texts = texts
+    
+    overall_progress.progress(0.2)
     
     # 파싱 결과 요약
-    unique_colors = len(set(option_texts))
     parsing_status.text(f"✅ 파싱 완료: 옵션 {option_count}개, 일반 {non_option_count}개")
     
     # 2단계: 색상명 배치 번역
-    if option_texts:
+    if not option_table.empty:
         overall_status.text(f"2/3 단계: 색상명 번역 중... ({len(option_texts)}개 색상, {unique_colors}개 고유)")
         translation_status.text(f"🌐 번역 대기: {len(option_texts)}개")
         
         try:
-            import asyncio
-            from utils.translate_simplified import translate_batch_async_with_deepl, translate_batch_with_deepl
+            from utils.translate_simplified import (
+                translate_batch_async_with_deepl, translate_batch_with_deepl, resolve_colors
+            )
+            
+            # 용어집으로 먼저 해결하고, 남은 고유 색상만 API로 번역
+            color_translations, unknown_colors = resolve_colors(option_texts.unique())
+            glossary_hits = len(color_translations)
+            translation_status.text(
+                f"📖 용어집: {glossary_hits}개, 🌐 API 대상: {len(unknown_colors)}개"
+            )
             
             # 번역 시작 전 진행률 업데이트
             overall_progress.progress(0.3)
-            translation_status.text(f"🌐 번역 시작: {len(option_texts)}개 색상")
             
-            if use_async:
-                # 단순하게 기존 함수 사용 (중복 메시지 방지)
-                translated_colors = await translate_batch_async_with_deepl(
-                    option_texts, api_key, batch_size=batch_size
-                )
+            if unknown_colors:
+                if use_async:
+                    # 단순하게 기존 함수 사용 (중복 메시지 방지)
+                    api_results = await translate_batch_async_with_deepl(
+                        unknown_colors, api_key, batch_size=batch_size,
+                        rate_limiter=rate_limiter, client=client, checkpoint=checkpoint
+                    )
+                    
+                else:
+                    # 동기 방식은 기존과 동일
+                    api_results = translate_batch_with_deepl(
+                        unknown_colors, api_key, batch_size=batch_size,
+                        rate_limiter=rate_limiter, client=client
+                    )
                 
-            else:
-                # 동기 방식은 기존과 동일
-                translated_colors = translate_batch_with_deepl(
-                    option_texts, api_key, batch_size=batch_size
-                )
+                # API 번역 실패(빈 결과)한 색상은 원본 유지
+                failed_colors = []
+                for color, translated in zip(unknown_colors, api_results):
+                    color_translations[color] = translated if translated else color
+                    if not translated:
+                        failed_colors.append(color)
+                if failed_rows is not None and failed_colors:
+                    failed_table = option_table[option_table['color'].isin(failed_colors)]
+                    failed_rows[failed_table['row_id'].to_numpy(dtype=np.int64)] = True
             
             # 번역 완료 후 진행률 업데이트
             overall_progress.progress(0.7)
-            translation_status.text(f"✅ 번역 완료: {len(translated_colors)}/{len(option_texts)}")
+            translation_status.text(
+                f"✅ 번역 완료: {len(option_texts)}개 색상 "
+                f"(고유 색상 용어집 {glossary_hits}개, API {len(unknown_colors)}개)"
+            )
             
             # 3단계: 옵션 형식으로 재구성
             overall_status.text("3/3 단계: 옵션 형식 재구성 중...")
             reconstruction_status.text("🔧 재구성 중...")
             
-            color_index = 0
-            success_count = 0
-            fail_count = 0
-            
-            for idx, (original_index, color_count, prefix) in enumerate(option_indices):
-                try:
-                    # 해당 옵션의 번역된 색상들 추출
-                    translated_option_colors = translated_colors[color_index:color_index + color_count]
-                    color_index += color_count
-                    
-                    # 옵션 텍스트 재구성
-                    if len(translated_option_colors) == color_count:
-                        result_texts[original_index] = reconstruct_option_text(prefix, translated_option_colors)
-                        success_count += 1
-                    else:
-                        # 번역 실패시 원본 유지
-                        result_texts[original_index] = texts[original_index]
-                        fail_count += 1
-                        if fail_count <= 3:  # 처음 3개만 경고 표시
-                            st.warning(f"옵션 번역 불완전 (행 {original_index + 1}): 원본 유지")
-                        
-                except Exception as e:
-                    result_texts[original_index] = texts[original_index]
-                    fail_count += 1
-                    if fail_count <= 3:  # 처음 3개만 에러 표시
-                        st.error(f"옵션 재구성 오류 (행 {original_index + 1}): {str(e)}")
-                
-                # 재구성 진행률 업데이트
-                if (idx + 1) % max(1, len(option_indices) // 5) == 0 or idx == len(option_indices) - 1:
-                    progress = 0.7 + (idx + 1) / len(option_indices) * 0.3
-                    overall_progress.progress(progress)
-                    reconstruction_status.text(f"🔧 재구성: {idx + 1}/{len(option_indices)}")
+            result_texts = reconstruct_option_column(
+                pd.Series(texts), option_table, color_translations
+            ).tolist()
             
             # 최종 결과 표시
             overall_progress.progress(1.0)
             overall_status.text("✅ 번역 완료!")
-            reconstruction_status.text(f"✅ 성공: {success_count}개, 실패: {fail_count}개")
-            
-            # 실패가 많은 경우 추가 정보 표시
-            if fail_count > 3:
-                st.info(f"총 {fail_count}개 옵션에서 번역 문제가 발생했습니다. (처음 3개만 표시)")
+            reconstruction_status.text(f"✅ 재구성 완료: {option_count}개 옵션")
                     
         except Exception as e:
             overall_progress.progress(0.3)
@@ -363,8 +435,9 @@ async def translate_option_column_batch(df: pd.DataFrame, target_column: str, ap
             reconstruction_status.text("⏭️ 원본 유지")
             
             # 전체 번역 실패시 원본 텍스트들로 복원
-            for original_index, _, _ in option_indices:
-                result_texts[original_index] = texts[original_index]
+            result_texts = texts
+            if failed_rows is not None:
+                failed_rows[option_table['row_id'].to_numpy(dtype=np.int64)] = True
     else:
         # 번역할 옵션이 없는 경우
         overall_progress.progress(1.0)
@@ -388,23 +461,17 @@ def analyze_colors_in_data(df: pd.DataFrame) -> Dict[str, any]:
         return {"total_colors": 0, "unique_colors": [], "color_frequency": {}}
     
     option_columns = [col for col in df.columns if '옵션' in col or 'option' in col.lower()]
-    all_colors = []
-    
-    for col in option_columns:
-        for value in df[col].fillna("").astype(str):
-            if is_option_format(value):
-                extracted = extract_option_colors(value)
-                if extracted:
-                    all_colors.extend(extracted['colors'])
+    all_colors = pd.concat(
+        [explode_option_column(df[col])['color'] for col in option_columns],
+        ignore_index=True
+    ) if option_columns else pd.Series(dtype=object)
     
     # 색상 빈도 계산
-    color_frequency = {}
-    for color in all_colors:
-        color_frequency[color] = color_frequency.get(color, 0) + 1
+    color_frequency = all_colors.value_counts().to_dict()
     
     return {
         "total_colors": len(all_colors),
-        "unique_colors": list(set(all_colors)),
+        "unique_colors": list(color_frequency),
         "color_frequency": color_frequency,
         "most_common": sorted(color_frequency.items(), key=lambda x: x[1], reverse=True)[:10]
     }
@@ -442,35 +509,31 @@ def export_color_analysis_to_excel(color_analysis: Dict[str, any], filename: str
     if not color_analysis:
         return b""
     
-    # 엑셀 파일 생성
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # 색상 빈도 시트
-        if color_analysis.get("color_frequency"):
-            freq_df = pd.DataFrame(
-                list(color_analysis["color_frequency"].items()),
-                columns=["색상명", "빈도"]
-            ).sort_values("빈도", ascending=False)
-            freq_df.to_excel(writer, sheet_name="색상빈도", index=False)
-        
-        # 고유 색상 시트
-        if color_analysis.get("unique_colors"):
-            unique_df = pd.DataFrame(
-                color_analysis["unique_colors"],
-                columns=["고유색상"]
-            )
-            unique_df.to_excel(writer, sheet_name="고유색상", index=False)
-        
-        # 요약 정보 시트
-        summary_df = pd.DataFrame([
-            ["총 색상 수", color_analysis.get("total_colors", 0)],
-            ["고유 색상 수", len(color_analysis.get("unique_colors", []))]
-        ], columns=["항목", "값"])
-        summary_df.to_excel(writer, sheet_name="요약", index=False)
-    
-    output.seek(0)
-    return output.getvalue()
+    from utils.excel_io import sheets_to_excel_bytes
+    
+    sheets = {}
+    
+    # 색상 빈도 시트
+    if color_analysis.get("color_frequency"):
+        sheets["색상빈도"] = pd.DataFrame(
+            list(color_analysis["color_frequency"].items()),
+            columns=["색상명", "빈도"]
+        ).sort_values("빈도", ascending=False)
+    
+    # 고유 색상 시트
+    if color_analysis.get("unique_colors"):
+        sheets["고유색상"] = pd.DataFrame(
+            color_analysis["unique_colors"],
+            columns=["고유색상"]
+        )
+    
+    # 요약 정보 시트
+    sheets["요약"] = pd.DataFrame([
+        ["총 색상 수", color_analysis.get("total_colors", 0)],
+        ["고유 색상 수", len(color_analysis.get("unique_colors", []))]
+    ], columns=["항목", "값"])
+    
+    return sheets_to_excel_bytes(sheets)
 
 # 사용 예시 및 테스트 함수
 def test_option_translation():
@@ -1,22 +1,106 @@
 """
 병렬 번역 처리 모듈
 """
-import asyncio
 import streamlit as st
 from typing import List, Dict, Tuple
+import numpy as np
 import pandas as pd
-from utils.translate_simplified import translate_batch_async_with_deepl
-from utils.option_translate import translate_option_column_batch
+from utils.translate_simplified import (
+    translate_batch_async_with_deepl, resolve_colors, DEEPL_MAX_TEXTS_PER_REQUEST
+)
+from utils.option_translate import explode_option_column, reconstruct_option_column
+from utils.rate_limiter import AsyncRateLimiter, get_rate_limiter
+from utils.deepl_client import DeepLClient, get_deepl_client
+from utils.translation_checkpoint import TranslationCheckpoint
 
 class ParallelTranslationManager:
     """병렬 번역 관리자"""
     
-    def __init__(self, api_key: str, batch_size: int = 5):
+    def __init__(self, api_key: str, batch_size: int = 5, rate_limiter: AsyncRateLimiter = None,
+                 client: DeepLClient = None):
         self.api_key = api_key
         self.batch_size = batch_size
+        # 모든 병렬 작업이 하나의 속도 제한 예산과 연결 풀을 공유
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.client = client or get_deepl_client()
+        # 마지막 translate_columns에서 번역에 실패한 행 (행 위치 기준 bool 배열)
+        self.failed_rows = np.zeros(0, dtype=bool)
+    
+    async def translate_columns(self, df: pd.DataFrame, product_column: str = None,
+                                option_columns: List[str] = None,
+                                checkpoint: TranslationCheckpoint = None) -> pd.DataFrame:
+        """
+        상품명과 옵션 컬럼을 한 번의 번역 계획으로 처리
+        
+        1. 계획: 모든 컬럼의 고유 상품명/색상을 모으고 색상은 용어집으로 먼저 해결
+        2. 번역: 남은 고유 문자열 전체를 한 번의 배치 번역으로 처리 (하나의 속도 제한 예산)
+        3. 분배: 번역 결과를 각 컬럼에 다시 채움
+        
+        checkpoint가 주어지면 이전 실행에서 완료된 문자열은 다시 번역하지 않습니다.
+        번역에 실패한 상품명과 색상은 원문을 유지하고, 해당 행은 self.failed_rows에 표시합니다.
+        """
+        option_columns = option_columns or []
+        
+        # 1단계: 번역 계획 수립
+        option_tables = {col: explode_option_column(df[col]) for col in option_columns}
+        all_colors = pd.unique(pd.concat(
+            [table['color'] for table in option_tables.values()] or [pd.Series(dtype=object)],
+            ignore_index=True
+        ))
+        color_translations, unknown_colors = resolve_colors(all_colors)
+        
+        product_texts = None
+        unique_products = []
+        if product_column:
+            product_texts = df[product_column].astype(object).fillna("").astype(str)
+            unique_products = [text for text in product_texts.unique() if text.strip()]
+        
+        texts_to_translate = list(dict.fromkeys(unique_products + unknown_colors))
+        st.info(
+            f"📋 번역 계획: 상품명 {len(unique_products)}개, 색상 {len(all_colors)}개 "
+            f"(용어집 {len(color_translations)}개) → API 대상 {len(texts_to_translate)}개"
+        )
+        
+        # 2단계: 고유 문자열 전체를 한 번에 번역
+        translations = {}
+        if texts_to_translate:
+            results = await translate_batch_async_with_deepl(
+                texts_to_translate, self.api_key, batch_size=self.batch_size,
+                rate_limiter=self.rate_limiter, client=self.client, checkpoint=checkpoint
+            )
+            # 실패(빈 결과)한 문자열은 제외해 원문 유지
+            translations = {text: result for text, result in zip(texts_to_translate, results) if result}
+        failed_texts = [text for text in texts_to_translate if text not in translations]
+        
+        # 3단계: 결과 분배
+        df_result = df.copy()
+        
+        if product_column:
+            df_result[product_column] = product_texts.map(translations).fillna(product_texts)
+        
+        for color in unknown_colors:
+            # API 번역 실패(빈 결과)한 색상은 원본 유지
+            color_translations[color] = translations.get(color) or color
+        
+        for col, table in option_tables.items():
+            df_result[col] = reconstruct_option_column(
+                df[col].astype(object).fillna("").astype(str), table, color_translations
+            )
+        
+        # 번역에 실패한 상품명이나 색상이 있는 행
+        self.failed_rows = np.zeros(len(df), dtype=bool)
+        if failed_texts:
+            if product_column:
+                self.failed_rows |= product_texts.isin(failed_texts).to_numpy()
+            for table in option_tables.values():
+                failed_table = table[table['color'].isin(failed_texts)]
+                self.failed_rows[failed_table['row_id'].to_numpy(dtype=np.int64)] = True
+            st.warning(f"⚠️ 번역하지 못한 텍스트 {len(failed_texts):,}개 ({int(self.failed_rows.sum()):,}행) - 원문을 유지합니다.")
+        
+        return df_result
     
     async def translate_product_and_options_parallel(self, df: pd.DataFrame) -> pd.DataFrame:
-        """상품명과 옵션을 병렬로 번역"""
+        """상품명과 옵션을 하나의 번역 계획으로 번역"""
         
         # 번역할 컬럼들 식별
         product_column = "상품명" if "상품명" in df.columns else None
@@ -26,42 +110,12 @@ class ParallelTranslationManager:
             st.warning("번역할 컬럼이 없습니다.")
             return df
         
-        # 병렬 작업 준비
-        tasks = []
-        task_info = []
-        
-        # 상품명 번역 태스크
-        if product_column:
-            product_texts = df[product_column].fillna("").astype(str).tolist()
-            task = translate_batch_async_with_deepl(
-                product_texts, self.api_key, batch_size=self.batch_size
-            )
-            tasks.append(task)
-            task_info.append(("product", product_column))
-        
-        # 옵션 번역 태스크들
-        for col in option_columns:
-            task = translate_option_column_batch(
-                df, col, self.api_key, batch_size=self.batch_size, use_async=True
-            )
-            tasks.append(task)
-            task_info.append(("option", col))
-        
-        # 병렬 실행
-        st.info(f"🚀 병렬 번역 시작: {len(tasks)}개 작업")
+        column_count = len(option_columns) + (1 if product_column else 0)
+        st.info(f"🚀 통합 번역 시작: {column_count}개 컬럼")
         
         try:
-            results = await asyncio.gather(*tasks)
-            
-            # 결과 적용
-            df_result = df.copy()
-            for i, (task_type, column) in enumerate(task_info):
-                if task_type == "product":
-                    df_result[column] = results[i]
-                elif task_type == "option":
-                    df_result[column] = results[i]
-            
-            st.success(f"✅ 병렬 번역 완료: {len(tasks)}개 작업")
+            df_result = await self.translate_columns(df, product_column, option_columns)
+            st.success(f"✅ 통합 번역 완료: {column_count}개 컬럼")
             return df_result
             
         except Exception as e:
@@ -69,49 +123,43 @@ class ParallelTranslationManager:
             return df
     
     async def translate_multiple_option_columns_parallel(self, df: pd.DataFrame, 
-                                                       option_columns: List[str]) -> pd.DataFrame:
-        """여러 옵션 컬럼을 병렬로 번역"""
+                                                       option_columns: List[str],
+                                                       checkpoint: TranslationCheckpoint = None) -> pd.DataFrame:
+        """여러 옵션 컬럼의 색상을 한 번에 번역"""
         
         if not option_columns:
             return df
         
-        # 각 컬럼별 번역 태스크 생성
-        tasks = []
-        for col in option_columns:
-            task = translate_option_column_batch(
-                df, col, self.api_key, batch_size=self.batch_size, use_async=True
-            )
-            tasks.append(task)
-        
-        st.info(f"🔄 옵션 컬럼 병렬 번역: {len(option_columns)}개 컬럼")
+        st.info(f"🔄 옵션 컬럼 통합 번역: {len(option_columns)}개 컬럼")
         
         try:
-            # 병렬 실행
-            results = await asyncio.gather(*tasks)
-            
-            # 결과 적용
-            df_result = df.copy()
-            for i, col in enumerate(option_columns):
-                df_result[col] = results[i]
-            
-            return df_result
+            return await self.translate_columns(df, option_columns=option_columns, checkpoint=checkpoint)
             
         except Exception as e:
             st.error(f"옵션 병렬 번역 중 오류: {str(e)}")
+            # 번역하지 못했으므로 모든 행을 실패로 표시 (작업 기록 유지)
+            self.failed_rows = np.ones(len(df), dtype=bool)
             return df
 
-def estimate_translation_time(text_count: int, batch_size: int = 5) -> Dict[str, float]:
-    """번역 소요 시간 추정"""
+def estimate_translation_time(text_count: int, batch_size: int = 5,
+                              texts_per_request: int = DEEPL_MAX_TEXTS_PER_REQUEST) -> Dict[str, float]:
+    """번역 소요 시간 추정 (texts_per_request개씩 묶어 최대 batch_size개 요청을 동시에 전송)"""
     
     # 경험적 수치 (초 단위)
     api_call_time = 3.0  # API 호출당 평균 시간
-    batch_delay = 2.0    # 배치 간 대기 시간
+    limiter = get_rate_limiter()
+    
+    total_requests = (text_count + texts_per_request - 1) // texts_per_request
+    total_batches = (total_requests + batch_size - 1) // batch_size
     
-    total_batches = (text_count + batch_size - 1) // batch_size
-    estimated_time = (total_batches * api_call_time) + ((total_batches - 1) * batch_delay)
+    # 동시 요청 수와 초당 요청 한도 중 더 낮은 처리량 기준
+    effective_rate = min(limiter.requests_per_second,
+                         min(batch_size, limiter.max_concurrency) / api_call_time)
+    estimated_time = total_requests / effective_rate if total_requests else 0.0
     
     return {
         'total_texts': text_count,
+        'total_requests': total_requests,
         'total_batches': total_batches,
         'estimated_seconds': estimated_time,
         'estimated_minutes': estimated_time / 60,
@@ -0,0 +1,291 @@
+"""
+헤드리스 파이프라인 - 1~8단계를 브라우저 없이 한 번에 실행
+
+하나의 메모리 내 데이터프레임으로 병합 → 가격 처리 → 카테고리 처리(전처리 + 코드 변환)
+→ 옵션 형식 변환 → 번역 → 청크 파일 저장을 순서대로 수행하고 단계별 소요 시간을 보고합니다.
+
+사용 예시 (cron 야간 배치):
+    python -m utils.pipeline 상품DB.xlsx 양식.xlsx -o output/ --api-key $DEEPL_API_KEY
+
+--incremental을 붙이면 이전 실행과 비교해 추가·변경된 상품만 2~7단계를 거치고
+나머지 상품은 이전 결과를 그대로 사용합니다 (utils/incremental.py).
+번역에 실패한 상품은 원문을 유지하고 다음 증분 실행에서 다시 처리합니다.
+
+종료 코드: 0 성공, 1 실행 실패, 2 일부 번역 실패
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.category import process_categories
+from utils.category_table import DEFAULT_CATEGORY_MAPPING_PATH
+from utils.deepl_client import get_deepl_client
+from utils.excel_io import read_excel_file, write_excel
+from utils.incremental import (
+    DEFAULT_INCREMENTAL_DIR, KEY_COLUMN_CANDIDATES, FingerprintStore, diff_catalog,
+    find_key_column, is_valid_key_column, row_fingerprints, schema_fingerprint,
+    splice_output, summarize_changes
+)
+from utils.memory import compact_dataframe, dataframe_memory_mb, get_gc_stats
+from utils.merge import merge_files
+from utils.option import convert_option_column
+from utils.parallel_translation import ParallelTranslationManager
+from utils.price import calculate_prices_optimized
+from utils.pricing_rules import DEFAULT_PRICING_RULES_PATH
+from utils.translate_simplified import GLOSSARY_VERSION
+from utils.translation_checkpoint import TranslationCheckpoint, make_job_id
+
+ExcelInput = Union[str, bytes, pd.DataFrame, Any]
+
+def _as_dataframe(source: ExcelInput, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    """파일 경로, 바이트, 파일 객체 또는 데이터프레임을 데이터프레임으로 변환"""
+    if isinstance(source, pd.DataFrame):
+        if usecols:
+            return source[[col for col in source.columns if col in set(usecols)]].copy()
+        return source.copy()
+    return read_excel_file(source, usecols=usecols)
+
+def _settings_version(translated: bool) -> str:
+    """결과에 영향을 주는 설정 지문 (카테고리 매핑·가격 규칙 파일, 용어집, 번역 여부)"""
+    digest = hashlib.sha256()
+    for path in (DEFAULT_CATEGORY_MAPPING_PATH, DEFAULT_PRICING_RULES_PATH):
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    digest.update(GLOSSARY_VERSION.encode())
+    digest.update(b'translated' if translated else b'')
+    return digest.hexdigest()
+
+def _process_rows(df: pd.DataFrame, stage: Callable, api_key: Optional[str], batch_size: int,
+                  translate: bool, log: Callable[[str], None]) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    2~7단계: 가격 처리, 카테고리 처리, 옵션 형식 변환, 번역
+
+    Returns:
+        (처리된 데이터프레임, 번역에 실패한 행 bool 배열)
+    """
+    failed_rows = np.zeros(len(df), dtype=bool)
+    # 2단계: 가격 정보 처리
+    with stage("가격 처리"):
+        df = calculate_prices_optimized(df)
+
+    # 3~4단계: 카테고리 전처리 + 코드 변환 (하나의 조회로 처리)
+    with stage("카테고리 처리"):
+        df = process_categories(df)
+
+    # 5단계: 옵션 형식 변환
+    option_columns = [col for col in df.columns if '옵션입력' in col]
+    with stage("옵션 형식 변환"):
+        for col in option_columns:
+            df[col] = convert_option_column(df[col])
+
+    # 6~7단계: 상품명 + 옵션 번역 (하나의 번역 계획, 중단 시 체크포인트로 재개)
+    if translate and api_key:
+        product_column = "상품명" if "상품명" in df.columns else None
+        columns = ([product_column] if product_column else []) + option_columns
+        with stage("번역"):
+            if columns:
+                checkpoint = TranslationCheckpoint(make_job_id(df, columns))
+                manager = ParallelTranslationManager(api_key, batch_size=batch_size)
+                df = get_deepl_client().run(manager.translate_columns(
+                    df, product_column, option_columns, checkpoint=checkpoint
+                ))
+                failed_rows = manager.failed_rows
+                # 모두 번역되면 작업 기록 삭제, 실패가 있으면 다음 실행에서 이어서 번역
+                if failed_rows.any():
+                    log(f"  번역 실패: {int(failed_rows.sum()):,}행 (원문 유지, 작업 기록 보관)")
+                else:
+                    checkpoint.discard()
+    else:
+        log("[번역] 건너뜀 (API 키 없음)" if translate else "[번역] 건너뜀")
+
+    return df, failed_rows
+
+def run_pipeline(product_db: ExcelInput,
+                 template: ExcelInput,
+                 api_key: Optional[str] = None,
+                 output_dir: Optional[str] = None,
+                 chunk_size: int = 1000,
+                 batch_size: int = 5,
+                 translate: bool = True,
+                 store: Optional[FingerprintStore] = None,
+                 key_column: Optional[str] = None,
+                 log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    1~8단계 전체 처리를 한 번에 실행
+
+    Args:
+        product_db: 상품 DB (파일 경로, 파일 객체, 바이트 또는 데이터프레임)
+        template: 뉴퍼스트몰 양식 파일
+        api_key: DeepL API 키 (없으면 번역 단계 건너뜀)
+        output_dir: 청크 파일 저장 디렉터리 (None이면 저장하지 않음)
+        chunk_size: 청크 파일당 행 수
+        batch_size: 번역 동시 요청 수
+        translate: 번역 단계 실행 여부
+        store: 증분 기록 저장소 (지정하면 추가·변경된 상품만 2~7단계 처리)
+        key_column: 상품 키 컬럼 (None이면 KEY_COLUMN_CANDIDATES에서 자동 선택)
+        log: 진행 메시지 출력 함수
+
+    Returns:
+        {'data': 최종 데이터프레임, 'timings': {단계: 초}, 'gc_seconds': 가비지 컬렉션 시간,
+         'translation_failures': 번역에 실패한 행 수 (원문 유지),
+         'output_files': [저장된 파일 경로],
+         'changes': {'added', 'changed', 'removed', 'unchanged': 건수} (증분 모드가 아니면 None)}
+
+    Raises:
+        ValueError: 카테고리 처리에 필요한 컬럼이 없거나, 증분 모드에서 상품 키 컬럼을 쓸 수 없는 경우
+    """
+    timings: Dict[str, float] = {}
+    _, gc_seconds_before = get_gc_stats().snapshot()
+
+    @contextmanager
+    def stage(name: str):
+        start = time.perf_counter()
+        yield
+        timings[name] = time.perf_counter() - start
+        log(f"[{name}] {timings[name]:.2f}초")
+
+    # 1단계: 파일 병합 (상품 DB는 템플릿에 있는 컬럼과 상품 키 컬럼만 읽음)
+    with stage("파일 병합"):
+        template_df = _as_dataframe(template)
+        usecols = list(template_df.columns)
+        if store is not None:
+            usecols += [col for col in ([key_column] if key_column else KEY_COLUMN_CANDIDATES)
+                        if col not in usecols]
+        product_db_df = _as_dataframe(product_db, usecols=usecols)
+        df = merge_files(product_db_df, template_df)
+        log(f"  병합 결과: {len(df):,}행 × {len(df.columns):,}열")
+
+        # 값 종류가 적은 컬럼을 범주형으로 압축
+        memory_before = dataframe_memory_mb(df)
+        df, memory_report = compact_dataframe(df)
+        log(f"  메모리: {memory_before:.1f}MB → {dataframe_memory_mb(df):.1f}MB "
+            f"(범주형 변환 {len(memory_report)}개 컬럼)")
+
+    # 증분 모드: 이전 실행과 비교해 추가·변경된 상품만 남김
+    changes = None
+    if store is not None:
+        with stage("변경 감지"):
+            key_column = key_column or find_key_column(product_db_df)
+            if key_column is None or not is_valid_key_column(product_db_df, key_column):
+                raise ValueError(f"상품 키로 쓸 수 있는 컬럼이 없습니다 (빈 값이나 중복이 없는 컬럼 필요): "
+                                 f"{key_column or ', '.join(KEY_COLUMN_CANDIDATES)}")
+
+            fingerprints = row_fingerprints(product_db_df, key_column)
+            # 값이 있는 컬럼 구성이 바뀌면 병합 결과(양식 기본값 사용 여부)가 달라지므로 전체 재처리
+            filled_columns = [col for col in product_db_df.columns if product_db_df[col].notna().any()]
+            schema = schema_fingerprint(filled_columns, template_df, key_column,
+                                        _settings_version(bool(translate and api_key)))
+            previous = store.load(schema)
+            changes = diff_catalog(fingerprints, previous['fingerprints'] if previous else None)
+
+            keys = fingerprints.index
+            selected = keys.isin(changes['added'].union(changes['changed']))
+            processed_keys = keys[selected]
+            df = df[selected].reset_index(drop=True)
+            counts = summarize_changes(changes)
+            log(f"  상품 키: {key_column} / 추가 {counts['added']:,}, 변경 {counts['changed']:,}, "
+                f"삭제 {counts['removed']:,}, 유지 {counts['unchanged']:,}")
+    del product_db_df
+
+    # 2~7단계 (증분 모드에서 바뀐 상품이 없으면 건너뜀)
+    failed_rows = np.zeros(len(df), dtype=bool)
+    if store is None or len(df):
+        df, failed_rows = _process_rows(df, stage, api_key, batch_size, translate, log)
+    else:
+        log("[처리] 건너뜀 (변경된 상품 없음)")
+
+    # 증분 모드: 처리 결과를 이전 출력에 이어 붙이고 다음 실행을 위해 저장
+    if store is not None:
+        with stage("결과 병합"):
+            df = splice_output(previous['output'] if previous else None, df, processed_keys, keys)
+            df, _ = compact_dataframe(df)
+            # 번역에 실패한 상품은 지문을 저장하지 않아 다음 실행에서 추가된 상품으로 다시 처리
+            store.save(schema, key_column, fingerprints.drop(processed_keys[failed_rows]), df)
+            df = df.reset_index(drop=True)
+
+    # 8단계: 청크 파일 저장
+    output_files: List[str] = []
+    if output_dir:
+        with stage("청크 저장"):
+            os.makedirs(output_dir, exist_ok=True)
+            for i, start in enumerate(range(0, len(df), chunk_size)):
+                path = os.path.join(output_dir, f"chunk_{i + 1}.xlsx")
+                write_excel({'Sheet1': df.iloc[start:start + chunk_size]}, path)
+                output_files.append(path)
+            log(f"  {len(output_files)}개 파일 저장: {output_dir}")
+
+    gc_seconds = get_gc_stats().snapshot()[1] - gc_seconds_before
+    log(f"[전체] {sum(timings.values()):.2f}초 (가비지 컬렉션 {gc_seconds:.2f}초)")
+    return {
+        'data': df,
+        'timings': timings,
+        'gc_seconds': gc_seconds,
+        'translation_failures': int(failed_rows.sum()),
+        'output_files': output_files,
+        'changes': summarize_changes(changes) if changes is not None else None
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.pipeline",
+        description="뉴퍼스트몰 업데이트 1~8단계를 한 번에 실행합니다."
+    )
+    parser.add_argument("product_db", help="상품 DB 엑셀 파일")
+    parser.add_argument("template", help="뉴퍼스트몰 양식 엑셀 파일")
+    parser.add_argument("-o", "--output-dir", default="output", help="청크 파일 저장 디렉터리 (기본값: output)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="청크 파일당 행 수 (기본값: 1000)")
+    parser.add_argument("--batch-size", type=int, default=5, help="번역 동시 요청 수 (기본값: 5)")
+    parser.add_argument("--api-key", default=os.environ.get("DEEPL_API_KEY"),
+                        help="DeepL API 키 (기본값: DEEPL_API_KEY 환경 변수)")
+    parser.add_argument("--skip-translation", action="store_true", help="번역 단계 건너뛰기")
+    parser.add_argument("--incremental", action="store_true",
+                        help="이전 실행과 비교해 추가·변경된 상품만 처리")
+    parser.add_argument("--key-column", help="증분 모드 상품 키 컬럼 (기본값: 자동 선택)")
+    parser.add_argument("--state-dir", default=DEFAULT_INCREMENTAL_DIR,
+                        help=f"증분 기록 저장 디렉터리 (기본값: {DEFAULT_INCREMENTAL_DIR})")
+    parser.add_argument("--full", action="store_true", help="증분 기록을 지우고 전체를 다시 처리")
+    args = parser.parse_args(argv)
+
+    # 브라우저 없이 실행할 때 나오는 Streamlit 경고 숨기기
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    store = None
+    if args.incremental:
+        store = FingerprintStore(directory=args.state_dir)
+        if args.full:
+            store.discard()
+
+    try:
+        result = run_pipeline(
+            args.product_db, args.template,
+            api_key=args.api_key,
+            output_dir=args.output_dir,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            translate=not args.skip_translation,
+            store=store,
+            key_column=args.key_column
+        )
+    except Exception as e:
+        print(f"파이프라인 실행 실패: {str(e)}", file=sys.stderr)
+        return 1
+    if result['translation_failures']:
+        print(f"일부 번역 실패: {result['translation_failures']:,}행 (원문 유지, 다음 증분 실행에서 다시 처리)",
+              file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,181 @@ import pandas as pd
 from functools import wraps
 import time
 
+from utils.pricing_rules import DEFAULT_MARGIN_MAX, DEFAULT_MARGIN_MIN, PricingRules, get_pricing_rules
+
+# 행별 마진을 정하는 상품 키 컬럼 후보 (데이터에 있는 첫 번째 컬럼 사용)
+MARGIN_KEY_COLUMNS = ['자체 상품코드', '상품코드', '상품명']
+
+# 마진 계산에 쓰지 않는 가격 컬럼 (키가 없는 행은 나머지 컬럼 값으로 마진 결정)
+PRICE_COLUMNS = ['소비자가', '공급가', '판매가', '상품가']
+
+# 가격 문자열에서 제거할 문자 (천 단위 쉼표, 공백, 통화 기호/단위)
+PRICE_STRIP_PATTERN = r'[\s,₩￦\\$]|원|KRW'
+
+# 처리할 수 있는 최대 가격 (이보다 크면 잘못된 값으로 보고 건너뜀)
+MAX_PRICE = 10 ** 12
+
+def _parse_prices(values: pd.Series) -> pd.Series:
+    """가격 컬럼을 숫자로 변환 (숫자가 아니면 NaN, float64)"""
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        numeric = pd.to_numeric(values, errors='coerce')
+    else:
+        text = values.astype('string').str.replace(PRICE_STRIP_PATTERN, '', regex=True)
+        numeric = pd.to_numeric(text, errors='coerce')
+    return pd.Series(numeric.to_numpy(dtype=np.float64, na_value=np.nan), index=values.index, name=values.name)
+
+def normalize_prices(values: pd.Series) -> pd.Series:
+    """
+    가격 컬럼 정규화 ('12,000원', '₩12000' 같은 값 포함)
+
+    Returns:
+        Int64 시리즈 (값 없음, 숫자가 아닌 값, 0 이하, MAX_PRICE 초과는 <NA>)
+    """
+    numeric = _parse_prices(values)
+    valid = np.isfinite(numeric) & (numeric > 0) & (numeric <= MAX_PRICE)
+    return numeric.where(valid).round().astype('Int64')
+
+def invalid_price_rows(df, column='소비자가'):
+    """
+    가격을 계산할 수 없는 행 목록
+
+    Returns:
+        데이터프레임 (컬럼: 행, 값, 사유) - 행은 엑셀 행 번호(머리글 다음 행이 2)
+    """
+    if column not in df.columns:
+        return pd.DataFrame(columns=['행', '값', '사유'])
+
+    values = df[column]
+    numeric = _parse_prices(values)
+    # 결측값과 공백만 있는 칸은 잘못된 값과 구분해 '값 없음'으로 표시
+    missing = values.isna().to_numpy(copy=True)
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        missing |= (values.astype('string').str.strip() == '').fillna(True).to_numpy(dtype=bool)
+    reasons = np.select(
+        [missing, numeric.isna().to_numpy(), (numeric <= 0).to_numpy(),
+         (numeric > MAX_PRICE).to_numpy() | np.isinf(numeric.to_numpy())],
+        ['값 없음', '숫자가 아님', '0 이하', f'{MAX_PRICE:,}원 초과'],
+        default=''
+    )
+    invalid = reasons != ''
+    return pd.DataFrame({
+        '행': np.flatnonzero(invalid) + 2,
+        '값': values[invalid].astype(object).to_numpy(),
+        '사유': reasons[invalid]
+    })
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 섞기 함수 (uint64 배열, 오버플로는 2^64로 나눈 나머지)"""
+    z = values.astype(np.uint64, copy=True)
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _hash_values(values) -> np.ndarray:
+    """시리즈/데이터프레임의 행별 내용 해시 (uint64, 인덱스 무관)"""
+    if isinstance(values, pd.Series):
+        values = values.to_frame()
+    values = values.copy(deep=False)
+    # pandas 문자열 dtype은 object로 바꿔 해시하는 편이 훨씬 빠름
+    for column in values.columns:
+        dtype = values[column].dtype
+        if pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
+            values[column] = values[column].astype(object)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64, copy=True)
+
+def row_margin_rates(df, random_seed=42, low=DEFAULT_MARGIN_MIN, high=DEFAULT_MARGIN_MAX):
+    """
+    행별 마진율 계산 (상품 키 해시 기반)
+
+    마진율은 상품 키와 시드만으로 정해지므로 청크 크기, 병렬 처리, 행 순서, 증분 처리와
+    관계없이 같은 상품은 항상 같은 마진을 받습니다. 상품 키는 행마다 MARGIN_KEY_COLUMNS 중
+    값이 있는 첫 번째 컬럼입니다 (병합 후 비어 있는 상품코드 등은 건너뜀).
+    모든 키가 비어 있는 행은 가격 컬럼을 제외한 행 내용으로 마진을 정합니다.
+    전역 난수 상태(np.random)는 사용하지 않습니다.
+
+    Args:
+        low, high: 마진율 범위 (숫자 또는 행별 배열)
+
+    Returns:
+        [low, high) 범위의 float64 배열
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    resolved = np.zeros(len(df), dtype=bool)
+
+    # 행별로 값이 있는 첫 번째 키 컬럼 사용 (컬럼 순서를 섞어 컬럼 간 같은 값 구분)
+    for position, column in enumerate(MARGIN_KEY_COLUMNS):
+        if column not in df.columns or resolved.all():
+            continue
+        keys = df[column].astype(object).where(df[column].notna(), '').astype(str).str.strip()
+        take = (keys != '').to_numpy() & ~resolved
+        if take.any():
+            hashes[take] = _hash_values(keys[take]) ^ _splitmix64(np.array([position], dtype=np.uint64))[0]
+            resolved |= take
+
+    content_columns = [col for col in df.columns if col not in PRICE_COLUMNS]
+    if not resolved.all() and content_columns:
+        hashes[~resolved] = _hash_values(df.loc[~resolved, content_columns])
+
+    # 시드를 섞은 뒤 상위 53비트로 [0, 1) 균등 분포 값 생성
+    seed = _splitmix64(np.array([random_seed], dtype=np.uint64))[0]
+    uniform = (_splitmix64(hashes ^ seed) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+    return low + (high - low) * uniform
+
+def apply_pricing_rules(df, supply_price, random_seed=42, rules: PricingRules = None):
+    """
+    가격 규칙으로 상품가와 소비자가 계산 (행 단위 파이썬 반복 없음)
+
+    Args:
+        df: 데이터프레임 (상품 키, 카테고리, 공급사 컬럼 조회)
+        supply_price: 행별 공급가 (시리즈 또는 배열)
+        random_seed: 마진 시드
+        rules: 가격 규칙 (None이면 규칙 파일 사용)
+
+    Returns:
+        (상품가 배열, 소비자가 배열) - int64
+    """
+    rules = rules or get_pricing_rules()
+    supply_price = np.asarray(supply_price, dtype=np.float64)
+    low, high = rules.margin_bounds(df, supply_price)
+    margin_rates = row_margin_rates(df, random_seed, low, high)
+    product_price = rules.exclude_vat(supply_price).astype(np.int64)
+    consumer_price = rules.round_price(supply_price * (1 + margin_rates)).astype(np.int64)
+    return product_price, consumer_price
+
+def _compute_price_columns(df, random_seed=42):
+    """
+    가격 컬럼 계산 (가격이 잘못된 행은 건너뛰고 <NA>)
+
+    Returns:
+        {'공급가', '판매가', '상품가', '소비자가'}: Int64 시리즈, 건너뛴 행 수
+    """
+    supply_price = normalize_prices(df['소비자가'])
+    valid = supply_price.notna().to_numpy()
+    product_price = np.full(len(df), np.nan)
+    consumer_price = np.full(len(df), np.nan)
+
+    if valid.any():
+        # 올바른 행만 계산 (마진은 상품 키 기준이라 부분 계산해도 결과가 같음)
+        rows = df if valid.all() else df[valid]
+        product_price[valid], consumer_price[valid] = apply_pricing_rules(
+            rows, supply_price.to_numpy(dtype=np.float64, na_value=np.nan)[valid], random_seed
+        )
+
+    skipped = int((~valid).sum())
+    if skipped:
+        print(f"가격 오류로 {skipped:,}행을 건너뛰었습니다 (빈 값, 숫자가 아닌 값, 0 이하 등)")
+
+    def to_int(values):
+        return pd.Series(values, index=df.index).astype('Int64')
+
+    return {
+        '공급가': supply_price,
+        '판매가': supply_price.copy(),
+        '상품가': to_int(product_price),
+        '소비자가': to_int(consumer_price)
+    }, skipped
+
 def measure_time(func):
     """함수 실행 시간을 측정하는 데코레이터"""
     @wraps(func)
@@ -23,39 +198,26 @@ def calculate_prices(df, random_seed=42):
     # 데이터 복사본 생성
     result_df = df.copy()
     
-    # 1. 소비자가의 값을 공급가, 판매가로 적용 (벡터화 연산)
-    result_df['공급가'] = result_df['소비자가']
-    result_df['판매가'] = result_df['소비자가']
-    
-    # 2. 공급가에서 부가세를 제외한 금액을 상품가로 설정 (벡터화 연산)
-    result_df['상품가'] = (result_df['공급가'] / 1.1).round().astype('int32')
-    
-    # 3. 재현 가능한 랜덤 마진 적용 (벡터화 연산)
-    np.random.seed(random_seed)
-    margin_rates = np.random.uniform(0.15, 0.30, len(result_df))
-    result_df['소비자가'] = ((result_df['공급가'] * (1 + margin_rates)) // 100 * 100).astype('int32')
+    # 소비자가를 공급가/판매가로, 가격 규칙으로 상품가/소비자가 계산 (벡터화 연산)
+    price_columns, _ = _compute_price_columns(df, random_seed)
+    for column, values in price_columns.items():
+        result_df[column] = values
     
     return result_df
 
 def calculate_prices_optimized(df, random_seed=42):
-    """메모리 효율적인 가격 계산 함수"""
+    """
+    메모리 효율적인 가격 계산 함수
+
+    가격은 정규화(쉼표/통화 기호 제거) 후 Int64로 계산하므로 큰 금액도 정밀도를 잃지 않고,
+    가격이 잘못된 행은 <NA>로 두고 건너뜁니다 (invalid_price_rows로 목록 확인).
+    """
     if '소비자가' not in df.columns:
         return df
     
-    # 필요한 컬럼만 처리하여 메모리 절약
-    price_columns = ['소비자가', '공급가', '판매가', '상품가']
-    
-    # 소비자가 컬럼을 기준으로 계산
-    consumer_price = df['소비자가'].astype('float32')  # 메모리 절약을 위해 float32 사용
-    
-    # 벡터화된 계산
-    df['공급가'] = consumer_price.astype('int32')
-    df['판매가'] = consumer_price.astype('int32')
-    df['상품가'] = (consumer_price / 1.1).round().astype('int32')
-    
-    # 재현 가능한 랜덤 마진
-    np.random.seed(random_seed)
-    margin_rates = np.random.uniform(0.15, 0.30, len(df))
-    df['소비자가'] = ((consumer_price * (1 + margin_rates)) // 100 * 100).astype('int32')
+    # 가격 컬럼 계산 (가격 컬럼을 덮어쓰기 전에 계산)
+    price_columns, _ = _compute_price_columns(df, random_seed)
+    for column, values in price_columns.items():
+        df[column] = values
     
-    return df
\ No newline at end of file
+    return df
@@ -0,0 +1,188 @@
+"""
+가격 규칙 테이블 - JSON 데이터 파일을 한 번 읽어 벡터화된 조회 테이블로 컴파일
+
+utils/data/pricing_rules.json(또는 NF_MALL_PRICING_RULES 환경 변수로 지정한 파일)에
+부가세율, 반올림 단위, 기본 마진율과 가격대/카테고리/공급사별 마진율을 정의합니다.
+
+마진율 우선순위: 공급사 > 카테고리 > 가격대 > 기본값
+    - price_bands: [{"min": 공급가 하한, "margin_min": ..., "margin_max": ...}] (하한 이상에 적용)
+    - categories: {"카테고리 이름 또는 코드": {"margin_min": ..., "margin_max": ...}}
+      (카테고리 이름은 별칭도 대표 카테고리로 인식)
+    - suppliers: {"공급사": {"margin_min": ..., "margin_max": ...}}
+margin_min과 margin_max가 같으면 고정 마진율입니다.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.category_table import get_category_table
+
+# 규칙 파일 경로 (환경 변수로 변경 가능)
+DEFAULT_PRICING_RULES_PATH = os.environ.get(
+    'NF_MALL_PRICING_RULES',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pricing_rules.json')
+)
+
+# 규칙 파일에 값이 없을 때 사용하는 기본값
+DEFAULT_VAT_RATE = 0.1
+DEFAULT_MARGIN_MIN = 0.15
+DEFAULT_MARGIN_MAX = 0.30
+DEFAULT_ROUNDING_UNIT = 100
+ROUNDING_MODES = ('floor', 'round', 'ceil')
+
+def _margin_range(rule: Dict, name: str) -> Tuple[float, float]:
+    """규칙의 (최소, 최대) 마진율"""
+    low = float(rule['margin_min'])
+    high = float(rule.get('margin_max', low))
+    if low > high:
+        raise ValueError(f"margin_min이 margin_max보다 큽니다: {name}")
+    return low, high
+
+class PricingRules:
+    """컴파일된 가격 규칙 테이블"""
+
+    def __init__(self, data: Dict):
+        """
+        Args:
+            data: 규칙 파일 내용
+
+        Raises:
+            ValueError: 마진율 범위, 반올림 설정, 가격대 하한이 잘못된 경우
+        """
+        self.vat_rate = float(data.get('vat_rate', DEFAULT_VAT_RATE))
+        rounding = data.get('rounding', {})
+        self.rounding_unit = int(rounding.get('unit', DEFAULT_ROUNDING_UNIT))
+        self.rounding_mode = rounding.get('mode', 'floor')
+        if self.rounding_unit <= 0 or self.rounding_mode not in ROUNDING_MODES:
+            raise ValueError(f"잘못된 반올림 설정입니다: {rounding}")
+
+        default = data.get('default', {})
+        self.margin_min = float(default.get('margin_min', DEFAULT_MARGIN_MIN))
+        self.margin_max = float(default.get('margin_max', DEFAULT_MARGIN_MAX))
+        if self.margin_min > self.margin_max:
+            raise ValueError("기본 margin_min이 margin_max보다 큽니다")
+
+        self.category_column: str = data.get('category_column', '상품분류 번호')
+        self.supplier_column: str = data.get('supplier_column', '공급사')
+
+        # 가격대: 하한 오름차순 정렬 후 searchsorted로 조회
+        bands = sorted(data.get('price_bands', []), key=lambda band: float(band['min']))
+        self._band_edges = np.array([float(band['min']) for band in bands], dtype=np.float64)
+        if len(np.unique(self._band_edges)) != len(self._band_edges):
+            raise ValueError("가격대 하한(min)이 중복되었습니다")
+        self._band_ranges = np.array(
+            [_margin_range(band, f"가격대 {band['min']}") for band in bands], dtype=np.float64
+        ).reshape(-1, 2)
+
+        # 카테고리/공급사: 이름 인덱스 → 마진율 범위
+        # 카테고리 이름은 대표 이름으로 통일 (별칭으로 적은 규칙도 같은 그룹 전체에 적용)
+        aliases = get_category_table().aliases
+        self._category_index, self._category_ranges = self._compile(data.get('categories', {}), aliases)
+        self._supplier_index, self._supplier_ranges = self._compile(data.get('suppliers', {}))
+
+    @staticmethod
+    def _compile(rules: Dict[str, Dict], aliases: Optional[Dict[str, str]] = None) -> Tuple[pd.Index, np.ndarray]:
+        names = [str(name).strip() for name in rules]
+        if aliases:
+            names = [aliases.get(name, name) for name in names]
+        if len(set(names)) != len(names):
+            raise ValueError(f"중복된 규칙 이름입니다: {', '.join(names)}")
+        ranges = np.array([_margin_range(rule, name) for name, rule in rules.items()],
+                          dtype=np.float64).reshape(-1, 2)
+        return pd.Index(names, dtype=object), ranges
+
+    @staticmethod
+    def _unique_keys(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+        """(행별 고유값 위치, 고유값 문자열) - 결측값 위치는 -1"""
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        return codes, pd.Index([str(value).strip() for value in uniques], dtype=object)
+
+    @staticmethod
+    def _assign(bounds: np.ndarray, codes: np.ndarray, unique_positions: np.ndarray, ranges: np.ndarray):
+        """고유값별 규칙 위치를 행으로 펼쳐 일치하는 행의 마진율 범위 덮어쓰기"""
+        positions = np.where(codes >= 0, unique_positions[np.maximum(codes, 0)], -1)
+        matched = positions >= 0
+        bounds[matched] = ranges[positions[matched]]
+
+    def margin_bounds(self, df: pd.DataFrame, supply_price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행별 (최소, 최대) 마진율 배열
+
+        Args:
+            df: 데이터프레임 (카테고리/공급사 컬럼 조회)
+            supply_price: 행별 공급가
+
+        Returns:
+            (최소 마진율 배열, 최대 마진율 배열)
+        """
+        bounds = np.empty((len(df), 2), dtype=np.float64)
+        bounds[:, 0] = self.margin_min
+        bounds[:, 1] = self.margin_max
+
+        # 가격대: 공급가가 속한 구간 (첫 하한 미만이면 기본값)
+        if len(self._band_edges):
+            positions = np.searchsorted(self._band_edges, np.asarray(supply_price, dtype=np.float64),
+                                        side='right') - 1
+            matched = positions >= 0
+            bounds[matched] = self._band_ranges[positions[matched]]
+
+        # 카테고리: 원래 값으로 찾고, 없으면 대표 카테고리 이름으로 찾기
+        if len(self._category_index) and self.category_column in df.columns:
+            codes, uniques = self._unique_keys(df[self.category_column])
+            unique_positions = self._category_index.get_indexer(uniques)
+            missing = unique_positions < 0
+            if missing.any():
+                canonical = get_category_table().canonicalize(pd.Series(uniques[missing], dtype=object))
+                unique_positions[missing] = self._category_index.get_indexer(canonical.fillna(''))
+            self._assign(bounds, codes, unique_positions, self._category_ranges)
+
+        # 공급사 (가장 높은 우선순위)
+        if len(self._supplier_index) and self.supplier_column in df.columns:
+            codes, uniques = self._unique_keys(df[self.supplier_column])
+            self._assign(bounds, codes, self._supplier_index.get_indexer(uniques), self._supplier_ranges)
+
+        return bounds[:, 0], bounds[:, 1]
+
+    def round_price(self, values: np.ndarray) -> np.ndarray:
+        """반올림 단위와 방식에 맞춰 가격 정리"""
+        values = np.asarray(values)
+        unit = self.rounding_unit
+        if self.rounding_mode == 'floor':
+            return values // unit * unit
+        if self.rounding_mode == 'ceil':
+            return -(-values // unit) * unit
+        return (values + unit / 2) // unit * unit
+
+    def exclude_vat(self, values: np.ndarray) -> np.ndarray:
+        """부가세를 제외한 금액 (원 단위 반올림)"""
+        return np.round(np.asarray(values) / (1 + self.vat_rate))
+
+def load_pricing_rules(path: str) -> PricingRules:
+    """
+    규칙 파일을 읽어 가격 규칙 테이블로 컴파일
+
+    Raises:
+        ValueError: 파일을 읽을 수 없거나 형식이 잘못된 경우
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return PricingRules(data)
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"가격 규칙 파일을 읽을 수 없습니다 ({path}): {str(e)}") from e
+
+@lru_cache(maxsize=None)
+def _get_cached_rules(path: str) -> PricingRules:
+    return load_pricing_rules(path)
+
+def get_pricing_rules(path: Optional[str] = None) -> PricingRules:
+    """가격 규칙 테이블 반환 (파일별로 한 번만 컴파일)"""
+    return _get_cached_rules(os.path.abspath(path or DEFAULT_PRICING_RULES_PATH))
+
+def reload_pricing_rules():
+    """규칙 파일을 수정한 뒤 다시 컴파일하도록 캐시 비우기"""
+    _get_cached_rules.cache_clear()
@@ -0,0 +1,244 @@
+"""
+DeepL API 호출용 속도 제한 모듈
+
+- 토큰 버킷으로 초당 요청 수 제한
+- 동시 요청 수 제한 (성공 시 점진적 증가, 429 발생 시 절반으로 감소)
+- 429 응답 시 Retry-After 헤더 준수, 없으면 지터를 적용한 지수 백오프
+- 실패한 요청은 최대 재시도 횟수까지 다시 시도
+
+asyncio 동기화 객체를 사용하지 않으므로 asyncio.run()이 여러 번 호출되어도
+하나의 인스턴스를 계속 공유할 수 있습니다.
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class RateLimitError(Exception):
+    """429 Too Many Requests 응답"""
+
+    def __init__(self, message: str = "429 Too Many Requests", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class QuotaExceededError(Exception):
+    """456 Quota Exceeded 응답 (재시도해도 해결되지 않음)"""
+
+class TransientError(Exception):
+    """타임아웃, 5xx 등 재시도하면 해결될 수 있는 오류"""
+
+class RetriesExhaustedError(Exception):
+    """최대 재시도 횟수 초과"""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더 값(초 또는 HTTP 날짜)을 초 단위로 변환"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AsyncRateLimiter:
+    """토큰 버킷 + 적응형 동시성 제한기"""
+
+    def __init__(self,
+                 requests_per_second: float = 3.0,
+                 burst: int = 3,
+                 initial_concurrency: int = 2,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 8,
+                 max_retries: int = 5,
+                 base_backoff: float = 1.0,
+                 max_backoff: float = 60.0):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._concurrency = float(max(min_concurrency, min(max_concurrency, initial_concurrency)))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._success_streak = 0
+
+        # 통계
+        self._request_count = 0
+        self._rate_limited_count = 0
+        self._retry_count = 0
+        self._failure_count = 0
+
+    def _refill(self, now: float):
+        """경과 시간만큼 토큰 보충"""
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.requests_per_second)
+        self._last_refill = now
+
+    def _try_acquire(self) -> float:
+        """
+        요청 슬롯 획득 시도
+
+        Returns:
+            0이면 획득 성공, 그 외에는 다시 시도하기 전 대기할 시간(초)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._in_flight >= int(self._concurrency):
+                return 0.05
+            if self._tokens < 1.0:
+                return (1.0 - self._tokens) / self.requests_per_second
+
+            self._tokens -= 1.0
+            self._in_flight += 1
+            self._request_count += 1
+            return 0.0
+
+    async def acquire(self):
+        """요청 슬롯 획득 (비동기 대기)"""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        """요청 슬롯 획득 (동기 대기)"""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def release(self):
+        """요청 슬롯 반환"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def on_success(self):
+        """성공 시 동시성 점진적 증가 (현재 동시성만큼 연속 성공하면 +1)"""
+        with self._lock:
+            self._success_streak += 1
+            if self._success_streak >= int(self._concurrency):
+                self._concurrency = min(float(self.max_concurrency), self._concurrency + 1)
+                self._success_streak = 0
+
+    def on_rate_limited(self, retry_after: Optional[float], attempt: int):
+        """429 발생 시 동시성 절반 감소 및 전체 요청 일시 중단"""
+        delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+        with self._lock:
+            self._rate_limited_count += 1
+            self._concurrency = max(float(self.min_concurrency), self._concurrency / 2)
+            self._success_streak = 0
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """지터를 적용한 지수 백오프 대기 시간"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(self, request_func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        속도 제한과 재시도를 적용하여 비동기 요청 실행
+
+        Args:
+            request_func: 요청을 수행하는 코루틴 함수 (RateLimitError, TransientError로 재시도 신호)
+
+        Raises:
+            QuotaExceededError: 사용량 한도 초과 (재시도하지 않음)
+            RetriesExhaustedError: 최대 재시도 횟수 초과
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                with self._lock:
+                    self._retry_count += 1
+
+            await self.acquire()
+            try:
+                result = await request_func()
+            except RateLimitError as e:
+                self.on_rate_limited(e.retry_after, attempt)
+                last_error = e
+                continue
+            except TransientError as e:
+                last_error = e
+            else:
+                self.on_success()
+                return result
+            finally:
+                self.release()
+
+            # 일시적 오류는 슬롯을 반환한 뒤 백오프 후 재시도
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff_delay(attempt))
+
+        with self._lock:
+            self._failure_count += 1
+        raise RetriesExhaustedError(f"최대 재시도 횟수({self.max_retries}) 초과: {last_error}")
+
+    def run_sync(self, request_func: Callable[[], Any]) -> Any:
+        """속도 제한과 재시도를 적용하여 동기 요청 실행 (run과 동일한 규칙)"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                with self._lock:
+                    self._retry_count += 1
+
+            self.acquire_sync()
+            try:
+                result = request_func()
+            except RateLimitError as e:
+                self.on_rate_limited(e.retry_after, attempt)
+                last_error = e
+                continue
+            except TransientError as e:
+                last_error = e
+            else:
+                self.on_success()
+                return result
+            finally:
+                self.release()
+
+            # 일시적 오류는 슬롯을 반환한 뒤 백오프 후 재시도
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_delay(attempt))
+
+        with self._lock:
+            self._failure_count += 1
+        raise RetriesExhaustedError(f"최대 재시도 횟수({self.max_retries}) 초과: {last_error}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """속도 제한 통계 반환"""
+        with self._lock:
+            return {
+                'request_count': self._request_count,
+                'rate_limited_count': self._rate_limited_count,
+                'retry_count': self._retry_count,
+                'failure_count': self._failure_count,
+                'concurrency': int(self._concurrency),
+                'in_flight': self._in_flight
+            }
+
+# 전역 속도 제한기 인스턴스 (모든 DeepL 호출이 공유)
+_global_rate_limiter = AsyncRateLimiter()
+
+def get_rate_limiter() -> AsyncRateLimiter:
+    """전역 속도 제한기 반환"""
+    return _global_rate_limiter
@@ -1,14 +1,29 @@
 """
-간소화된 번역 모듈 (캐시 제거 버전)
+간소화된 번역 모듈
 """
 import requests
-import time
 import asyncio
 import aiohttp
 import re
+import hashlib
+import json
+from functools import lru_cache
 import pandas as pd
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+from urllib.parse import quote_plus
 import streamlit as st
+from utils.rate_limiter import (
+    AsyncRateLimiter, RateLimitError, QuotaExceededError, TransientError,
+    RetriesExhaustedError, get_rate_limiter, parse_retry_after
+)
+from utils.deepl_client import DeepLClient, get_deepl_client
+from utils.translation_checkpoint import TranslationCheckpoint
+
+DEEPL_API_URL = "https://api-free.deepl.com/v2/translate"
+
+# DeepL 요청 제한: 요청당 text 필드 최대 50개, 요청 본문 최대 128KiB
+DEEPL_MAX_TEXTS_PER_REQUEST = 50
+DEEPL_MAX_REQUEST_BYTES = 128 * 1024
 
 # 색상 번역 용어집 (한국어 -> 일본어) - 대폭 확장
 COLOR_GLOSSARY: Dict[str, str] = {
@@ -93,6 +108,84 @@ COLOR_GLOSSARY: Dict[str, str] = {
     "무광실버": "マットシルバー", "유광실버": "グロッシーシルバー"
 }
 
+# 옵션 번역용 색상 매핑 테이블 (옵션 번역 초기 버전에서 사용하던 목록)
+OPTION_COLOR_MAP: Dict[str, str] = {
+    # 기본 색상
+    '화이트': 'ホワイト', '블랙': 'ブラック', '그레이': 'グレー',
+    '연그레이': 'ライトグレー', '진그레이': 'ダークグレー',
+    '베이지': 'ベージュ', '브라운': 'ブラウン', '네이비': 'ネイビー',
+    '오크': 'オーク', '메이플': 'メープル', '아카시아': 'アカシア',
+    '월넛': 'ウォルナット', '멀바우': 'メルバウ', '크림': 'クリーム',
+    '아이보리': 'アイボリー', '카키': 'カーキ', '올리브': 'オリーブ',
+    '민트': 'ミント', '라벤더': 'ラベンダー', '골드': 'ゴールド',
+    '실버': 'シルバー', '레드': 'レッド', '블루': 'ブルー',
+    '그린': 'グリーン', '옐로우': 'イエロー', '핑크': 'ピンク',
+    
+    # 복합 색상 (로그에서 자주 나타나는 색상들)
+    '오크화이트': 'オークホワイト', '크림화이트': 'クリームホワイト',
+    '네추럴': 'ナチュラル', '네추럴멀바우': 'ナチュラルメルバウ',
+    '네추럴피치': 'ナチュラルピーチ', '네추럴블루': 'ナチュラルブルー',
+    '화이트메이플': 'ホワイトメープル', '화이트그레이': 'ホワイトグレー',
+    '화이트오크': 'ホワイトオーク', '다크브라운': 'ダークブラウン',
+    '라이트브라운': 'ライトブラウン', '딥브라운': 'ディープブラウン',
+    
+    # 자주 사용되는 복합 색상들 추가
+    '그레이블랙': 'グレーブラック', '참죽': 'チャンチュン', '투톤': 'ツートン',
+    '모카브라운': 'モカブラウン', '버건디': 'バーガンディ', '파우더블루': 'パウダーブルー',
+    '로투스핑크': 'ロータスピンク', '네추럴화이트': 'ナチュラルホワイト',
+    '아이보리메이플': 'アイボリーメープル', '워시그린': 'ウォッシュグリーン',
+    '블랙아카시아': 'ブラックアカシア', '그레이메이플': 'グレーメープル',
+    '커피': 'コーヒー', '베이지브라운': 'ベージュブラウン', '모카': 'モカ',
+    '오렌지': 'オレンジ', '연핑크': 'ライトピンク', '라이트그레이': 'ライトグレー',
+    '웜그레이': 'ウォームグレー', '샌드베이지': 'サンドベージュ', '어프리콧': 'アプリコット',
+    '레몬': 'レモン', '대리석': '大理石', '투명': '透明', '엘다': 'エルダー',
+    '포레스트그린': 'フォレストグリーン', '샌드그레이': 'サンドグレー',
+    '새틴그레이': 'サテングレー', '바샬트그레이': 'バサルトグレー',
+    '차콜그레이': 'チャコールグレー', '메탈그레이': 'メタルグレー',
+    '빈티지그레이': 'ヴィンテージグレー', '페일그레이': 'ペールグレー',
+    '다크그레이': 'ダークグレー', '연회색': 'ライトグレー',
+    '무드블랙': 'ムードブラック', '차콜블랙': 'チャコールブラック',
+    '로즈골드': 'ローズゴールド', '무광실버': 'マットシルバー',
+    '유광실버': 'グロッシーシルバー', '세라믹': 'セラミック',
+    '원목': '無垢材', '내추럴': 'ナチュラル', '워시': 'ウォッシュ',
+    '빈티지': 'ヴィンテージ', '엔틱': 'アンティーク', '새틴': 'サテン',
+    '마블': 'マーブル', '메탈': 'メタル', '우드': 'ウッド'
+}
+
+# 복합 색상 수식어 (수식어 + 기본색상 형태의 색상명 분해용)
+COLOR_MODIFIERS: Dict[str, str] = {
+    "다크": "ダーク", "라이트": "ライト", "딥": "ディープ",
+    "소프트": "ソフト", "크림": "クリーム", "메이플": "メープル",
+    "아이스": "アイス", "펄": "パール", "매트": "マット",
+    "오크": "オーク", "아카시아": "アカシア", "월넛": "ウォルナット",
+    "멀바우": "メルバウ", "엘다": "エルダー", "고무나무": "ゴムノキ",
+    "삼나무": "スギ", "참죽": "チャンチュン", "내추럴": "ナチュラル",
+    "네추럴": "ナチュラル", "워시": "ウォッシュ", "빈티지": "ヴィンテージ",
+    "엔틱": "アンティーク", "우드": "ウッド", "애쉬": "アッシュ",
+    "새틴": "サテン", "마블": "マーブル", "레드파인": "レッドパイン",
+    "진": "ダーク", "연": "ライト", "올": "オール", "무드": "ムード",
+    "블랙": "ブラック", "스카이": "スカイ", "베이비": "ベビー", "로즈": "ローズ",
+    "파우더": "パウダー", "모닝": "モーニング", "틸": "ティール",
+    "샌드": "サンド", "메탈": "メタル", "바샬트": "バサルト",
+    "웜": "ウォーム", "차콜": "チャコール", "인디": "インディ",
+    "로투스": "ロータス", "스모키": "スモーキー", "버터": "バター",
+    "순백": "純白", "유백": "乳白"
+}
+
+# 색상명 조회 테이블 (COLOR_GLOSSARY 우선)
+COLOR_LOOKUP: Dict[str, str] = {
+    **{k.lower(): v for k, v in OPTION_COLOR_MAP.items()},
+    **{k.lower(): v for k, v in COLOR_GLOSSARY.items()}
+}
+
+# 옵션 입력의 색상{A|B|C} 형식
+OPTION_COLOR_PATTERN = re.compile(r'색상\{([^}]+)\}')
+
+# 용어집 버전 (용어집이 바뀌면 번역 캐시 키도 바뀜)
+GLOSSARY_VERSION = hashlib.md5(
+    json.dumps([sorted(COLOR_LOOKUP.items()), sorted(COLOR_MODIFIERS.items())], ensure_ascii=False).encode()
+).hexdigest()[:12]
+
 def preprocess_text(text: str) -> str:
     """번역 전 텍스트 전처리"""
     if not text or not isinstance(text, str):
@@ -106,7 +199,102 @@ def preprocess_text(text: str) -> str:
     
     return text
 
-def validate_deepl_api_key(api_key: str) -> bool:
+def pack_text_requests(texts: List[str], max_texts: int = DEEPL_MAX_TEXTS_PER_REQUEST,
+                       max_bytes: int = DEEPL_MAX_REQUEST_BYTES) -> List[List[int]]:
+    """
+    텍스트들을 DeepL 요청 단위로 묶는 함수
+
+    Args:
+        texts: 번역할 텍스트 리스트 (전처리 완료)
+        max_texts: 요청당 최대 텍스트 수
+        max_bytes: 요청당 최대 본문 크기 (form 인코딩 기준)
+
+    Returns:
+        요청별 원본 위치 인덱스 리스트 (예: [[0, 1, 2], [3, 4]])
+    """
+    # auth_key, target_lang 등 고정 필드 여유분
+    base_bytes = 256
+
+    requests_indices = []
+    current = []
+    current_bytes = base_bytes
+
+    for i, text in enumerate(texts):
+        text_bytes = len('&text=') + len(quote_plus(text))
+
+        if current and (len(current) >= max_texts or current_bytes + text_bytes > max_bytes):
+            requests_indices.append(current)
+            current = []
+            current_bytes = base_bytes
+
+        current.append(i)
+        current_bytes += text_bytes
+
+    if current:
+        requests_indices.append(current)
+
+    return requests_indices
+
+def _check_deepl_status(status: int, retry_after: Optional[str] = None):
+    """재시도가 필요한 DeepL 응답 코드를 예외로 변환"""
+    if status == 429:
+        raise RateLimitError(retry_after=parse_retry_after(retry_after))
+    if status == 456:
+        raise QuotaExceededError("DeepL API 사용량 한도를 초과했습니다 (456)")
+    if status >= 500:
+        raise TransientError(f"DeepL 서버 오류 ({status})")
+
+async def translate_multi_async(session, texts: List[str], api_key: str,
+                                target_lang: str = 'JA',
+                                rate_limiter: Optional[AsyncRateLimiter] = None) -> List[str]:
+    """
+    여러 텍스트를 하나의 DeepL 요청으로 번역 (결과는 입력 순서대로 반환)
+
+    429, 5xx, 타임아웃은 속도 제한기를 통해 재시도하며, 재시도 후에도 실패하면
+    모든 위치에 빈 문자열을 반환합니다.
+
+    Raises:
+        QuotaExceededError: 사용량 한도 초과 (456)
+    """
+    if not texts:
+        return []
+
+    limiter = rate_limiter or get_rate_limiter()
+
+    data = [
+        ('auth_key', api_key),
+        ('target_lang', target_lang),
+        ('preserve_formatting', '1')
+    ]
+    data.extend(('text', text) for text in texts)
+
+    async def request() -> List[str]:
+        try:
+            async with session.post(DEEPL_API_URL, data=data, timeout=30) as response:
+                _check_deepl_status(response.status, response.headers.get('Retry-After'))
+                if response.status == 200:
+                    result = await response.json()
+                    translations = result.get('translations', [])
+                    if len(translations) != len(texts):
+                        raise TransientError(f"번역 결과 개수 불일치: 요청 {len(texts)}개, 응답 {len(translations)}개")
+                    return [t.get('text', '') or '' for t in translations]
+                elif response.status == 403:
+                    print(f"403 Forbidden: {len(texts)}개 텍스트 요청")
+                else:
+                    print(f"API 응답 코드 {response.status}: {len(texts)}개 텍스트 요청")
+                return [""] * len(texts)
+        except asyncio.TimeoutError:
+            raise TransientError(f"타임아웃: {len(texts)}개 텍스트 요청")
+        except aiohttp.ClientError as e:
+            raise TransientError(f"연결 오류: {str(e)}")
+
+    try:
+        return await limiter.run(request)
+    except RetriesExhaustedError as e:
+        print(f"비동기 다중 번역 실패 ({len(texts)}개 텍스트): {str(e)}")
+        return [""] * len(texts)
+
+def validate_deepl_api_key(api_key: str, client: Optional[DeepLClient] = None) -> bool:
     """DeepL API 키 유효성 검증"""
     if not api_key or not api_key.strip():
         st.error("API 키가 입력되지 않았습니다.")
@@ -118,7 +306,7 @@ def validate_deepl_api_key(api_key: str) -> bool:
         return False
     
     # 간단한 테스트 번역으로 API 키 검증
-    test_url = "https://api-free.deepl.com/v2/translate"
+    test_url = DEEPL_API_URL
     test_data = {
         'auth_key': api_key.strip(),
         'text': 'test',
@@ -126,7 +314,8 @@ def validate_deepl_api_key(api_key: str) -> bool:
     }
     
     try:
-        response = requests.post(test_url, data=test_data, timeout=10)
+        client = client or get_deepl_client()
+        response = client.sync_session.post(test_url, data=test_data, timeout=10)
         
         if response.status_code == 403:
             st.error("API 키가 유효하지 않거나 권한이 없습니다.")
@@ -148,8 +337,17 @@ def validate_deepl_api_key(api_key: str) -> bool:
     
     return False
 
-def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA') -> Optional[str]:
-    """DeepL API를 사용한 단일 텍스트 번역"""
+def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA',
+                         rate_limiter: Optional[AsyncRateLimiter] = None,
+                         client: Optional[DeepLClient] = None) -> Optional[str]:
+    """
+    DeepL API를 사용한 단일 텍스트 번역
+
+    429, 5xx, 타임아웃은 속도 제한기를 통해 재시도합니다.
+
+    Raises:
+        QuotaExceededError: 사용량 한도 초과 (456)
+    """
     if not text or not text.strip():
         return ""
     
@@ -157,7 +355,9 @@ def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA') -> Op
     if not preprocessed_text:
         return ""
     
-    url = "https://api-free.deepl.com/v2/translate"
+    limiter = rate_limiter or get_rate_limiter()
+    session = (client or get_deepl_client()).sync_session
+    url = DEEPL_API_URL
     
     data = {
         'auth_key': api_key,
@@ -166,8 +366,15 @@ def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA') -> Op
         'preserve_formatting': '1'
     }
     
-    try:
-        response = requests.post(url, data=data, timeout=10)  # 타임아웃 단축
+    def request() -> Optional[str]:
+        try:
+            response = session.post(url, data=data, timeout=10)  # 타임아웃 단축
+        except requests.exceptions.Timeout:
+            raise TransientError(f"번역 API 타임아웃: {preprocessed_text}")
+        except requests.exceptions.ConnectionError as e:
+            raise TransientError(f"번역 API 연결 오류: {str(e)}")
+        
+        _check_deepl_status(response.status_code, response.headers.get('Retry-After'))
         
         # 403 에러에 대한 간단한 처리
         if response.status_code == 403:
@@ -181,9 +388,13 @@ def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA') -> Op
         
         print(f"번역 API 응답 코드: {response.status_code}")
         return None
-        
-    except requests.exceptions.Timeout:
-        print(f"번역 API 타임아웃: {preprocessed_text}")
+    
+    try:
+        return limiter.run_sync(request)
+    except QuotaExceededError:
+        raise
+    except RetriesExhaustedError as e:
+        print(f"번역 API 재시도 실패: {str(e)}")
         return None
     except requests.exceptions.RequestException as e:
         print(f"번역 API 오류: {str(e)}")
@@ -193,11 +404,14 @@ def translate_with_deepl(text: str, api_key: str, target_lang: str = 'JA') -> Op
         return None
 
 def translate_batch_with_deepl(texts: List[str], api_key: str, target_lang: str = 'JA', 
-                              batch_size: int = 5) -> List[str]:
-    """배치 번역 (동기 방식)"""
+                              batch_size: int = 5,
+                              rate_limiter: Optional[AsyncRateLimiter] = None,
+                              client: Optional[DeepLClient] = None) -> List[str]:
+    """배치 번역 (동기 방식) - 호출 간격은 공유 속도 제한기가 조절"""
     if not texts:
         return []
     
+    limiter = rate_limiter or get_rate_limiter()
     translated_texts = [""] * len(texts)
     
     # 진행률 표시
@@ -205,43 +419,67 @@ def translate_batch_with_deepl(texts: List[str], api_key: str, target_lang: str
     status_text = st.empty()
     
     total_batches = (len(texts) + batch_size - 1) // batch_size
+    failed_count = 0
     
-    for batch_idx in range(0, len(texts), batch_size):
-        batch_texts = texts[batch_idx:batch_idx + batch_size]
-        batch_translations = []
-        
-        for text in batch_texts:
-            translation = translate_with_deepl(text, api_key, target_lang)
-            batch_translations.append(translation if translation else "")
-            time.sleep(2.0)  # API 호출 간격 (429 에러 방지)
-        
-        # 결과 저장
-        for i, translation in enumerate(batch_translations):
-            translated_texts[batch_idx + i] = translation
-        
-        # 진행률 업데이트
-        current_batch = (batch_idx // batch_size) + 1
-        progress = current_batch / total_batches
-        progress_bar.progress(progress)
-        status_text.text(f"번역 진행: {current_batch}/{total_batches} 배치 완료")
+    try:
+        for batch_idx in range(0, len(texts), batch_size):
+            batch_texts = texts[batch_idx:batch_idx + batch_size]
+            batch_translations = []
+            
+            for text in batch_texts:
+                translation = translate_with_deepl(text, api_key, target_lang,
+                                                   rate_limiter=limiter, client=client)
+                if not translation and text and text.strip():
+                    failed_count += 1
+                batch_translations.append(translation if translation else "")
+            
+            # 결과 저장
+            for i, translation in enumerate(batch_translations):
+                translated_texts[batch_idx + i] = translation
+            
+            # 진행률 업데이트
+            current_batch = (batch_idx // batch_size) + 1
+            progress = current_batch / total_batches
+            progress_bar.progress(progress)
+            status_text.text(f"번역 진행: {current_batch}/{total_batches} 배치 완료")
+    except QuotaExceededError as e:
+        st.error(f"❌ {str(e)} - 남은 텍스트는 번역되지 않았습니다.")
     
     progress_bar.empty()
     status_text.empty()
     
+    if failed_count:
+        st.warning(f"⚠️ 재시도 후에도 번역하지 못한 텍스트: {failed_count}개")
+    
     return translated_texts
 
-async def translate_batch_async_with_deepl(texts: List[str], api_key: str, 
-                                         target_lang: str = 'JA', 
-                                         batch_size: int = 5) -> List[str]:
-    """배치 번역 (비동기 방식) - 중복 제거 및 캐싱 최적화"""
+async def translate_batch_async_with_deepl(texts: List[str], api_key: str,
+                                         target_lang: str = 'JA',
+                                         batch_size: int = 5,
+                                         use_multi_text: bool = True,
+                                         rate_limiter: Optional[AsyncRateLimiter] = None,
+                                         client: Optional[DeepLClient] = None,
+                                         checkpoint: Optional[TranslationCheckpoint] = None) -> List[str]:
+    """
+    배치 번역 (비동기 방식) - 중복 제거 및 캐싱 최적화
+
+    캐시에 없는 고유 텍스트만 번역한 뒤 같은 텍스트의 모든 위치에 결과를 채우고,
+    성공한 번역은 TranslationCache에 저장합니다.
+    checkpoint가 주어지면 이전 실행에서 완료된 텍스트는 건너뛰고,
+    새로 완료된 번역을 배치마다 체크포인트 파일에 기록합니다.
+
+    use_multi_text가 True이면 여러 텍스트를 하나의 요청으로 묶어 보내며
+    (요청당 최대 DEEPL_MAX_TEXTS_PER_REQUEST개), False이면 텍스트 하나당 요청 하나를 보냅니다.
+    요청 간격과 재시도는 공유 속도 제한기가 조절하고, batch_size는 이 호출의 동시 요청 수 상한입니다.
+    HTTP 연결은 공유 DeepLClient의 연결 풀을 재사용합니다.
+    """
     if not texts:
         return []
     
     from utils.translation_cache import get_translation_cache
     cache = get_translation_cache()
     
-    # 1단계: 캐시에서 기존 번역 조회 및 중복 제거
-    unique_texts = []
+    # 1단계: 중복 제거 후 캐시에서 기존 번역 일괄 조회
     text_to_indices = {}  # 각 고유 텍스트가 원본 리스트의 어느 위치에 있는지 매핑
     translated_texts = [""] * len(texts)
     
@@ -249,110 +487,224 @@ async def translate_batch_async_with_deepl(texts: List[str], api_key: str,
         if not text or not text.strip():
             translated_texts[i] = text
             continue
-        
-        # 캐시 조회
-        cached_result = cache.get(text, target_lang)
-        if cached_result is not None:
-            translated_texts[i] = cached_result
-            continue
-        
-        # 중복 제거
-        if text not in text_to_indices:
-            text_to_indices[text] = []
-            unique_texts.append(text)
-        text_to_indices[text].append(i)
+        text_to_indices.setdefault(text, []).append(i)
+    
+    # 이전 실행에서 완료된 번역 (체크포인트)
+    resumed_results = {}
+    if checkpoint is not None:
+        resumed_results = {text: translation for text, translation in checkpoint.load().items()
+                           if text in text_to_indices}
+    
+    cached_results = cache.get_many(
+        [text for text in text_to_indices if text not in resumed_results], target_lang, GLOSSARY_VERSION
+    )
+    for text, known_result in {**cached_results, **resumed_results}.items():
+        for i in text_to_indices[text]:
+            translated_texts[i] = known_result
+    
+    unique_texts = [text for text in text_to_indices
+                    if text not in cached_results and text not in resumed_results]
     
     if not unique_texts:
         return translated_texts
     
-    st.info(f"🔄 중복 제거: {len(texts)}개 → {len(unique_texts)}개 (캐시 적중: {len(texts) - len(unique_texts) - sum(len(indices) for indices in text_to_indices.values())}개)")
+    resume_info = f", 이어하기: {len(resumed_results)}개" if resumed_results else ""
+    st.info(f"🔄 중복 제거: {len(texts)}개 → {len(unique_texts)}개 번역 (캐시 적중: {len(cached_results)}개{resume_info})")
     
     # 진행률 표시
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    async def translate_single_async(session, text: str) -> str:
-        """단일 텍스트 비동기 번역"""
-        if not text or not text.strip():
-            return ""
-        
-        preprocessed_text = preprocess_text(text)
-        if not preprocessed_text:
-            return ""
-        
-        url = "https://api-free.deepl.com/v2/translate"
-        data = {
-            'auth_key': api_key,
-            'text': preprocessed_text,
-            'target_lang': target_lang,
-            'preserve_formatting': '1'
-        }
-        
-        try:
-            async with session.post(url, data=data, timeout=15) as response:  # 타임아웃 증가
-                if response.status == 200:
-                    result = await response.json()
-                    if 'translations' in result and result['translations']:
-                        translated_text = result['translations'][0]['text']
-                        if translated_text and translated_text.strip():
-                            return translated_text
-                        else:
-                            print(f"빈 번역 결과: '{preprocessed_text}' -> '{translated_text}'")
-                            return ""
-                elif response.status == 403:
-                    print(f"403 Forbidden: '{preprocessed_text}'")
-                    return ""
-                else:
-                    print(f"API 응답 코드 {response.status}: '{preprocessed_text}'")
-                    return ""
-        except asyncio.TimeoutError:
-            print(f"타임아웃: '{preprocessed_text}'")
-            return ""
-        except Exception as e:
-            print(f"비동기 번역 오류 '{preprocessed_text}': {str(e)}")
-            return ""
-        
-        return ""
+    def store_results(batch_texts: List[str], batch_translations: List[str]):
+        """번역 결과를 원본 위치에 채우고 캐시에 저장"""
+        for text, translation in zip(batch_texts, batch_translations):
+            for i in text_to_indices[text]:
+                translated_texts[i] = translation
+        # 실패(빈 결과)는 캐시하지 않아 다음 실행에서 다시 시도
+        completed = {text: translation for text, translation in zip(batch_texts, batch_translations) if translation}
+        cache.set_many(completed, target_lang, GLOSSARY_VERSION)
+        if checkpoint is not None:
+            checkpoint.record(completed)
+    
+    limiter = rate_limiter or get_rate_limiter()
+    
+    # 전처리 후 빈 텍스트는 제외하고 요청 단위로 묶기
+    preprocessed = [preprocess_text(text) for text in unique_texts]
+    valid_indices = [i for i, text in enumerate(preprocessed) if text]
+    
+    if use_multi_text:
+        packed = pack_text_requests([preprocessed[i] for i in valid_indices])
+    else:
+        packed = [[j] for j in range(len(valid_indices))]
+    request_groups = [[valid_indices[j] for j in group] for group in packed]
+    total_requests = len(request_groups)
     
-    # 비동기 처리
-    async with aiohttp.ClientSession() as session:
-        total_batches = (len(texts) + batch_size - 1) // batch_size
-        
-        for batch_idx in range(0, len(texts), batch_size):
-            batch_texts = texts[batch_idx:batch_idx + batch_size]
-            
-            # 배치 내 비동기 처리
-            tasks = [translate_single_async(session, text) for text in batch_texts]
-            batch_translations = await asyncio.gather(*tasks)
+    # 비동기 처리 (공유 연결 풀 사용)
+    session = await (client or get_deepl_client()).get_async_session()
+    call_semaphore = asyncio.Semaphore(max(1, batch_size))
+    
+    async def translate_group(group: List[int]):
+        async with call_semaphore:
+            translations = await translate_multi_async(
+                session, [preprocessed[i] for i in group], api_key, target_lang, rate_limiter=limiter
+            )
+        return group, translations
+    
+    tasks = [asyncio.ensure_future(translate_group(group)) for group in request_groups]
+    completed = 0
+    
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            group, group_translations = await next_done
             
-            # 결과 저장
-            for i, translation in enumerate(batch_translations):
-                translated_texts[batch_idx + i] = translation
+            # 위치 기준으로 결과 매핑
+            store_results([unique_texts[i] for i in group], group_translations)
             
             # 진행률 업데이트
-            current_batch = (batch_idx // batch_size) + 1
-            progress = current_batch / total_batches
-            progress_bar.progress(progress)
-            status_text.text(f"번역 진행: {current_batch}/{total_batches} 배치 완료")
-            
-            # API 호출 간격 (429 에러 방지를 위해 증가)
-            await asyncio.sleep(2.0)  # 2초로 증가
-    
+            completed += 1
+            progress_bar.progress(completed / total_requests)
+            status_text.text(
+                f"번역 진행: {completed}/{total_requests} 요청 완료 "
+                f"(텍스트 {len(valid_indices)}개)"
+            )
+    except QuotaExceededError as e:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        st.error(f"❌ {str(e)} - 남은 텍스트는 번역되지 않았습니다. 완료된 번역은 캐시에 저장되었습니다.")
+
     progress_bar.empty()
     status_text.empty()
     
+    failed_count = sum(1 for i in valid_indices if not translated_texts[text_to_indices[unique_texts[i]][0]])
+    if failed_count:
+        st.warning(f"⚠️ 재시도 후에도 번역하지 못한 텍스트: {failed_count}개 (다음 실행 시 다시 시도됩니다)")
+    
     return translated_texts
 
 # 기존 함수들과의 호환성을 위한 래퍼 함수들
 async def translate_product_names(df, target_column: str, api_key: str, 
-                                batch_size: int = 5, use_async: bool = True):
-    """상품명 번역 (기존 인터페이스 호환)"""
-    texts = df[target_column].fillna("").astype(str).tolist()
+                                batch_size: int = 5, use_async: bool = True,
+                                rate_limiter: Optional[AsyncRateLimiter] = None,
+                                checkpoint: Optional[TranslationCheckpoint] = None):
+    """상품명 번역 (기존 인터페이스 호환, 체크포인트는 비동기 방식에서만 사용)"""
+    texts = df[target_column].astype(object).fillna("").astype(str).tolist()
     
     if use_async:
-        return await translate_batch_async_with_deepl(texts, api_key, batch_size=batch_size)
+        return await translate_batch_async_with_deepl(texts, api_key, batch_size=batch_size,
+                                                      rate_limiter=rate_limiter, checkpoint=checkpoint)
     else:
-        return translate_batch_with_deepl(texts, api_key, batch_size=batch_size)
+        return translate_batch_with_deepl(texts, api_key, batch_size=batch_size,
+                                          rate_limiter=rate_limiter)
+
+# 트라이 노드에서 용어집 색상/수식어 번역을 저장하는 키
+_TRIE_COLOR = '\0color'
+_TRIE_MODIFIER = '\0modifier'
+
+@lru_cache(maxsize=1)
+def _get_color_trie() -> Dict:
+    """용어집 색상과 수식어로 구성한 트라이 (최초 사용 시 한 번만 생성)"""
+    trie = {}
+    for entries, marker in ((COLOR_LOOKUP, _TRIE_COLOR), (COLOR_MODIFIERS, _TRIE_MODIFIER)):
+        for korean, japanese in entries.items():
+            node = trie
+            for char in korean.lower().replace(' ', ''):
+                node = node.setdefault(char, {})
+            node[marker] = japanese
+    return trie
+
+def _match_prefixes(key: str) -> List[Tuple[int, Dict]]:
+    """key의 앞부분과 일치하는 용어집 단어들의 (끝 위치, 노드) 리스트 (짧은 순)"""
+    matches = []
+    node = _get_color_trie()
+    for pos, char in enumerate(key):
+        node = node.get(char)
+        if node is None:
+            break
+        if _TRIE_COLOR in node or _TRIE_MODIFIER in node:
+            matches.append((pos + 1, node))
+    return matches
+
+def _match_exact(key: str) -> Optional[Dict]:
+    """key 전체와 일치하는 트라이 노드"""
+    node = _get_color_trie()
+    for char in key:
+        node = node.get(char)
+        if node is None:
+            return None
+    return node
+
+@lru_cache(maxsize=65536)
+def _resolve_normalized_color(key: str) -> Optional[str]:
+    """정규화된(소문자, 공백 제거) 색상명을 용어집으로 해결"""
+    # 1단계: 정확한 매칭
+    exact = COLOR_LOOKUP.get(key)
+    if exact is not None:
+        return exact
+
+    prefixes = _match_prefixes(key)
+
+    # 2단계: 앞부분(수식어/용어집 단어) + 용어집 색상 (긴 앞부분 우선)
+    for end, node in reversed(prefixes):
+        if end == len(key):
+            continue
+        base = COLOR_LOOKUP.get(key[end:])
+        if base is None:
+            continue
+        head_jp = node.get(_TRIE_MODIFIER) or node.get(_TRIE_COLOR)
+        return f"{head_jp}{base}"
+
+    # 3단계: 용어집 색상 + 뒷부분 수식어 (긴 수식어 우선)
+    for end, node in prefixes:
+        base = node.get(_TRIE_COLOR)
+        if base is None or end == len(key):
+            continue
+        tail = _match_exact(key[end:])
+        if tail is not None and _TRIE_MODIFIER in tail:
+            return f"{base}{tail[_TRIE_MODIFIER]}"
+
+    return None
+
+def resolve_color(color: str) -> Optional[str]:
+    """
+    용어집만으로 색상명을 번역하는 함수 (API 호출 없음)
+
+    1. 용어집 정확 매칭
+    2. 복합 색상 분해: 가장 긴 앞부분(수식어/용어집 단어) + 용어집 색상,
+       또는 용어집 색상 + 가장 긴 뒷부분 수식어
+
+    Returns:
+        번역 결과 또는 용어집으로 해결할 수 없으면 None
+    """
+    if not color or not isinstance(color, str):
+        return None
+
+    key = color.strip().lower().replace(' ', '')
+    if not key:
+        return None
+
+    return _resolve_normalized_color(key)
+
+def resolve_colors(colors) -> Tuple[Dict[str, str], List[str]]:
+    """
+    여러 색상명을 용어집으로 먼저 해결하고 남은 색상만 반환
+
+    Returns:
+        (용어집으로 해결된 {원본: 번역}, API 번역이 필요한 고유 색상 리스트)
+    """
+    resolved = {}
+    unknown = []
+
+    for color in dict.fromkeys(colors):
+        if not color or not color.strip():
+            continue
+        translation = resolve_color(color)
+        if translation is not None:
+            resolved[color] = translation
+        else:
+            unknown.append(color)
+
+    return resolved, unknown
 
 def translate_color_with_glossary(color: str, api_key: str, target_lang: str = 'JA') -> str:
     """용어집을 활용한 색상 번역 (간소화된 버전)"""
@@ -362,9 +714,10 @@ def translate_color_with_glossary(color: str, api_key: str, target_lang: str = '
     color = color.strip()
     color_lower = color.lower()
     
-    # 1단계: 정확한 매칭 우선
-    if color_lower in COLOR_GLOSSARY:
-        return COLOR_GLOSSARY[color_lower]
+    # 1단계: 정확한 매칭 및 복합 색상 분해 우선
+    resolved = resolve_color(color)
+    if resolved is not None:
+        return resolved
     
     # 2단계: 부분 매칭 (간소화)
     for korean, japanese in COLOR_GLOSSARY.items():
@@ -384,7 +737,7 @@ def translate_option_colors(option_text: str, api_key: str, target_lang: str = '
         return option_text
     
     # 색상{...} 형식 파싱
-    match = re.match(r'색상\{([^}]+)\}', option_text)
+    match = OPTION_COLOR_PATTERN.match(option_text)
     if not match:
         return option_text
     
@@ -402,103 +755,43 @@ def translate_option_colors(option_text: str, api_key: str, target_lang: str = '
 
 def analyze_colors_in_data(df, option_columns: List[str] = None) -> Dict:
     """데이터에서 색상 분석"""
-    import pandas as pd
     from collections import Counter
     
     if option_columns is None:
         option_columns = [col for col in df.columns if '옵션입력' in col]
     
-    all_colors = []
+    total_color_counter = Counter()
     color_stats = {}
     
     for col in option_columns:
         if col not in df.columns:
             continue
-            
-        col_colors = []
-        for option_text in df[col].fillna(""):
+        
+        # 색상{...} 형식 파싱 (고유 옵션 문자열 단위로 한 번만 처리)
+        col_colors = Counter()
+        for option_text, row_count in df[col].dropna().value_counts().items():
             if not isinstance(option_text, str):
                 continue
-                
-            # 색상{...} 형식 파싱
-            match = re.match(r'색상\{([^}]+)\}', option_text)
-            if match:
-                colors = [c.strip() for c in match.group(1).split('|') if c.strip()]
-                col_colors.extend(colors)
-                all_colors.extend(colors)
+            match = OPTION_COLOR_PATTERN.match(option_text)
+            if not match:
+                continue
+            for color in match.group(1).split('|'):
+                color = color.strip()
+                if color:
+                    col_colors[color] += row_count
         
-        color_stats[col] = Counter(col_colors)
-    
-    # 전체 색상 통계
-    total_color_counter = Counter(all_colors)
+        color_stats[col] = col_colors
+        total_color_counter.update(col_colors)
     
     # 용어집에 있는 색상과 없는 색상 분류
     colors_in_glossary = []
     colors_not_in_glossary = []
     
     for color, count in total_color_counter.items():
-        found_in_glossary = False
-        color_lower = color.lower()
-        
-        # 정확한 매칭 우선
-        if color_lower in COLOR_GLOSSARY:
-            colors_in_glossary.append((color, count, COLOR_GLOSSARY[color_lower]))
-            found_in_glossary = True
+        translation = resolve_color(color)
+        if translation is not None:
+            colors_in_glossary.append((color, count, translation))
         else:
-            # 복합 색상 매칭 (길이 순으로 정렬하여 긴 매칭 우선)
-            sorted_glossary = sorted(COLOR_GLOSSARY.items(), key=lambda x: len(x[0]), reverse=True)
-            
-            for korean_color, japanese_color in sorted_glossary:
-                korean_lower = korean_color.lower()
-                
-                # 정확한 단어 경계 매칭
-                if korean_lower == color_lower:
-                    colors_in_glossary.append((color, count, japanese_color))
-                    found_in_glossary = True
-                    break
-                
-                # 복합 색상 체크 (수식어 + 기본색상)
-                modifiers = ["다크", "라이트", "딥", "소프트", "크림", "메이플", "아이스", "펄", "매트",
-                            "오크", "아카시아", "월넛", "멀바우", "엘다", "고무나무", "삼나무", "참죽",
-                            "내추럴", "네추럴", "워시", "빈티지", "엔틱", "우드", "애쉬", "새틴", "마블",
-                            "레드파인", "진", "연", "올", "무드", "블랙", "스카이", "베이비", "로즈",
-                            "파우더", "모닝", "틸", "샌드", "메탈", "바샬트", "웜", "차콜", "인디",
-                            "로투스", "스모키", "버터", "순백", "유백"]
-                for modifier in modifiers:
-                    if (color_lower.startswith(modifier) and color_lower.endswith(korean_lower)) or \
-                       (color_lower.endswith(modifier) and color_lower.startswith(korean_lower)):
-                        modifier_jp = {
-                            "다크": "ダーク", "라이트": "ライト", "딥": "ディープ", 
-                            "소프트": "ソフト", "크림": "クリーム", "메이플": "メープル",
-                            "아이스": "アイス", "펄": "パール", "매트": "マット",
-                            "오크": "オーク", "아카시아": "アカシア", "월넛": "ウォルナット",
-                            "멀바우": "メルバウ", "엘다": "エルダー", "고무나무": "ゴムノキ",
-                            "삼나무": "スギ", "참죽": "チャンチュン", "내추럴": "ナチュラル",
-                            "네추럴": "ナチュラル", "워시": "ウォッシュ", "빈티지": "ヴィンテージ",
-                            "엔틱": "アンティーク", "우드": "ウッド", "애쉬": "アッシュ",
-                            "새틴": "サテン", "마블": "マーブル", "레드파인": "レッドパイン",
-                            "진": "ダーク", "연": "ライト", "올": "オール", "무드": "ムード",
-                            "스카이": "スカイ", "베이비": "ベビー", "로즈": "ローズ",
-                            "파우더": "パウダー", "모닝": "モーニング", "틸": "ティール",
-                            "샌드": "サンド", "메탈": "メタル", "바샬트": "バサルト",
-                            "웜": "ウォーム", "차콜": "チャコール", "인디": "インディ",
-                            "로투스": "ロータス", "스모키": "スモーキー", "버터": "バター",
-                            "순백": "純白", "유백": "乳白"
-                        }.get(modifier, modifier)
-                        
-                        if color_lower.startswith(modifier):
-                            predicted_translation = f"{modifier_jp}{japanese_color}"
-                        else:
-                            predicted_translation = f"{japanese_color}{modifier_jp}"
-                            
-                        colors_in_glossary.append((color, count, predicted_translation))
-                        found_in_glossary = True
-                        break
-                
-                if found_in_glossary:
-                    break
-        
-        if not found_in_glossary:
             colors_not_in_glossary.append((color, count))
     
     return {
@@ -569,47 +862,41 @@ def suggest_glossary_additions(colors_not_in_glossary: List[tuple]) -> List[str]
 
 def export_color_analysis_to_excel(analysis_result: Dict) -> bytes:
     """색상 분석 결과를 엑셀로 내보내기"""
-    import io
-    import pandas as pd
-    
-    buffer = io.BytesIO()
-    
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        # 전체 색상 빈도
-        if analysis_result['color_frequency']:
-            freq_df = pd.DataFrame(
-                list(analysis_result['color_frequency'].items()),
+    from utils.excel_io import sheets_to_excel_bytes
+    
+    sheets = {}
+    
+    # 전체 색상 빈도
+    if analysis_result['color_frequency']:
+        sheets['전체_색상_빈도'] = pd.DataFrame(
+            list(analysis_result['color_frequency'].items()),
+            columns=['색상명', '빈도']
+        ).sort_values('빈도', ascending=False)
+    
+    # 용어집에 있는 색상
+    if analysis_result['colors_in_glossary']:
+        sheets['용어집_등록_색상'] = pd.DataFrame(
+            analysis_result['colors_in_glossary'],
+            columns=['한국어', '빈도', '일본어']
+        ).sort_values('빈도', ascending=False)
+    
+    # 용어집에 없는 색상
+    if analysis_result['colors_not_in_glossary']:
+        sheets['용어집_미등록_색상'] = pd.DataFrame(
+            analysis_result['colors_not_in_glossary'],
+            columns=['색상명', '빈도']
+        ).sort_values('빈도', ascending=False)
+    
+    # 컬럼별 분석
+    for col, color_counter in analysis_result['colors_by_column'].items():
+        if color_counter:
+            sheet_name = f"컬럼_{col.replace('옵션입력', '')}"[:31]  # 엑셀 시트명 길이 제한
+            sheets[sheet_name] = pd.DataFrame(
+                list(color_counter.items()),
                 columns=['색상명', '빈도']
             ).sort_values('빈도', ascending=False)
-            freq_df.to_excel(writer, sheet_name='전체_색상_빈도', index=False)
-        
-        # 용어집에 있는 색상
-        if analysis_result['colors_in_glossary']:
-            glossary_df = pd.DataFrame(
-                analysis_result['colors_in_glossary'],
-                columns=['한국어', '빈도', '일본어']
-            ).sort_values('빈도', ascending=False)
-            glossary_df.to_excel(writer, sheet_name='용어집_등록_색상', index=False)
-        
-        # 용어집에 없는 색상
-        if analysis_result['colors_not_in_glossary']:
-            missing_df = pd.DataFrame(
-                analysis_result['colors_not_in_glossary'],
-                columns=['색상명', '빈도']
-            ).sort_values('빈도', ascending=False)
-            missing_df.to_excel(writer, sheet_name='용어집_미등록_색상', index=False)
-        
-        # 컬럼별 분석
-        for col, color_counter in analysis_result['colors_by_column'].items():
-            if color_counter:
-                col_df = pd.DataFrame(
-                    list(color_counter.items()),
-                    columns=['색상명', '빈도']
-                ).sort_values('빈도', ascending=False)
-                sheet_name = f"컬럼_{col.replace('옵션입력', '')}"[:31]  # 엑셀 시트명 길이 제한
-                col_df.to_excel(writer, sheet_name=sheet_name, index=False)
-    
-    return buffer.getvalue()
+    
+    return sheets_to_excel_bytes(sheets)
 
 def translate_option_column(df, column_name: str, api_key: str, target_lang: str = 'JA'):
     """옵션 컬럼 번역 (기존 인터페이스 호환)"""
@@ -623,49 +910,8 @@ async def translate_option_column_batch_old(df, target_column: str, api_key: str
                                       batch_size: int = 5, use_async: bool = True):
     """옵션 컬럼 배치 번역 (상품명 번역과 동일한 방식)"""
     
-    # 대폭 확장된 색상 매핑 테이블 (API 호출 최소화)
-    color_map = {
-        # 기본 색상
-        '화이트': 'ホワイト', '블랙': 'ブラック', '그레이': 'グレー',
-        '연그레이': 'ライトグレー', '진그레이': 'ダークグレー',
-        '베이지': 'ベージュ', '브라운': 'ブラウン', '네이비': 'ネイビー',
-        '오크': 'オーク', '메이플': 'メープル', '아카시아': 'アカシア',
-        '월넛': 'ウォルナット', '멀바우': 'メルバウ', '크림': 'クリーム',
-        '아이보리': 'アイボリー', '카키': 'カーキ', '올리브': 'オリーブ',
-        '민트': 'ミント', '라벤더': 'ラベンダー', '골드': 'ゴールド',
-        '실버': 'シルバー', '레드': 'レッド', '블루': 'ブルー',
-        '그린': 'グリーン', '옐로우': 'イエロー', '핑크': 'ピンク',
-        
-        # 복합 색상 (로그에서 자주 나타나는 색상들)
-        '오크화이트': 'オークホワイト', '크림화이트': 'クリームホワイト',
-        '네추럴': 'ナチュラル', '네추럴멀바우': 'ナチュラルメルバウ',
-        '네추럴피치': 'ナチュラルピーチ', '네추럴블루': 'ナチュラルブルー',
-        '화이트메이플': 'ホワイトメープル', '화이트그레이': 'ホワイトグレー',
-        '화이트오크': 'ホワイトオーク', '다크브라운': 'ダークブラウン',
-        '라이트브라운': 'ライトブラウン', '딥브라운': 'ディープブラウン',
-        
-        # 자주 사용되는 복합 색상들 추가
-        '그레이블랙': 'グレーブラック', '참죽': 'チャンチュン', '투톤': 'ツートン',
-        '모카브라운': 'モカブラウン', '버건디': 'バーガンディ', '파우더블루': 'パウダーブルー',
-        '로투스핑크': 'ロータスピンク', '네추럴화이트': 'ナチュラルホワイト',
-        '아이보리메이플': 'アイボリーメープル', '워시그린': 'ウォッシュグリーン',
-        '블랙아카시아': 'ブラックアカシア', '그레이메이플': 'グレーメープル',
-        '커피': 'コーヒー', '베이지브라운': 'ベージュブラウン', '모카': 'モカ',
-        '오렌지': 'オレンジ', '연핑크': 'ライトピンク', '라이트그레이': 'ライトグレー',
-        '웜그레이': 'ウォームグレー', '샌드베이지': 'サンドベージュ', '어프리콧': 'アプリコット',
-        '레몬': 'レモン', '대리석': '大理石', '투명': '透明', '엘다': 'エルダー',
-        '포레스트그린': 'フォレストグリーン', '샌드그레이': 'サンドグレー',
-        '새틴그레이': 'サテングレー', '바샬트그레이': 'バサルトグレー',
-        '차콜그레이': 'チャコールグレー', '메탈그레이': 'メタルグレー',
-        '빈티지그레이': 'ヴィンテージグレー', '페일그레이': 'ペールグレー',
-        '다크그레이': 'ダークグレー', '연회색': 'ライトグレー',
-        '무드블랙': 'ムードブラック', '차콜블랙': 'チャコールブラック',
-        '로즈골드': 'ローズゴールド', '무광실버': 'マットシルバー',
-        '유광실버': 'グロッシーシルバー', '세라믹': 'セラミック',
-        '원목': '無垢材', '내추럴': 'ナチュラル', '워시': 'ウォッシュ',
-        '빈티지': 'ヴィンテージ', '엔틱': 'アンティーク', '새틴': 'サテン',
-        '마블': 'マーブル', '메탈': 'メタル', '우드': 'ウッド'
-    }
+    # 색상 매핑 테이블 (API 호출 최소화)
+    color_map = OPTION_COLOR_MAP
     
     def process_option_text(option_text):
         """옵션 텍스트 처리 함수"""
@@ -712,7 +958,7 @@ async def translate_option_column_batch_old(df, target_column: str, api_key: str
             return text
     
     # 모든 옵션 텍스트 처리
-    texts = df[target_column].fillna("").astype(str).tolist()
+    texts = df[target_column].astype(object).fillna("").astype(str).tolist()
     processed_data = [process_option_text(text) for text in texts]
     
     # API 번역이 필요한 색상들 수집
@@ -1,63 +1,274 @@
 """
-번역 캐시 시스템 - 메모리 기반 캐싱으로 중복 번역 방지
+번역 캐시 시스템 - 메모리 + SQLite 기반 캐싱으로 중복 번역 방지
+
+(원문, 대상 언어, 용어집 버전)을 키로 번역 결과를 디스크에 저장하므로
+Streamlit 재시작이나 재배포 후에도 이전 번역을 재사용할 수 있습니다.
 """
-from typing import Dict, Optional
-import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+import time
+
+# 캐시 파일 경로 (환경 변수로 변경 가능)
+DEFAULT_CACHE_PATH = os.environ.get(
+    'NF_MALL_TRANSLATION_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'nf_mall', 'translation_cache.sqlite3')
+)
+
+# 최대 저장 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+DEFAULT_MAX_ENTRIES = 200000
+
+# 용량을 넘으면 최대 항목 수의 이 비율까지 줄임 (매번 삭제/개수 확인하지 않도록 여유 확보)
+EVICT_TARGET_RATIO = 0.9
+
+# SQLite IN 절 변수 개수 제한을 고려한 조회 단위
+_LOOKUP_CHUNK_SIZE = 500
+
+CacheKey = Tuple[str, str, str]
 
 class TranslationCache:
-    """메모리 기반 번역 캐시"""
-    
-    def __init__(self):
-        self._cache: Dict[str, str] = {}
+    """메모리 + SQLite 기반 번역 캐시 (LRU 방식 용량 제한)"""
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            db_path: SQLite 파일 경로 (None이면 메모리 캐시만 사용)
+            max_entries: 최대 저장 항목 수
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._cache: 'OrderedDict[CacheKey, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
         self._hit_count = 0
         self._miss_count = 0
-    
-    def _get_cache_key(self, text: str, target_lang: str = 'JA') -> str:
+        self._disk_hit_count = 0
+        self._eviction_count = 0
+        # 디스크 항목 수 상한 추정치 (마지막 확인 값 + 이후 저장 수, 최대 항목 수를 넘을 때만 실제 개수 확인)
+        self._db_count_bound = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        """SQLite 캐시 파일 열기 (실패 시 메모리 캐시로 동작)"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    source TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    glossary_version TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (source, target_lang, glossary_version)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+            conn.commit()
+            self._db_count_bound = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            self._conn = conn
+        except (sqlite3.Error, OSError) as e:
+            print(f"번역 캐시 파일을 열 수 없습니다 ({db_path}): {str(e)} - 메모리 캐시만 사용합니다.")
+            self._conn = None
+
+    def _get_cache_key(self, text: str, target_lang: str = 'JA', glossary_version: str = '') -> CacheKey:
         """캐시 키 생성"""
-        return hashlib.md5(f"{text}_{target_lang}".encode()).hexdigest()
-    
-    def get(self, text: str, target_lang: str = 'JA') -> Optional[str]:
+        return (text, target_lang, glossary_version)
+
+    def _remember(self, key: CacheKey, translation: str):
+        """메모리 캐시에 저장 (LRU 순서 갱신)"""
+        self._cache[key] = translation
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def get(self, text: str, target_lang: str = 'JA', glossary_version: str = '') -> Optional[str]:
         """캐시에서 번역 결과 조회"""
         if not text or not text.strip():
             return text
-        
-        key = self._get_cache_key(text, target_lang)
-        if key in self._cache:
-            self._hit_count += 1
-            return self._cache[key]
-        
-        self._miss_count += 1
-        return None
-    
-    def set(self, text: str, translation: str, target_lang: str = 'JA'):
+
+        return self.get_many([text], target_lang, glossary_version).get(text)
+
+    def get_many(self, texts: Iterable[str], target_lang: str = 'JA',
+                 glossary_version: str = '') -> Dict[str, str]:
+        """
+        여러 텍스트의 번역 결과를 한 번에 조회
+
+        Returns:
+            캐시에 있는 텍스트만 담은 {원문: 번역} 딕셔너리
+        """
+        results = {}
+        missing = []
+        memory_hits = []
+
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                if not text or not text.strip():
+                    continue
+                key = self._get_cache_key(text, target_lang, glossary_version)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[text] = self._cache[key]
+                    memory_hits.append(text)
+                else:
+                    missing.append(text)
+
+            self._hit_count += len(results)
+
+            if missing and self._conn is not None:
+                disk_hits = self._lookup_db(missing, target_lang, glossary_version)
+                for text, translation in disk_hits.items():
+                    self._remember(self._get_cache_key(text, target_lang, glossary_version), translation)
+                results.update(disk_hits)
+                self._hit_count += len(disk_hits)
+                self._disk_hit_count += len(disk_hits)
+                self._miss_count += len(missing) - len(disk_hits)
+                memory_hits.extend(disk_hits)
+            else:
+                self._miss_count += len(missing)
+
+            # 메모리/디스크 적중 모두 디스크 사용 시각 갱신 (자주 쓰는 항목이 먼저 삭제되지 않도록)
+            if memory_hits and self._conn is not None:
+                self._touch_db(memory_hits, target_lang, glossary_version)
+
+        return results
+
+    def _lookup_db(self, texts: List[str], target_lang: str, glossary_version: str) -> Dict[str, str]:
+        """SQLite에서 일괄 조회"""
+        found = {}
+        try:
+            for start in range(0, len(texts), _LOOKUP_CHUNK_SIZE):
+                chunk = texts[start:start + _LOOKUP_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT source, translation FROM translations "
+                    f"WHERE target_lang = ? AND glossary_version = ? AND source IN ({placeholders})",
+                    [target_lang, glossary_version, *chunk]
+                ).fetchall()
+                found.update(rows)
+        except sqlite3.Error as e:
+            print(f"번역 캐시 조회 오류: {str(e)}")
+        return found
+
+    def _touch_db(self, texts: List[str], target_lang: str, glossary_version: str):
+        """조회된 항목의 사용 시각을 한 번에 갱신"""
+        try:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE translations SET last_used = ? "
+                "WHERE source = ? AND target_lang = ? AND glossary_version = ?",
+                [(now, text, target_lang, glossary_version) for text in texts]
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"번역 캐시 사용 시각 갱신 오류: {str(e)}")
+
+    def set(self, text: str, translation: str, target_lang: str = 'JA', glossary_version: str = ''):
         """번역 결과를 캐시에 저장"""
-        if not text or not text.strip():
+        self.set_many({text: translation}, target_lang, glossary_version)
+
+    def set_many(self, translations: Dict[str, str], target_lang: str = 'JA', glossary_version: str = ''):
+        """여러 번역 결과를 한 번에 저장"""
+        items = [(text, translation) for text, translation in translations.items()
+                 if text and text.strip()]
+        if not items:
             return
-        
-        key = self._get_cache_key(text, target_lang)
-        self._cache[key] = translation
-    
+
+        with self._lock:
+            for text, translation in items:
+                self._remember(self._get_cache_key(text, target_lang, glossary_version), translation)
+
+            if self._conn is None:
+                return
+
+            try:
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO translations "
+                    "(source, target_lang, glossary_version, translation, last_used) VALUES (?, ?, ?, ?, ?)",
+                    [(text, target_lang, glossary_version, translation, now) for text, translation in items]
+                )
+                self._db_count_bound += len(items)
+                self._evict_db()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"번역 캐시 저장 오류: {str(e)}")
+
+    def _evict_db(self):
+        """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 EVICT_TARGET_RATIO까지 삭제"""
+        # 상한 추정치가 최대 항목 수 이하면 개수를 세지 않음
+        if self._db_count_bound <= self.max_entries:
+            return
+
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        self._db_count_bound = count
+        if count <= self.max_entries:
+            return
+
+        overflow = count - int(self.max_entries * EVICT_TARGET_RATIO)
+
+        self._conn.execute(
+            "DELETE FROM translations WHERE (source, target_lang, glossary_version) IN ("
+            "SELECT source, target_lang, glossary_version FROM translations ORDER BY last_used LIMIT ?)",
+            (overflow,)
+        )
+        self._db_count_bound = count - overflow
+        self._eviction_count += overflow
+
+    def _persistent_size(self) -> int:
+        """디스크에 저장된 항목 수"""
+        if self._conn is None:
+            return 0
+        try:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
     def get_stats(self) -> Dict[str, int]:
         """캐시 통계 반환"""
-        total = self._hit_count + self._miss_count
-        hit_rate = (self._hit_count / total * 100) if total > 0 else 0
-        
-        return {
-            'cache_size': len(self._cache),
-            'hit_count': self._hit_count,
-            'miss_count': self._miss_count,
-            'hit_rate': hit_rate
-        }
-    
+        with self._lock:
+            total = self._hit_count + self._miss_count
+            hit_rate = (self._hit_count / total * 100) if total > 0 else 0
+
+            return {
+                'cache_size': len(self._cache),
+                'persistent_size': self._persistent_size(),
+                'hit_count': self._hit_count,
+                'disk_hit_count': self._disk_hit_count,
+                'miss_count': self._miss_count,
+                'hit_rate': hit_rate,
+                'eviction_count': self._eviction_count,
+                'max_entries': self.max_entries,
+                'persistent': self._conn is not None
+            }
+
     def clear(self):
-        """캐시 초기화"""
-        self._cache.clear()
-        self._hit_count = 0
-        self._miss_count = 0
+        """캐시 초기화 (디스크 캐시 포함)"""
+        with self._lock:
+            self._cache.clear()
+            self._hit_count = 0
+            self._miss_count = 0
+            self._disk_hit_count = 0
+            self._eviction_count = 0
+
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM translations")
+                    self._conn.commit()
+                    self._db_count_bound = 0
+                except sqlite3.Error as e:
+                    print(f"번역 캐시 초기화 오류: {str(e)}")
 
 # 전역 캐시 인스턴스
 _global_cache = TranslationCache()
 
 def get_translation_cache() -> TranslationCache:
     """전역 번역 캐시 반환"""
-    return _global_cache
\ No newline at end of file
+    return _global_cache
@@ -0,0 +1,119 @@
+"""
+번역 작업 체크포인트 - 긴 번역 작업을 중단된 지점부터 재개
+
+입력 데이터 해시와 컬럼으로 작업을 식별하고, 완료된 번역을 배치마다
+JSONL 파일에 추가 기록합니다. 타임아웃, 사용량 한도(456), 브라우저 새로고침으로
+작업이 중단되어도 같은 파일을 다시 번역하면 완료된 텍스트는 건너뜁니다.
+"""
+from typing import Dict, Iterable, Optional, Union
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+# 체크포인트 저장 디렉터리 (환경 변수로 변경 가능)
+DEFAULT_CHECKPOINT_DIR = os.environ.get(
+    'NF_MALL_CHECKPOINT_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'nf_mall', 'checkpoints')
+)
+
+def make_job_id(df: pd.DataFrame, columns: Union[str, Iterable[str]], target_lang: str = 'JA') -> str:
+    """
+    입력 데이터와 번역 컬럼으로 작업 ID 생성
+
+    Args:
+        df: 번역할 데이터프레임
+        columns: 번역 대상 컬럼명 (또는 컬럼명 리스트)
+        target_lang: 번역 대상 언어
+
+    Returns:
+        같은 입력이면 항상 같은 작업 ID
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+
+    digest = hashlib.sha256()
+    digest.update(target_lang.encode())
+    for column in columns:
+        digest.update(b'\0' + column.encode())
+        values = df[column].astype(object).fillna("").astype(str)
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:24]
+
+class TranslationCheckpoint:
+    """JSONL 파일 기반 번역 작업 체크포인트"""
+
+    def __init__(self, job_id: str, directory: str = DEFAULT_CHECKPOINT_DIR):
+        """
+        Args:
+            job_id: make_job_id로 생성한 작업 ID
+            directory: 체크포인트 파일 디렉터리
+        """
+        self.job_id = job_id
+        self.path = os.path.join(directory, f"{job_id}.jsonl")
+        self._lock = threading.Lock()
+        self._completed: Optional[Dict[str, str]] = None
+
+    def exists(self) -> bool:
+        """이전 작업 기록 존재 여부"""
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict[str, str]:
+        """
+        완료된 번역 읽기
+
+        Returns:
+            {원문: 번역} 딕셔너리 (중단 시 잘린 마지막 줄은 무시)
+        """
+        with self._lock:
+            if self._completed is None:
+                self._completed = {}
+                if self.exists():
+                    try:
+                        with open(self.path, encoding='utf-8') as f:
+                            for line in f:
+                                try:
+                                    entry = json.loads(line)
+                                except json.JSONDecodeError:
+                                    continue
+                                self._completed[entry['source']] = entry['translation']
+                    except OSError as e:
+                        print(f"체크포인트를 읽을 수 없습니다 ({self.path}): {str(e)}")
+            return dict(self._completed)
+
+    def record(self, translations: Dict[str, str]):
+        """완료된 번역을 파일에 추가 기록 (빈 번역은 기록하지 않음)"""
+        self.load()
+        with self._lock:
+            items = {source: translation for source, translation in translations.items()
+                     if translation and self._completed.get(source) != translation}
+            if not items:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for source, translation in items.items():
+                        f.write(json.dumps({'source': source, 'translation': translation},
+                                           ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._completed.update(items)
+            except OSError as e:
+                print(f"체크포인트 저장 오류 ({self.path}): {str(e)}")
+
+    def completed_count(self) -> int:
+        """완료된 번역 수"""
+        return len(self.load())
+
+    def discard(self):
+        """작업 기록 삭제 (작업 완료 또는 처음부터 다시 시작할 때)"""
+        with self._lock:
+            self._completed = {}
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                print(f"체크포인트 삭제 오류 ({self.path}): {str(e)}")
@@ -4,6 +4,8 @@ from typing import List, Dict, Optional, Tuple
 import os
 from pathlib import Path
 
+from utils.price import invalid_price_rows, normalize_prices
+
 class DataValidator:
     """데이터 검증 클래스"""
     
@@ -71,21 +73,18 @@ class DataValidator:
                 if col not in df.columns:
                     continue  # 가격 컬럼이 없으면 검증 생략
                 
-                # 가격 데이터 타입 확인
-                price_column = df[col]
-                
-                # 숫자가 아닌 값 확인
-                non_numeric = price_column[pd.to_numeric(price_column, errors='coerce').isna()]
-                if not non_numeric.empty:
-                    validator.warnings.append(f"{col}: 숫자가 아닌 가격 데이터가 {len(non_numeric)}개 있습니다.")
-                
-                # 음수 또는 0 값 확인
-                numeric_prices = pd.to_numeric(price_column, errors='coerce')
-                invalid_prices = numeric_prices[numeric_prices <= 0]
-                if not invalid_prices.empty:
-                    validator.warnings.append(f"{col}: 유효하지 않은 가격 데이터가 {len(invalid_prices)}개 있습니다 (0 이하).")
+                # 가격 처리에서 건너뛰는 행 (값 없음, 숫자가 아닌 값, 0 이하 등 - 쉼표/통화 기호는 허용)
+                invalid = invalid_price_rows(df, col)
+                for reason, rows in invalid.groupby('사유', sort=False)['행']:
+                    sample = ', '.join(map(str, rows.head(5)))
+                    more = ' 등' if len(rows) > 5 else ''
+                    validator.warnings.append(
+                        f"{col}: 유효하지 않은 가격 데이터가 {len(rows)}개 있습니다 ({reason}, 행: {sample}{more}). "
+                        f"가격 처리 시 건너뜁니다."
+                    )
                 
                 # 비정상적으로 높은 가격 확인 (1억원 이상)
+                numeric_prices = normalize_prices(df[col])
                 high_prices = numeric_prices[numeric_prices > 100000000]
                 if not high_prices.empty:
                     validator.warnings.append(f"{col}: 비정상적으로 높은 가격이 {len(high_prices)}개 있습니다 (1억원 이상).")